@@ -525,7 +525,7 @@ class Library:
     def __init__(self, name):
         self.name = name
         self._books = []
-        self._members = []
+        self._members = set()
     
     # Public methods
     def add_book(self, title, author):
@@ -586,7 +586,7 @@ class Library:
     def add_member(self, member_name):
         """Add a library member"""
         if member_name not in self._members:
-            self._members.append(member_name)
+            self._members.add(member_name)
             return f"Added member: {member_name}"
         else:
             return f"Already a member: {member_name}"
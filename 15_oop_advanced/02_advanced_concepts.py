@@ -6,6 +6,12 @@ Advanced OOP concepts including metaclasses, descriptors, context managers,
 and other powerful Python features for professional development! 💪
 """
 
+from array import array
+import heapq
+from itertools import repeat
+import math
+import operator
+
 print("=== METACLASSES ===")
 
 # Metaclasses are classes that create other classes
@@ -265,73 +271,129 @@ print("\n=== SPECIAL METHODS (DUNDER METHODS) ===")
 
 # Advanced special methods
 class Vector:
-    """Vector class with advanced special methods"""
+    """Vector class with advanced special methods
+    
+    Slotted (no per-instance __dict__) and caching its squared magnitude,
+    which the comparisons use, so ordering vectors needs no square roots.
+    """
+    
+    __slots__ = ("_x", "_y", "_squared")
     
     def __init__(self, x, y):
-        self.x = x
-        self.y = y
+        self._x = x
+        self._y = y
+        self._squared = None
+    
+    @property
+    def x(self):
+        """x component"""
+        return self._x
+    
+    @x.setter
+    def x(self, value):
+        self._x = value
+        self._squared = None
+    
+    @property
+    def y(self):
+        """y component"""
+        return self._y
+    
+    @y.setter
+    def y(self, value):
+        self._y = value
+        self._squared = None
     
     def __add__(self, other):
         """Overload + operator"""
         if isinstance(other, Vector):
-            return Vector(self.x + other.x, self.y + other.y)
+            return Vector(self._x + other._x, self._y + other._y)
         else:
-            return Vector(self.x + other, self.y + other)
+            return Vector(self._x + other, self._y + other)
     
     def __sub__(self, other):
         """Overload - operator"""
         if isinstance(other, Vector):
-            return Vector(self.x - other.x, self.y - other.y)
+            return Vector(self._x - other._x, self._y - other._y)
         else:
-            return Vector(self.x - other, self.y - other)
+            return Vector(self._x - other, self._y - other)
     
     def __mul__(self, scalar):
         """Overload * operator"""
-        return Vector(self.x * scalar, self.y * scalar)
+        return Vector(self._x * scalar, self._y * scalar)
     
     def __truediv__(self, scalar):
         """Overload / operator"""
         if scalar == 0:
             raise ValueError("Cannot divide by zero")
-        return Vector(self.x / scalar, self.y / scalar)
+        return Vector(self._x / scalar, self._y / scalar)
+    
+    def __iadd__(self, other):
+        """Overload += operator, updating this vector in place"""
+        if isinstance(other, Vector):
+            self._x += other._x
+            self._y += other._y
+        else:
+            self._x += other
+            self._y += other
+        self._squared = None
+        return self
+    
+    def __isub__(self, other):
+        """Overload -= operator, updating this vector in place"""
+        if isinstance(other, Vector):
+            self._x -= other._x
+            self._y -= other._y
+        else:
+            self._x -= other
+            self._y -= other
+        self._squared = None
+        return self
+    
+    def __imul__(self, scalar):
+        """Overload *= operator, updating this vector in place"""
+        self._x *= scalar
+        self._y *= scalar
+        self._squared = None
+        return self
     
     def __eq__(self, other):
         """Overload == operator"""
         if isinstance(other, Vector):
-            return self.x == other.x and self.y == other.y
+            return self._x == other._x and self._y == other._y
         return False
     
     def __lt__(self, other):
-        """Overload < operator"""
+        """Overload < operator (compares magnitudes)"""
         if isinstance(other, Vector):
-            return self.magnitude() < other.magnitude()
+            return self.squared_magnitude() < other.squared_magnitude()
         return False
     
     def __le__(self, other):
-        """Overload <= operator"""
+        """Overload <= operator (compares magnitudes)"""
         if isinstance(other, Vector):
-            return self.magnitude() <= other.magnitude()
+            return self.squared_magnitude() <= other.squared_magnitude()
         return False
     
     def __gt__(self, other):
-        """Overload > operator"""
+        """Overload > operator (compares magnitudes)"""
         if isinstance(other, Vector):
-            return self.magnitude() > other.magnitude()
+            return self.squared_magnitude() > other.squared_magnitude()
         return False
     
     def __ge__(self, other):
-        """Overload >= operator"""
+        """Overload >= operator (compares magnitudes)"""
         if isinstance(other, Vector):
-            return self.magnitude() >= other.magnitude()
+            return self.squared_magnitude() >= other.squared_magnitude()
         return False
     
     def __str__(self):
         """String representation"""
-        return f"Vector({self.x}, {self.y})"
+        return f"Vector({self._x}, {self._y})"
     
     def __repr__(self):
         """Developer representation"""
-        return f"Vector({self.x}, {self.y})"
+        return f"Vector({self._x}, {self._y})"
     
     def __len__(self):
         """Length of vector"""
@@ -340,32 +402,40 @@ class Vector:
     def __getitem__(self, index):
         """Get item by index"""
         if index == 0:
-            return self.x
+            return self._x
         elif index == 1:
-            return self.y
+            return self._y
         else:
             raise IndexError("Vector index out of range")
     
     def __setitem__(self, index, value):
         """Set item by index"""
         if index == 0:
-            self.x = value
+            self._x = value
         elif index == 1:
-            self.y = value
+            self._y = value
         else:
             raise IndexError("Vector index out of range")
+        self._squared = None
     
     def __iter__(self):
         """Make vector iterable"""
-        return iter([self.x, self.y])
+        return iter((self._x, self._y))
     
     def __contains__(self, value):
         """Check if value is in vector"""
-        return value in [self.x, self.y]
+        return value == self._x or value == self._y
+    
+    def squared_magnitude(self):
+        """x*x + y*y, cached until a component changes; also a fast sort key"""
+        squared = self._squared
+        if squared is None:
+            squared = self._squared = self._x * self._x + self._y * self._y
+        return squared
     
     def magnitude(self):
         """Calculate vector magnitude"""
-        return (self.x ** 2 + self.y ** 2) ** 0.5
+        return self.squared_magnitude() ** 0.5
 
 # Test special methods
 print("=== Special Methods Example ===")
@@ -388,6 +458,477 @@ print(f"Iterating v1: {list(v1)}")
 print(f"3 in v1: {3 in v1}")
 print(f"5 in v1: {5 in v1}")
 
+print("\n=== SLOTTED VECTORS ===")
+
+v3 = Vector(3, 4)
+print(f"Squared magnitude of v3: {v3.squared_magnitude()}, magnitude {v3.magnitude()}")
+v3 += v2
+print(f"v3 += v2: {v3}, magnitude {v3.magnitude():.4f}")
+v3 *= 2
+print(f"v3 *= 2: {v3}")
+v3[0] = 0
+print(f"v3[0] = 0: {v3}, magnitude {v3.magnitude()}")
+print(f"Sorted: {sorted([v1, v2, v3, Vector(0, 1)])}")
+
+print("\n=== STRUCT-OF-ARRAYS VECTORS ===")
+
+class VectorView(Vector):
+    """A Vector backed by one slot of a VectorArray; writes go through to the array"""
+    
+    __slots__ = ("_vectors", "_index")
+    
+    def __init__(self, vectors, index):
+        self._vectors = vectors
+        self._index = index
+    
+    @property
+    def x(self):
+        return self._vectors._xs[self._index]
+    
+    @x.setter
+    def x(self, value):
+        self._vectors._xs[self._index] = value
+    
+    @property
+    def y(self):
+        return self._vectors._ys[self._index]
+    
+    @y.setter
+    def y(self, value):
+        self._vectors._ys[self._index] = value
+    
+    # Vector's methods work on _x, _y and _squared; point them at the array too.
+    # The array can change underneath a view, so a view never caches its magnitude.
+    _x, _y = x, y
+    _squared = property(lambda self: None, lambda self, value: None)
+
+class VectorArray:
+    """Many 2-D vectors stored as two contiguous float arrays (struct of arrays)
+    
+    Operations run over whole arrays in C, mapping functions from the
+    operator and math modules into array('d'), so no Vector object is created
+    per element. Indexing returns a VectorView into the arrays.
+    """
+    
+    def __init__(self, xs=(), ys=()):
+        self._xs = array("d", xs)
+        self._ys = array("d", ys)
+        if len(self._xs) != len(self._ys):
+            raise ValueError("x and y must have the same number of components")
+    
+    @classmethod
+    def from_vectors(cls, vectors):
+        """Copy any iterable of Vectors (read once, so generators work too)"""
+        vectors = list(vectors)
+        return cls(map(operator.attrgetter("x"), vectors), map(operator.attrgetter("y"), vectors))
+    
+    @classmethod
+    def _wrap(cls, xs, ys):
+        """VectorArray around existing arrays, without copying"""
+        vectors = cls.__new__(cls)
+        vectors._xs = xs
+        vectors._ys = ys
+        return vectors
+    
+    def __len__(self):
+        """Number of vectors"""
+        return len(self._xs)
+    
+    def _position(self, index):
+        """Non-negative position of index, checked against the length"""
+        index = operator.index(index)
+        if index < 0:
+            index += len(self._xs)
+        if not 0 <= index < len(self._xs):
+            raise IndexError("VectorArray index out of range")
+        return index
+    
+    def __getitem__(self, index):
+        """A VectorView, or a VectorArray copy for a slice"""
+        if isinstance(index, slice):
+            return self._wrap(self._xs[index], self._ys[index])
+        return VectorView(self, self._position(index))
+    
+    def __setitem__(self, index, vector):
+        """Store a Vector's components at index"""
+        index = self._position(index)
+        self._xs[index] = vector.x
+        self._ys[index] = vector.y
+    
+    def __iter__(self):
+        """Views of every vector in order"""
+        for index in range(len(self._xs)):
+            yield VectorView(self, index)
+    
+    def append(self, vector):
+        """Add a vector at the end"""
+        self._xs.append(vector.x)
+        self._ys.append(vector.y)
+    
+    def to_vectors(self):
+        """Independent Vector objects, one per element"""
+        return [Vector(x, y) for x, y in zip(self._xs, self._ys)]
+    
+    def _operands(self, other):
+        """x and y operands for another VectorArray, a Vector (broadcast) or a number"""
+        if isinstance(other, VectorArray):
+            if len(other) != len(self):
+                raise ValueError(f"Cannot combine VectorArrays of length {len(self)} and {len(other)}")
+            return other._xs, other._ys
+        if isinstance(other, Vector):
+            return repeat(other.x), repeat(other.y)
+        return repeat(other), repeat(other)
+    
+    def _apply(self, function, other):
+        """New VectorArray of function applied component-wise"""
+        xs, ys = self._operands(other)
+        return self._wrap(array("d", map(function, self._xs, xs)), array("d", map(function, self._ys, ys)))
+    
+    def __add__(self, other):
+        """Element-wise addition"""
+        return self._apply(operator.add, other)
+    
+    def __sub__(self, other):
+        """Element-wise subtraction"""
+        return self._apply(operator.sub, other)
+    
+    def __mul__(self, scalar):
+        """Scalar multiplication"""
+        return self._apply(operator.mul, scalar)
+    
+    __rmul__ = __mul__
+    
+    def __truediv__(self, scalar):
+        """Scalar division"""
+        if scalar == 0:
+            raise ValueError("Cannot divide by zero")
+        return self._apply(operator.truediv, scalar)
+    
+    def __eq__(self, other):
+        """Same vectors in the same order"""
+        if isinstance(other, VectorArray):
+            return self._xs == other._xs and self._ys == other._ys
+        return NotImplemented
+    
+    def __repr__(self):
+        """Developer representation, showing the first few vectors"""
+        shown = ", ".join(f"({x}, {y})" for x, y in zip(self._xs[:4], self._ys[:4]))
+        more = ", ..." if len(self) > 4 else ""
+        return f"VectorArray([{shown}{more}], len={len(self)})"
+    
+    def dot(self, other):
+        """Dot product of each vector with other (a VectorArray or a Vector)"""
+        xs, ys = self._operands(other)
+        return array("d", map(operator.add, map(operator.mul, self._xs, xs), map(operator.mul, self._ys, ys)))
+    
+    def squared_magnitudes(self):
+        """x*x + y*y of each vector, cheaper than magnitudes when only the order matters"""
+        return self.dot(self)
+    
+    def magnitudes(self):
+        """Length of each vector"""
+        return array("d", map(math.hypot, self._xs, self._ys))
+    
+    def normalized(self):
+        """Unit vectors in the same directions; zero vectors stay zero"""
+        lengths = self.magnitudes()
+        if 0.0 in lengths:
+            lengths = array("d", (length or 1.0 for length in lengths))
+        return self._wrap(array("d", map(operator.truediv, self._xs, lengths)),
+                          array("d", map(operator.truediv, self._ys, lengths)))
+    
+    def _compare(self, function, other):
+        """Element-wise magnitude comparison as an array of 0/1 flags"""
+        if isinstance(other, VectorArray):
+            if len(other) != len(self):
+                raise ValueError(f"Cannot compare VectorArrays of length {len(self)} and {len(other)}")
+            others = other.squared_magnitudes()
+        elif isinstance(other, Vector):
+            others = repeat(other.x * other.x + other.y * other.y)
+        else:
+            raise TypeError(f"Cannot compare a VectorArray with {type(other).__name__}")
+        return array("b", map(function, self.squared_magnitudes(), others))
+    
+    def lt(self, other):
+        """Vector < for each element (shorter than other)"""
+        return self._compare(operator.lt, other)
+    
+    def le(self, other):
+        """Vector <= for each element"""
+        return self._compare(operator.le, other)
+    
+    def gt(self, other):
+        """Vector > for each element (longer than other)"""
+        return self._compare(operator.gt, other)
+    
+    def ge(self, other):
+        """Vector >= for each element"""
+        return self._compare(operator.ge, other)
+
+points = VectorArray.from_vectors([Vector(3, 4), Vector(1, 2), Vector(0, 0)])
+print(f"VectorArray: {points}")
+print(f"points + v2: {points + v2}")
+print(f"points * 2: {points * 2}")
+print(f"points[0]: {points[0]}, magnitude {points[0].magnitude()}")
+print(f"Dot with v2: {list(points.dot(v2))}")
+print(f"Magnitudes: {list(points.magnitudes())}")
+print(f"Normalized: {points.normalized()}")
+print(f"Shorter than v1: {list(points.lt(v1))}")
+points[2].x = 6
+print(f"After points[2].x = 6: {points[2]}, points[2] + v1 = {points[2] + v1}")
+
+print("\n=== SPATIAL INDEX ===")
+
+class SpatialGrid:
+    """Uniform grid over Vector points for radius and nearest-neighbour queries
+    
+    Space is cut into square cells of side cell_size; each cell keeps (x, y, vector)
+    entries, so a query only looks at the cells its search circle touches. Points are
+    indexed by their coordinates at insert time - remove and re-insert a Vector after
+    moving it. The grid re-buckets itself when the point count or the occupied extent
+    outgrows the cell size, and queries whose search area spans more cell positions
+    than there are occupied cells scan the occupied cells instead.
+    """
+    
+    POINTS_PER_CELL = 2
+    
+    def __init__(self, points=(), cell_size=None):
+        points = list(points)
+        if cell_size is None:
+            cell_size = self._pick_cell_size(points)
+        if cell_size <= 0:
+            raise ValueError("Cell size must be positive")
+        self._cell_size = float(cell_size)
+        self._cells = {}
+        self._count = 0
+        self._resize_at = max(1024, 4 * len(points))
+        self._min_cell = self._max_cell = None
+        self._bulk_load(points)
+    
+    @classmethod
+    def _pick_cell_size(cls, points):
+        """Size cells so the bounding box holds about POINTS_PER_CELL points per cell"""
+        if len(points) < 2:
+            return 1.0
+        xs = [p.x for p in points]
+        ys = [p.y for p in points]
+        width = max(xs) - min(xs)
+        height = max(ys) - min(ys)
+        area = max(width, 1e-9) * max(height, 1e-9)
+        return max(math.sqrt(area * cls.POINTS_PER_CELL / len(points)), 1e-9)
+    
+    def _bulk_load(self, points):
+        """Bucket all points in one pass, then set the occupied cell range once"""
+        cells = self._cells
+        inverse = 1.0 / self._cell_size
+        floor = math.floor
+        for point in points:
+            x, y = point.x, point.y
+            key = (floor(x * inverse), floor(y * inverse))
+            bucket = cells.get(key)
+            if bucket is None:
+                cells[key] = [(x, y, point)]
+            else:
+                bucket.append((x, y, point))
+        self._count += len(points)
+        if cells:
+            cxs = [key[0] for key in cells]
+            cys = [key[1] for key in cells]
+            self._min_cell = (min(cxs), min(cys))
+            self._max_cell = (max(cxs), max(cys))
+        # Re-bucket once inserts stretch the occupied extent well past its built size
+        self._span_limit = 4 * max(self._span(), self._count, 256)
+    
+    def _span(self):
+        """Number of cell positions in the occupied bounding box"""
+        if self._min_cell is None:
+            return 0
+        return ((self._max_cell[0] - self._min_cell[0] + 1)
+                * (self._max_cell[1] - self._min_cell[1] + 1))
+    
+    def _cell_of(self, x, y):
+        inverse = 1.0 / self._cell_size
+        return (math.floor(x * inverse), math.floor(y * inverse))
+    
+    def __len__(self):
+        return self._count
+    
+    def __iter__(self):
+        for bucket in self._cells.values():
+            for entry in bucket:
+                yield entry[2]
+    
+    def __contains__(self, point):
+        x, y = point.x, point.y
+        bucket = self._cells.get(self._cell_of(x, y), ())
+        return any(ex == x and ey == y for ex, ey, _ in bucket)
+    
+    def __repr__(self):
+        return f"SpatialGrid({self._count} points, {len(self._cells)} cells of {self._cell_size:.4g})"
+    
+    def insert(self, point):
+        """Add one Vector to the index"""
+        x, y = point.x, point.y
+        key = self._cell_of(x, y)
+        self._cells.setdefault(key, []).append((x, y, point))
+        self._count += 1
+        if self._min_cell is None:
+            self._min_cell = self._max_cell = key
+        else:
+            self._min_cell = (min(self._min_cell[0], key[0]), min(self._min_cell[1], key[1]))
+            self._max_cell = (max(self._max_cell[0], key[0]), max(self._max_cell[1], key[1]))
+        if self._count > self._resize_at or self._span() > self._span_limit:
+            self._rebuild()
+    
+    def remove(self, point):
+        """Remove a Vector (the same object if indexed, else an equal point)"""
+        x, y = point.x, point.y
+        key = self._cell_of(x, y)
+        bucket = self._cells.get(key)
+        if bucket:
+            # Prefer the identical object, fall back to the first point at the same position
+            match = next((i for i, entry in enumerate(bucket) if entry[2] is point), None)
+            if match is None:
+                match = next((i for i, (ex, ey, _) in enumerate(bucket) if ex == x and ey == y), None)
+            if match is not None:
+                bucket[match] = bucket[-1]
+                bucket.pop()
+                if not bucket:
+                    del self._cells[key]
+                self._count -= 1
+                return
+        raise ValueError(f"{point} is not in the index")
+    
+    def _rebuild(self):
+        """Re-bucket with a cell size that fits the current points and extent"""
+        points = list(self)
+        self._cell_size = self._pick_cell_size(points)
+        self._cells = {}
+        self._count = 0
+        self._resize_at = max(1024, 4 * len(points))
+        self._min_cell = self._max_cell = None
+        self._bulk_load(points)
+    
+    def within(self, center, radius):
+        """All indexed Vectors whose distance from center is at most radius"""
+        if radius < 0 or not self._cells:
+            return []
+        cx, cy = center.x, center.y
+        size = self._cell_size
+        limit = radius * radius
+        low_x, low_y = self._cell_of(cx - radius, cy - radius)
+        high_x, high_y = self._cell_of(cx + radius, cy + radius)
+        low_x, low_y = max(low_x, self._min_cell[0]), max(low_y, self._min_cell[1])
+        high_x, high_y = min(high_x, self._max_cell[0]), min(high_y, self._max_cell[1])
+        cells = self._cells
+        if high_x < low_x or high_y < low_y:
+            return []
+        if (high_x - low_x + 1) * (high_y - low_y + 1) > len(cells):
+            # The box has more positions than there are occupied cells, so walk those
+            candidates = [(key, bucket) for key, bucket in cells.items()
+                          if low_x <= key[0] <= high_x and low_y <= key[1] <= high_y]
+        else:
+            candidates = (((i, j), cells.get((i, j))) for i in range(low_x, high_x + 1)
+                          for j in range(low_y, high_y + 1))
+        found = []
+        for (i, j), bucket in candidates:
+            if bucket is None:
+                continue
+            # Nearest and farthest distance from the center to this cell, per axis
+            left, right = i * size - cx, (i + 1) * size - cx
+            bottom, top = j * size - cy, (j + 1) * size - cy
+            near_x = left if left > 0 else (-right if right < 0 else 0.0)
+            near_y = bottom if bottom > 0 else (-top if top < 0 else 0.0)
+            if near_x * near_x + near_y * near_y > limit:
+                continue
+            far_x = max(-left, right)
+            far_y = max(-bottom, top)
+            if far_x * far_x + far_y * far_y <= limit:
+                # Whole cell is inside the circle
+                found.extend(entry[2] for entry in bucket)
+            else:
+                found.extend(point for x, y, point in bucket
+                             if (x - cx) * (x - cx) + (y - cy) * (y - cy) <= limit)
+        return found
+    
+    def nearest(self, center, k=1):
+        """The k indexed Vectors closest to center, nearest first"""
+        if k <= 0 or not self._cells:
+            return []
+        cx, cy = center.x, center.y
+        if k >= self._count:
+            return [entry[2] for entry in sorted(
+                (entry for bucket in self._cells.values() for entry in bucket),
+                key=lambda e: (e[0] - cx) * (e[0] - cx) + (e[1] - cy) * (e[1] - cy))]
+        
+        size = self._cell_size
+        home_x, home_y = self._cell_of(cx, cy)
+        (min_x, min_y), (max_x, max_y) = self._min_cell, self._max_cell
+        # Rings closer than the occupied range are empty, so start at its edge
+        start = max(0, min_x - home_x, home_x - max_x, min_y - home_y, home_y - max_y)
+        last = max(home_x - min_x, max_x - home_x, home_y - min_y, max_y - home_y)
+        # Distance from the center to the edge of its own cell
+        margin = min(cx - home_x * size, (home_x + 1) * size - cx, cy - home_y * size, (home_y + 1) * size - cy)
+        
+        cells = self._cells
+        heap = []  # max-heap of (-squared distance, tiebreak, point) holding the best k so far
+        tiebreak = 0
+        for ring in range(start, last + 1):
+            if len(heap) == k and ring > 0:
+                # Every point in this ring and beyond is at least this far away
+                reach = (ring - 1) * size + margin
+                if reach * reach > -heap[0][0]:
+                    break
+            scan_rest = (2 * ring + 1) ** 2 > len(cells)
+            if scan_rest:
+                # Walking further rings costs more than visiting every occupied cell
+                # once, so take all cells not yet covered by the rings so far
+                buckets = [bucket for (i, j), bucket in cells.items()
+                           if max(abs(i - home_x), abs(j - home_y)) >= ring]
+            else:
+                buckets = map(cells.get, self._ring_cells(home_x, home_y, ring))
+            for bucket in buckets:
+                if bucket is None:
+                    continue
+                for x, y, point in bucket:
+                    distance = (x - cx) * (x - cx) + (y - cy) * (y - cy)
+                    if len(heap) < k:
+                        heapq.heappush(heap, (-distance, tiebreak, point))
+                    elif distance < -heap[0][0]:
+                        heapq.heapreplace(heap, (-distance, tiebreak, point))
+                    else:
+                        continue
+                    tiebreak += 1
+            if scan_rest:
+                break
+        return [entry[2] for entry in sorted(heap, key=lambda e: (-e[0], e[1]))]
+    
+    @staticmethod
+    def _ring_cells(home_x, home_y, ring):
+        """Cells at Chebyshev distance ring from (home_x, home_y)"""
+        if ring == 0:
+            yield home_x, home_y
+            return
+        for i in range(home_x - ring, home_x + ring + 1):
+            yield i, home_y - ring
+            yield i, home_y + ring
+        for j in range(home_y - ring + 1, home_y + ring):
+            yield home_x - ring, j
+            yield home_x + ring, j
+
+grid = SpatialGrid([Vector(0, 0), Vector(1, 1), Vector(3, 4), Vector(-2, 5), Vector(6, -1)])
+print(grid)
+print(f"Within 2 of (0, 0): {grid.within(Vector(0, 0), 2)}")
+print(f"3 nearest to (2, 2): {grid.nearest(Vector(2, 2), 3)}")
+grid.insert(Vector(2, 2))
+grid.remove(Vector(1, 1))
+print(f"After insert (2, 2) and remove (1, 1): nearest to (1.2, 1.2) is {grid.nearest(Vector(1.2, 1.2))[0]}, "
+      f"{len(grid)} points")
+try:
+    grid.remove(Vector(9, 9))
+except ValueError as e:
+    print(f"Error: {e}")
+
 print("\n=== COMPOSITION VS INHERITANCE ===")
 
 # Composition: "has-a" relationship
@@ -0,0 +1,23 @@
+"""Import the tutorial scripts by path
+
+The scripts' file names start with a number, so they cannot be imported by
+name. load_tutorial registers each one in sys.modules under an importable
+name, so `from bank_system import Bank` works afterwards, and worker
+processes can find the module's functions by that name.
+"""
+
+import importlib.util
+import os
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+def load_tutorial(relative_path, name):
+    """Load ROOT/relative_path once and register it as module `name`"""
+    if name in sys.modules:
+        return sys.modules[name]
+    spec = importlib.util.spec_from_file_location(name, os.path.join(ROOT, relative_path))
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[name] = module
+    spec.loader.exec_module(module)
+    return module
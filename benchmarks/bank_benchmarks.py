@@ -0,0 +1,465 @@
+"""
+⏱️ Bank System Benchmarks
+========================
+
+Times the optimized paths in projects/03_bank_system.py against their
+straightforward versions. Some runs take minutes at their default sizes,
+so they live here instead of in the tutorial script.
+
+Run from the repository root:
+    python benchmarks/bank_benchmarks.py
+"""
+
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from decimal import Decimal
+import os
+import random
+import tempfile
+import time
+import tracemalloc
+
+from _tutorial import load_tutorial
+
+load_tutorial("projects/03_bank_system.py", "bank_system")
+from bank_system import (Bank, BankClient, BankServer, BillingHistory, BusinessAccount, CheckingAccount,
+                         CreditCardAccount, EventStore, Money, OperationScheduler, PostingStatus, SavingsAccount,
+                         ShardedBank, StatementGenerator, TransactionLedger, VelocityRule, build_interest_bank)
+
+def run_transfer_stress(num_threads=8, transfers_per_thread=10000, num_accounts=100, seed=42):
+    """Hammer Bank.transfer from many threads and check no money is created or lost"""
+    stress_bank = Bank("Stress Bank", verify_aggregates=True)
+    account_types = ["savings", "checking", "business"]
+    for i in range(num_accounts):
+        stress_bank.create_account(account_types[i % 3], f"Holder {i}", 1000)
+    numbers = list(stress_bank.get_all_accounts())
+    
+    def net_total():
+        return sum(account.get_net_balance() for account in stress_bank.get_all_accounts().values())
+    
+    def worker(worker_id):
+        rng = random.Random(seed + worker_id)
+        applied = 0
+        for _ in range(transfers_per_thread):
+            source, destination = rng.sample(numbers, 2)
+            status = stress_bank._transfer(source, destination, rng.randint(1, 200))
+            applied += PostingStatus.is_success(status)
+        return applied
+    
+    total_before = net_total()
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=num_threads) as pool:
+        applied = sum(pool.map(worker, range(num_threads)))
+    elapsed = time.perf_counter() - start
+    total_after = net_total()
+    
+    assert total_before == total_after, f"Money changed: {total_before} -> {total_after}"
+    assert stress_bank.verify_aggregates(), "Running aggregates drifted"
+    attempted = num_threads * transfers_per_thread
+    return {"attempted": attempted, "applied": applied, "seconds": elapsed,
+            "transfers_per_sec": attempted / elapsed, "total": total_after}
+
+def run_persistence_benchmark(num_postings=1_000_000, num_accounts=1000, durability="batch",
+                              batch_size=10_000):
+    """Measure logged write throughput and crash-recovery time"""
+    with tempfile.TemporaryDirectory() as directory:
+        durable_bank = Bank.open("Durable Bank", directory, durability=durability)
+        for i in range(num_accounts):
+            durable_bank.create_account("checking", f"Holder {i}", 1000)
+        durable_bank.checkpoint()
+        
+        rng = random.Random(7)
+        numbers = [str(1000 + i) for i in range(num_accounts)]
+        start = time.perf_counter()
+        for batch_start in range(0, num_postings, batch_size):
+            rows = [(rng.choice(numbers), "deposit" if rng.random() < 0.6 else "withdraw", rng.randint(1, 100))
+                    for _ in range(min(batch_size, num_postings - batch_start))]
+            durable_bank.apply_batch(rows)
+        write_seconds = time.perf_counter() - start
+        expected = durable_bank.get_bank_info()
+        durable_bank.close()   # Simulate a shutdown; nothing else survives
+        
+        start = time.perf_counter()
+        recovered = Bank.open("Durable Bank", directory)
+        recovery_seconds = time.perf_counter() - start
+        assert recovered.get_bank_info() == expected, "Recovered bank does not match"
+        recovered.close()
+    return {"postings": num_postings, "writes_per_sec": num_postings / write_seconds,
+            "recovery_seconds": recovery_seconds}
+
+def run_money_benchmark(iterations=1_000_000):
+    """Time a deposit/withdraw loop with float, Decimal and integer-cent Money balances"""
+    results = {}
+    for label, convert in (("float", float), ("Decimal", Decimal), ("Money", Money), ("int cents", int)):
+        balance = convert(0)
+        if label == "float":
+            deposit, withdrawal = 0.10, 0.07
+        elif label == "int cents":
+            deposit, withdrawal = 10, 7
+        else:
+            deposit, withdrawal = convert("0.10"), convert("0.07")
+        start = time.perf_counter()
+        for _ in range(iterations):
+            balance += deposit
+            if withdrawal <= balance:
+                balance -= withdrawal
+        elapsed = time.perf_counter() - start
+        results[label] = {"ops_per_sec": 2 * iterations / elapsed, "balance": balance}
+    return results
+
+def _legacy_layout(account_class):
+    """Approximate the old account layout: a live __dict__, eager ledger/employee lists, no interning"""
+    def __init__(self, account_number, account_holder, *args, **kwargs):
+        account_class.__init__(self, account_number, account_holder, *args, **kwargs)
+        self._account_holder = account_holder
+        self._ledger = TransactionLedger()
+        self._observers = []
+        if isinstance(self, BusinessAccount):
+            self._employees = []
+        self.__dict__["_legacy"] = True
+    return type(f"Legacy{account_class.__name__}", (account_class,), {"__init__": __init__})
+
+def measure_account_memory(count=100_000, distinct_holders=1000):
+    """Report traced bytes per account for each account type, before and after compaction"""
+    results = {}
+    for account_class in (SavingsAccount, CheckingAccount, BusinessAccount, CreditCardAccount):
+        row = {}
+        for label, cls in (("before", _legacy_layout(account_class)), ("after", account_class)):
+            tracemalloc.start()
+            baseline = tracemalloc.get_traced_memory()[0]
+            accounts = [cls(str(100_000 + i), f"Holder {i % distinct_holders}") for i in range(count)]
+            row[label] = (tracemalloc.get_traced_memory()[0] - baseline) / count
+            tracemalloc.stop()
+            del accounts
+        results[account_class.__name__] = row
+    return results
+
+async def run_load_test(num_clients=16, requests_per_client=2000, pipeline_depth=32, num_accounts=50):
+    """Drive a local BankServer with pipelined clients and report latency percentiles"""
+    load_bank = Bank("Load Bank")
+    for i in range(num_accounts):
+        load_bank.create_account("checking", f"Client {i}", 1_000_000)
+    server = await BankServer(load_bank).start()
+    numbers = [str(1000 + i) for i in range(num_accounts)]
+    latencies = []
+    
+    async def one_client(client_id):
+        client = await BankClient.connect("127.0.0.1", server.port)
+        rng = random.Random(client_id)
+        window = asyncio.Semaphore(pipeline_depth)
+        
+        async def one_request():
+            async with window:
+                start = time.perf_counter()
+                choice = rng.random()
+                if choice < 0.45:
+                    await client.deposit(rng.choice(numbers), rng.randint(1, 100))
+                elif choice < 0.9:
+                    await client.withdraw(rng.choice(numbers), rng.randint(1, 100))
+                elif choice < 0.97:
+                    source, destination = rng.sample(numbers, 2)
+                    await client.transfer(source, destination, rng.randint(1, 100))
+                else:
+                    await client.balance(rng.choice(numbers))
+                latencies.append(time.perf_counter() - start)
+        
+        await asyncio.gather(*(one_request() for _ in range(requests_per_client)))
+        await client.close()
+    
+    start = time.perf_counter()
+    await asyncio.gather(*(one_client(i) for i in range(num_clients)))
+    elapsed = time.perf_counter() - start
+    await server.close()
+    
+    latencies.sort()
+    assert load_bank.verify_aggregates()
+    return {
+        "requests": len(latencies),
+        "ops_per_sec": len(latencies) / elapsed,
+        "p50_ms": latencies[len(latencies) // 2] * 1000,
+        "p99_ms": latencies[int(len(latencies) * 0.99)] * 1000,
+        "average_batch": server.get_batch_stats()["average_batch"],
+    }
+
+def run_event_rebuild_benchmark(num_events=10_000_000, num_accounts=1000, cores=(1, 2, 4, 8), seed=11):
+    """Fill an event store with synthetic postings and time a full rebuild for each core count"""
+    store = EventStore(checkpoint_every=max(num_events // 100, 1000))
+    rng = random.Random(seed)
+    for number in range(1000, 1000 + num_accounts):
+        store.append(number, EventStore.OPENED, 10_000_000, timestamp=0.0,
+                     text=("checking", f"Client {number}", "{}"))
+    for index in range(num_events - num_accounts):
+        number = 1000 + rng.randrange(num_accounts)
+        cents = rng.randrange(1, 10_000)
+        if index & 1:
+            store.append(number, TransactionLedger.DEPOSIT, cents, cents, 0, float(index))
+        else:
+            store.append(number, TransactionLedger.WITHDRAWAL, cents, -cents, 0, float(index))
+    
+    timings = {}
+    baseline = None
+    for workers in cores:
+        start = time.perf_counter()
+        projections = store.project(workers)
+        timings[workers] = time.perf_counter() - start
+        balances = {number: projection[3][0] for number, projection in projections.items()}
+        assert baseline is None or balances == baseline
+        baseline = balances
+    
+    # Point-in-time queries replay from the nearest checkpoint, not from zero
+    start = time.perf_counter()
+    for _ in range(1000):
+        store.balance_as_of(1000 + rng.randrange(num_accounts), rng.randrange(1, num_events + 1))
+    query_seconds = (time.perf_counter() - start) / 1000
+    return {"events": len(store), "rebuild_seconds": timings, "as_of_query_ms": query_seconds * 1000}
+
+def run_sharding_benchmark(worker_counts=(1, 2, 4, 8), num_accounts=1000, num_postings=400_000,
+                           batch_size=10_000, num_transfers=2000, seed=5):
+    """Throughput of batched postings and cross-shard transfers for each worker count"""
+    results = {}
+    for num_workers in worker_counts:
+        sharded = ShardedBank("Benchmark Bank", num_workers)
+        for i in range(num_accounts):
+            sharded.create_account("checking", f"Client {i}", 1_000_000)
+        rng = random.Random(seed)
+        numbers = [str(1000 + i) for i in range(num_accounts)]
+        postings = [(rng.choice(numbers), "deposit" if rng.random() < 0.5 else "withdraw", rng.randint(1, 100))
+                    for _ in range(num_postings)]
+        
+        start = time.perf_counter()
+        for offset in range(0, num_postings, batch_size):
+            sharded.apply_batch(postings[offset:offset + batch_size])
+        posting_seconds = time.perf_counter() - start
+        
+        start = time.perf_counter()
+        for _ in range(num_transfers):
+            source, destination = rng.sample(numbers, 2)
+            sharded._transfer(source, destination, rng.randint(1, 100))
+        transfer_seconds = time.perf_counter() - start
+        
+        sharded.close()
+        results[num_workers] = {"postings_per_sec": num_postings / posting_seconds,
+                                "transfers_per_sec": num_transfers / transfer_seconds}
+    return results
+
+def run_rules_benchmark(operations=500_000, repeats=5):
+    """Per-withdrawal cost with and without a velocity rule (best of several runs)"""
+    def best_time(add_rule):
+        best = float("inf")
+        amount = Money(1)
+        for _ in range(repeats):
+            account = CheckingAccount("1", "Bench", 10_000_000)
+            if add_rule:
+                account.add_rule(VelocityRule(max_count=operations + 1, window_seconds=3600))
+            withdraw = account._apply_withdrawal
+            start = time.perf_counter()
+            for _ in range(operations):
+                withdraw(amount)
+            best = min(best, time.perf_counter() - start)
+        return best / operations
+    
+    plain_seconds = best_time(False)
+    guarded_seconds = best_time(True)
+    return {"plain_ns": plain_seconds * 1e9, "with_rule_ns": guarded_seconds * 1e9,
+            "overhead_ns": (guarded_seconds - plain_seconds) * 1e9}
+
+def run_statement_benchmark(num_accounts=2000, postings_per_account=200, workers=(1, 2, 4), seed=8):
+    """Time statement generation per worker count and measure peak memory in-process"""
+    history_bank = Bank("Statement Bank")
+    rng = random.Random(seed)
+    for i in range(num_accounts):
+        history_bank.create_account("checking", f"Client {i}", 100_000)
+    postings = [(str(1000 + rng.randrange(num_accounts)), "deposit" if rng.random() < 0.5 else "withdraw",
+                 rng.randint(1, 500)) for _ in range(num_accounts * postings_per_account)]
+    history_bank.apply_batch(postings)
+    
+    timings = {}
+    with tempfile.TemporaryDirectory() as directory:
+        for count in workers:
+            start = time.perf_counter()
+            StatementGenerator(history_bank, os.path.join(directory, str(count)), "csv").generate(count)
+            timings[count] = time.perf_counter() - start
+        
+        tracemalloc.start()
+        StatementGenerator(history_bank, os.path.join(directory, "memory"), "csv").generate()
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+    return {"rows": len(postings), "seconds": timings, "peak_bytes": peak}
+
+def run_scheduler_benchmark(num_schedules=1_000_000, idle_ticks=100_000):
+    """Cost of idle ticks, of one firing batch, and of catching up a year of downtime"""
+    start_time = 0.0
+    scheduler = OperationScheduler(resolution=3600.0)
+    accounts = []
+    for i in range(num_schedules):
+        account = (SavingsAccount(str(i), "Bench", 10_000) if i % 2 else
+                   BusinessAccount(str(i), "Bench", 1_000_000))
+        accounts.append(account)
+        # Spread first due dates over one month, one slot per hour
+        scheduler.schedule(account, OperationScheduler.INTEREST if i % 2 else OperationScheduler.MONTHLY_FEE,
+                           start_time + (i % 720) * 3600.0)
+    
+    start = time.perf_counter()
+    for step in range(idle_ticks):
+        scheduler.tick(-1.0 - step)
+    idle_ns = (time.perf_counter() - start) / idle_ticks * 1e9
+    
+    start = time.perf_counter()
+    fired = scheduler.tick(start_time + OperationScheduler.MONTH - 1)
+    batch_seconds = time.perf_counter() - start
+    
+    # Twelve months of downtime cost one posting per schedule, but interest is
+    # still rounded period by period, so the work grows with the periods missed
+    start = time.perf_counter()
+    caught_up = scheduler.tick(start_time + 13 * OperationScheduler.MONTH - 1)
+    catch_up_seconds = time.perf_counter() - start
+    return {"schedules": len(scheduler), "idle_tick_ns": idle_ns,
+            "fired": fired, "fire_per_sec": fired / batch_seconds,
+            "caught_up_periods": caught_up, "catch_up_seconds": catch_up_seconds}
+
+def run_billing_benchmark(num_purchases=100_000, queries=10_000, seed=4):
+    """Interest over random periods: prefix sums versus replaying every posting"""
+    rng = random.Random(seed)
+    card = CreditCardAccount("3000", "Bench", credit_limit=10**9)
+    start_time = 1_700_000_000.0
+    timestamp = start_time
+    for index in range(num_purchases):
+        timestamp += rng.uniform(0, 600)
+        if index % 10 == 9:
+            card.make_payment(min(card._credit_used, Money(rng.randint(1, 2000))), timestamp)
+        else:
+            card.make_purchase(rng.randint(1, 200), timestamp)
+    end_time = timestamp
+    
+    def replayed_interest(period_start, period_end):
+        # Walk every posting, as a ledger without prefix sums would have to
+        ticks = BillingHistory.ticks
+        owed = 0
+        last = ticks(period_start)
+        cent_ticks = 0
+        for when, after in zip(card._billing._times, card._billing._owed):
+            if when > period_end:
+                break
+            if when > period_start:
+                cent_ticks += owed * (ticks(when) - last)
+                last = ticks(when)
+            owed = after
+        cent_ticks += owed * (ticks(period_end) - last)
+        year = 365 * card.SECONDS_PER_DAY * BillingHistory.TICKS_PER_SECOND
+        return Money.from_cents(round(cent_ticks * Money._ratio(card._apr) / year))
+    
+    periods = [sorted(rng.uniform(start_time, end_time) for _ in range(2)) for _ in range(queries)]
+    start = time.perf_counter()
+    fast = [card.interest_for(period_start, period_end) for period_start, period_end in periods]
+    prefix_us = (time.perf_counter() - start) / queries * 1e6
+    
+    sample = periods[:20]
+    start = time.perf_counter()
+    slow = [replayed_interest(period_start, period_end) for period_start, period_end in sample]
+    replay_us = (time.perf_counter() - start) / len(sample) * 1e6
+    assert fast[:len(sample)] == slow
+    return {"postings": len(card._billing), "prefix_us": prefix_us, "replay_us": replay_us}
+
+def run_view_benchmark(num_accounts=100_000, num_entries=100_000, calls=100):
+    """Cost per call of copying versus handing out a view"""
+    view_bank = Bank("View Bank")
+    for i in range(num_accounts):
+        view_bank._register_account(CheckingAccount(str(1000 + i), "Holder"))
+    account = view_bank.get_account("1000")
+    for _ in range(num_entries):
+        account._post(TransactionLedger.DEPOSIT, Money(1), Money(1))
+    
+    timings = {}
+    for label, call in (("accounts copy", view_bank._accounts.copy),
+                        ("accounts view", view_bank.get_all_accounts),
+                        ("transactions copy", lambda: list(account.get_ledger())),
+                        ("transactions view", account.get_transactions)):
+        start = time.perf_counter()
+        for _ in range(calls):
+            call()
+        timings[label] = (time.perf_counter() - start) / calls * 1e6
+    return timings
+
+def main():
+    """Time the optimized paths against their straightforward versions"""
+    print("\n=== BENCHMARKS ===")
+    print("\n=== Concurrent Transfers ===")
+    stress = run_transfer_stress(num_threads=4, transfers_per_thread=2000)
+    print(f"Stress: {stress['applied']}/{stress['attempted']} transfers applied in "
+          f"{stress['seconds']:.2f}s ({stress['transfers_per_sec']:,.0f}/s), total unchanged at ${stress['total']}")
+    
+    print("\n=== Persistence (Write-Ahead Log + Snapshots) ===")
+    benchmark = run_persistence_benchmark(num_postings=20_000, num_accounts=100)
+    print(f"WAL benchmark: {benchmark['writes_per_sec']:,.0f} postings/s, "
+          f"recovery of {benchmark['postings']:,} postings in {benchmark['recovery_seconds']:.3f}s")
+    
+    print("\n=== Bank-wide Interest Accrual ===")
+    one_by_one = build_interest_bank(2000)
+    start = time.perf_counter()
+    for account in one_by_one.get_all_accounts().values():
+        account.add_interest()
+    loop_seconds = time.perf_counter() - start
+    
+    batched = build_interest_bank(2000)
+    start = time.perf_counter()
+    batched.accrue_interest()
+    batch_seconds = time.perf_counter() - start
+    print(f"Per-account loop: {loop_seconds * 1000:.1f} ms, accrue_interest: {batch_seconds * 1000:.1f} ms")
+    
+    print("\n=== Exact Money Engine ===")
+    money_benchmark = run_money_benchmark(200_000)
+    for label, result in money_benchmark.items():
+        print(f"{label:>9}: {result['ops_per_sec']:>12,.0f} ops/s, final balance {result['balance']}")
+    print(f"Float drift after 200,000 iterations: {float(money_benchmark['Money']['balance']) - money_benchmark['float']['balance']:.10f}")
+    
+    print("\n=== Compact Account Memory ===")
+    for name, row in measure_account_memory(count=5_000).items():
+        print(f"{name:>18}: {row['before']:>7.0f} -> {row['after']:>5.0f} bytes per account")
+    
+    print("\n=== Async Bank Service ===")
+    load = asyncio.run(run_load_test(num_clients=4, requests_per_client=500))
+    print(f"Load test: {load['requests']:,} requests, {load['ops_per_sec']:,.0f} ops/s, "
+          f"p50 {load['p50_ms']:.2f} ms, p99 {load['p99_ms']:.2f} ms, average batch {load['average_batch']:.1f}")
+    
+    print("\n=== Audit Log Replay ===")
+    event_benchmark = run_event_rebuild_benchmark(num_events=200_000, cores=(1, 2, 4))
+    print(f"Rebuild of {event_benchmark['events']:,} events on {os.cpu_count()} CPU(s): "
+          + ", ".join(f"{workers} worker(s) {seconds:.2f}s" for workers, seconds in event_benchmark["rebuild_seconds"].items())
+          + f"; as-of query {event_benchmark['as_of_query_ms']:.2f} ms")
+    
+    print("\n=== Sharded Multi-Process Bank ===")
+    sharding = run_sharding_benchmark(worker_counts=(1, 2, 4), num_postings=100_000, num_transfers=500)
+    print(f"Scaling on {os.cpu_count()} CPU(s):")
+    for num_workers, numbers in sharding.items():
+        print(f"  {num_workers} worker(s): {numbers['postings_per_sec']:,.0f} postings/s, "
+              f"{numbers['transfers_per_sec']:,.0f} transfers/s")
+    
+    print("\n=== Withdrawal Rules ===")
+    rules_benchmark = run_rules_benchmark(100_000)
+    print(f"Withdrawal: {rules_benchmark['plain_ns']:.0f} ns without rules, "
+          f"{rules_benchmark['with_rule_ns']:.0f} ns with a velocity rule "
+          f"(overhead {rules_benchmark['overhead_ns']:.0f} ns)")
+    
+    print("\n=== Streaming Statements ===")
+    statements = run_statement_benchmark(num_accounts=500, postings_per_account=100, workers=(1, 2))
+    print(f"{statements['rows']:,} rows on {os.cpu_count()} CPU(s): "
+          + ", ".join(f"{count} worker(s) {seconds:.2f}s" for count, seconds in statements["seconds"].items())
+          + f"; peak memory while streaming {statements['peak_bytes'] / 1024:.0f} KiB")
+    
+    print("\n=== Scheduled Operations ===")
+    scheduling = run_scheduler_benchmark(num_schedules=100_000, idle_ticks=100_000)
+    print(f"{scheduling['schedules']:,} schedules: idle tick {scheduling['idle_tick_ns']:.0f} ns, "
+          f"fired {scheduling['fired']:,} at {scheduling['fire_per_sec']:,.0f}/s, "
+          f"caught up {scheduling['caught_up_periods']:,} periods in {scheduling['catch_up_seconds']:.2f}s")
+    
+    print("\n=== Credit Card Statements ===")
+    billing = run_billing_benchmark()
+    print(f"Interest over a random period with {billing['postings']:,} postings: "
+          f"{billing['prefix_us']:.1f} us with prefix sums, {billing['replay_us']:,.0f} us replaying")
+    
+    print("\n=== Copy-Free Views ===")
+    for label, microseconds in run_view_benchmark(num_accounts=50_000, num_entries=20_000, calls=20).items():
+        print(f"{label:>17}: {microseconds:>10,.1f} us per call")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,262 @@
+"""
+⏱️ Library Benchmarks
+====================
+
+Times the Library catalogue indexes in exercises/02_oop_exercises.py
+against plain scans, and runs the circulation stress test.
+
+Run from the repository root:
+    python benchmarks/library_benchmarks.py
+"""
+
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+import os
+import random
+import sys
+import tempfile
+import time
+
+from _tutorial import load_tutorial
+
+load_tutorial("exercises/02_oop_exercises.py", "oop_exercises")
+from oop_exercises import CatalogueFile, Library
+
+def generate_catalogue(count, seed=1):
+    """Synthetic (title, author, isbn) rows with a realistic spread of words"""
+    rng = random.Random(seed)
+    syllables = [consonant + vowel for consonant in "bdfgklmnprstvz" for vowel in "aeiou"]
+    vocabulary = sorted({"".join(rng.choice(syllables) for _ in range(rng.randint(2, 4))) for _ in range(50_000)})
+    surnames = vocabulary[:5000]
+    for i in range(count):
+        title = " ".join(rng.choice(vocabulary).capitalize() for _ in range(rng.randint(2, 5)))
+        author = f"{rng.choice(surnames).capitalize()} {rng.choice(surnames).capitalize()}"
+        yield title, author, f"978-{i:010d}"
+
+def list_scan_search(books, query):
+    """The original search: lowercase every title and author on every query"""
+    return [book for book in books
+            if query.lower() in book["title"].lower() or query.lower() in book["author"].lower()]
+
+def run_search_benchmark(count=1_000_000, queries=200, seed=2):
+    """Average search latency of the indexed catalogue versus a list scan"""
+    catalogue = Library("Benchmark Library")
+    rows = list(generate_catalogue(count))
+    start = time.perf_counter()
+    for title, author, isbn in rows:
+        catalogue.add_book(title, author, isbn)
+    catalogue.search_books(rows[0][0])     # the first search sorts the newly seen words
+    build_seconds = time.perf_counter() - start
+    books = list(catalogue._books.values())
+    
+    rng = random.Random(seed)
+    sample_titles = [rng.choice(rows)[0] for _ in range(queries)]
+    workloads = {
+        "word": [title.split()[0] for title in sample_titles],
+        "substring": [title.split()[-1][1:5] for title in sample_titles],
+        "phrase": [title.lower()[2:14] for title in sample_titles],
+    }
+    results = {"books": count, "build_seconds": build_seconds}
+    for label, workload in workloads.items():
+        start = time.perf_counter()
+        indexed = [catalogue.search_books(query) for query in workload]
+        results[f"{label}_ms"] = (time.perf_counter() - start) / len(workload) * 1000
+        results[f"{label}_hits"] = sum(map(len, indexed)) / len(workload)
+        scan_sample = workload[:5]
+        start = time.perf_counter()
+        scanned = [list_scan_search(books, query) for query in scan_sample]
+        results[f"{label}_scan_ms"] = (time.perf_counter() - start) / len(scan_sample) * 1000
+        assert indexed[:5] == scanned
+    start = time.perf_counter()
+    for query in workloads["word"]:
+        catalogue.search_books(query[:3], prefix=True)
+    results["prefix_ms"] = (time.perf_counter() - start) / queries * 1000
+    return results
+
+def generate_typo_queries(rows, count, seed=4):
+    """(query, isbn) pairs: a catalogue title with a typo in up to two of its words"""
+    rng = random.Random(seed)
+    letters = "abcdefghijklmnopqrstuvwxyz"
+    queries = []
+    for _ in range(count):
+        title, _, isbn = rng.choice(rows)
+        words = title.lower().split()
+        for number in rng.sample(range(len(words)), min(2, len(words))):
+            word = words[number]
+            position = rng.randrange(len(word) - 1)
+            typo = rng.choice(("drop", "swap", "replace", "insert"))
+            if typo == "drop":
+                word = word[:position] + word[position + 1:]
+            elif typo == "swap":
+                word = word[:position] + word[position + 1] + word[position] + word[position + 2:]
+            elif typo == "replace":
+                word = word[:position] + rng.choice(letters) + word[position + 1:]
+            else:
+                word = word[:position] + rng.choice(letters) + word[position:]
+            words[number] = word
+        queries.append((" ".join(words), isbn))
+    return queries
+
+def run_fuzzy_benchmark(count=1_000_000, queries=200, limit=10, seed=4):
+    """Latency and recall of fuzzy_search_books on misspelt catalogue titles"""
+    catalogue = Library("Fuzzy Library")
+    rows = list(generate_catalogue(count))
+    for title, author, isbn in rows:
+        catalogue.add_book(title, author, isbn)
+    start = time.perf_counter()
+    catalogue.fuzzy_search_books(rows[0][0], limit)     # the first fuzzy search builds the trigram index
+    results = {"books": count, "trigram_seconds": time.perf_counter() - start}
+    
+    workload = generate_typo_queries(rows, queries, seed)
+    latencies, found, exact_found = [], 0, 0
+    for query, isbn in workload:
+        start = time.perf_counter()
+        books = catalogue.fuzzy_search_books(query, limit)
+        latencies.append(time.perf_counter() - start)
+        found += any(book["isbn"] == isbn for book in books)
+        exact_found += bool(catalogue.search_books(query))
+    latencies.sort()
+    results["mean_ms"] = sum(latencies) / len(latencies) * 1000
+    results["p95_ms"] = latencies[int(len(latencies) * 0.95)] * 1000
+    results["recall"] = found / len(workload)
+    results["exact_recall"] = exact_found / len(workload)
+    return results
+
+def run_load_benchmark(count=5_000_000, lookups=1000, seed=3):
+    """Cold start from a catalogue file versus calling add_book for every title"""
+    results = {"books": count}
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "catalogue.lib")
+        start = time.perf_counter()
+        CatalogueFile.write(path, "Benchmark Library", generate_catalogue(count), Library._row_words)
+        results["write_seconds"] = time.perf_counter() - start
+        results["file_mb"] = os.path.getsize(path) / 1e6
+        
+        start = time.perf_counter()
+        catalogue = Library.load(path)
+        results["stats"] = catalogue.get_library_stats()
+        results["load_seconds"] = time.perf_counter() - start
+        
+        catalogue.add_member("Reader", "M900")
+        rng = random.Random(seed)
+        isbns = [f"978-{rng.randrange(count):010d}" for _ in range(lookups)]
+        sample_title = catalogue._books[isbns[0]]["title"]
+        start = time.perf_counter()
+        for isbn in isbns:
+            catalogue.check_out_book(isbn, "Reader")
+        results["checkout_us"] = (time.perf_counter() - start) / lookups * 1e6
+        
+        # The first search sorts the vocabulary for prefix and substring lookups
+        start = time.perf_counter()
+        catalogue.search_books(sample_title)
+        results["first_search_seconds"] = time.perf_counter() - start
+        start = time.perf_counter()
+        hits = catalogue.search_books(sample_title.split()[-1][1:5])
+        results["search_ms"] = (time.perf_counter() - start) * 1000
+        results["search_hits"] = len(hits)
+        
+        sample = list(generate_catalogue(min(count, 100_000), seed=seed))
+        library = Library("Baseline Library")
+        start = time.perf_counter()
+        for title, author, isbn in sample:
+            library.add_book(title, author, isbn)
+        results["add_book_seconds"] = (time.perf_counter() - start) * count / len(sample)
+    return results
+
+def run_circulation_stress(num_threads=8, operations_per_thread=20000, num_books=500, num_members=100, seed=7):
+    """Check out, return and hold books from many threads and check no copy is lent twice"""
+    circulation = Library("Stress Library")
+    for title, author, isbn in generate_catalogue(num_books, seed=seed):
+        circulation.add_book(title, author, isbn)
+    isbns = list(circulation._books)
+    members = [f"S{i:03d}" for i in range(num_members)]
+    for member_id in members:
+        circulation.add_member(f"Reader {member_id}", member_id)
+    
+    def worker(worker_id):
+        rng = random.Random(seed + worker_id)
+        lent, returned = Counter(), Counter()
+        for _ in range(operations_per_thread):
+            roll = rng.random()
+            isbn, member = rng.choice(isbns), rng.choice(members)
+            if roll < 0.5:
+                if circulation.check_out_book(isbn, member_id=member).startswith("Checked out"):
+                    lent[isbn] += 1
+            elif roll < 0.6:
+                batch = rng.sample(isbns, 3)
+                if circulation.check_out_books(batch, member_id=member).startswith("Checked out"):
+                    lent.update(batch)
+            elif roll < 0.7:
+                circulation.place_hold(isbn, member_id=member)
+            else:
+                message = circulation.return_book(isbn)
+                if message.startswith("Returned"):
+                    returned[isbn] += 1
+                    if message.endswith("(on hold)"):
+                        lent[isbn] += 1
+        return lent, returned
+    
+    # Switch threads far more often than usual to provoke races
+    switch_interval = sys.getswitchinterval()
+    sys.setswitchinterval(1e-5)
+    try:
+        start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=num_threads) as pool:
+            tallies = list(pool.map(worker, range(num_threads)))
+        elapsed = time.perf_counter() - start
+    finally:
+        sys.setswitchinterval(switch_interval)
+    
+    lent, returned = Counter(), Counter()
+    for worker_lent, worker_returned in tallies:
+        lent.update(worker_lent)
+        returned.update(worker_returned)
+    on_loan = circulation._checked_out
+    # Each copy was lent once more than it was returned if it is out now, else equally often
+    for isbn in isbns:
+        assert lent[isbn] - returned[isbn] == (isbn in on_loan), \
+            f"{isbn} lent {lent[isbn]} times but returned {returned[isbn]} times"
+    holders = Counter(isbn for member in circulation._members.values() for isbn in member["loans"])
+    assert set(holders) == set(on_loan) and max(holders.values(), default=1) == 1, "A copy is on two members' loans"
+    assert all(not circulation._books[isbn]["available"] for isbn in on_loan)
+    assert sum(circulation._available_counts) == num_books - len(on_loan), "Available counters drifted"
+    
+    checkouts = sum(lent.values())
+    operations = num_threads * operations_per_thread
+    return {"operations": operations, "checkouts": checkouts, "seconds": elapsed,
+            "operations_per_sec": operations / elapsed, "checkouts_per_sec": checkouts / elapsed,
+            "on_loan": len(on_loan), "holds": sum(len(queue) for queue in circulation._holds.values())}
+
+def main():
+    """Time the library indexes against plain scans"""
+    print("\n=== Catalogue Search ===")
+    search = run_search_benchmark(count=100_000)
+    print(f"{search['books']:,} books indexed in {search['build_seconds']:.1f}s")
+    for label in ("word", "substring", "phrase"):
+        print(f"{label:>9} query: {search[label + '_ms']:.3f} ms indexed, {search[label + '_scan_ms']:.1f} ms list scan "
+              f"({search[label + '_hits']:.0f} hits on average)")
+    print(f"   prefix query: {search['prefix_ms']:.3f} ms indexed")
+    
+    print("\n=== Fuzzy Search ===")
+    fuzzy = run_fuzzy_benchmark(count=100_000)
+    print(f"{fuzzy['books']:,} books, trigram index built in {fuzzy['trigram_seconds']:.2f}s")
+    print(f"Misspelt titles: {fuzzy['mean_ms']:.2f} ms mean, {fuzzy['p95_ms']:.2f} ms p95, "
+          f"intended book in the top 10 for {fuzzy['recall']:.0%} (substring search finds anything for {fuzzy['exact_recall']:.0%})")
+    
+    print("\n=== Catalogue Files ===")
+    load = run_load_benchmark(count=200_000)
+    print(f"{load['books']:,} books written in {load['write_seconds']:.2f}s ({load['file_mb']:.1f} MB)")
+    print(f"Cold start: {load['load_seconds'] * 1000:.2f} ms -> {load['stats']}")
+    print(f"Check-out by ISBN: {load['checkout_us']:.1f} us, first search: {load['first_search_seconds']:.2f}s, "
+          f"then {load['search_ms']:.2f} ms for a substring query ({load['search_hits']} hits)")
+    print(f"add_book for every title: {load['add_book_seconds']:.2f}s")
+    
+    print("\n=== Concurrent Circulation ===")
+    stress = run_circulation_stress(num_threads=8, operations_per_thread=5000)
+    print(f"Stress: {stress['operations']:,} operations on 8 threads in {stress['seconds']:.2f}s "
+          f"({stress['operations_per_sec']:,.0f}/s), {stress['checkouts']:,} check-outs "
+          f"({stress['checkouts_per_sec']:,.0f}/s), no copy lent twice; "
+          f"{stress['on_loan']} on loan, {stress['holds']} holds waiting")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,203 @@
+"""
+⏱️ Vector Benchmarks
+===================
+
+Times Vector, VectorArray and SpatialGrid from
+15_oop_advanced/02_advanced_concepts.py against their plain versions.
+
+Run from the repository root:
+    python benchmarks/vector_benchmarks.py
+"""
+
+from array import array
+import heapq
+import math
+import random
+import time
+import tracemalloc
+
+from _tutorial import load_tutorial
+
+load_tutorial("15_oop_advanced/02_advanced_concepts.py", "advanced_concepts")
+from advanced_concepts import SpatialGrid, Vector, VectorArray
+
+def run_vector_sort_benchmark(count=1_000_000, seed=3):
+    """Sort vectors by magnitude: the dict-based, sqrt-comparing Vector against the slotted one"""
+    class PlainVector:
+        """Vector as it was: a __dict__ per instance, comparisons through magnitude()"""
+        
+        def __init__(self, x, y):
+            self.x = x
+            self.y = y
+        
+        def __lt__(self, other):
+            if isinstance(other, PlainVector):
+                return self.magnitude() < other.magnitude()
+            return False
+        
+        def magnitude(self):
+            return (self.x ** 2 + self.y ** 2) ** 0.5
+    
+    rng = random.Random(seed)
+    components = [(rng.uniform(-100, 100), rng.uniform(-100, 100)) for _ in range(count)]
+    results = {"vectors": count}
+    for label, cls in (("plain", PlainVector), ("slotted", Vector)):
+        tracemalloc.start()
+        vectors = [cls(x, y) for x, y in components]
+        results[f"{label}_bytes"] = tracemalloc.get_traced_memory()[0] / count
+        tracemalloc.stop()
+        start = time.perf_counter()
+        ordered = sorted(vectors)
+        results[f"{label}_sort_s"] = time.perf_counter() - start
+        results[f"{label}_order"] = [vector.magnitude() for vector in ordered]
+    # x ** 2 and x * x may round differently, so compare the orders up to rounding
+    assert all(math.isclose(plain, slotted, rel_tol=1e-12)
+               for plain, slotted in zip(results["plain_order"], results["slotted_order"])), "Slotted Vector sorts differently"
+    del results["plain_order"], results["slotted_order"]
+    
+    # The cached squared magnitude also works as a key function: one call per vector
+    vectors = [Vector(x, y) for x, y in components]
+    start = time.perf_counter()
+    vectors.sort(key=Vector.squared_magnitude)
+    results["key_sort_s"] = time.perf_counter() - start
+    
+    # In place: no new Vector per step
+    step = Vector(0.5, -0.25)
+    position = Vector(0.0, 0.0)
+    start = time.perf_counter()
+    for _ in range(count):
+        position = position + step
+    results["add_s"] = time.perf_counter() - start
+    position = Vector(0.0, 0.0)
+    start = time.perf_counter()
+    for _ in range(count):
+        position += step
+    results["iadd_s"] = time.perf_counter() - start
+    return results
+
+def run_vector_array_benchmark(count=10_000_000, seed=1):
+    """Time bulk operations on a list of Vectors against the same points in a VectorArray"""
+    rng = random.Random(seed)
+    xs = array("d", (rng.uniform(-100, 100) for _ in range(count)))
+    ys = array("d", (rng.uniform(-100, 100) for _ in range(count)))
+    points = VectorArray(xs, ys)
+    vectors = points.to_vectors()
+    direction = Vector(0.6, 0.8)
+    
+    workloads = {
+        "add": (lambda: [v + v for v in vectors], lambda: points + points),
+        "scale": (lambda: [v * 2.5 for v in vectors], lambda: points * 2.5),
+        "dot": (lambda: [v.x * direction.x + v.y * direction.y for v in vectors], lambda: points.dot(direction)),
+        "magnitude": (lambda: [v.magnitude() for v in vectors], lambda: points.magnitudes()),
+        "normalize": (lambda: [v / v.magnitude() for v in vectors], lambda: points.normalized()),
+        "compare": (lambda: [v < direction for v in vectors], lambda: points.lt(direction)),
+    }
+    results = {"points": count}
+    for label, (objects, columns) in workloads.items():
+        start = time.perf_counter()
+        expected = objects()
+        results[f"{label}_list_s"] = time.perf_counter() - start
+        start = time.perf_counter()
+        actual = columns()
+        results[f"{label}_array_s"] = time.perf_counter() - start
+        # Same answers, up to rounding (hypot and ** 0.5 may differ in the last bit)
+        for index in range(0, count, max(1, count // 1000)):
+            want, got = expected[index], actual[index]
+            if isinstance(want, Vector):
+                assert math.isclose(want.x, got.x, abs_tol=1e-12) and math.isclose(want.y, got.y, abs_tol=1e-12)
+            elif isinstance(want, bool):
+                assert want == bool(got)
+            else:
+                assert math.isclose(want, got, rel_tol=1e-12)
+        del expected, actual
+    
+    # Memory per point, measured on a sample
+    sample = min(count, 100_000)
+    tracemalloc.start()
+    sample_vectors = [Vector(x, y) for x, y in zip(xs[:sample], ys[:sample])]
+    results["list_bytes_per_point"] = tracemalloc.get_traced_memory()[0] / sample
+    tracemalloc.stop()
+    del sample_vectors
+    results["array_bytes_per_point"] = (points._xs.itemsize + points._ys.itemsize)
+    return results
+
+def run_spatial_index_benchmark(count=2_000_000, queries=1_000, brute_queries=5, k=10, seed=5):
+    """Time SpatialGrid queries against a linear scan with magnitude()"""
+    rng = random.Random(seed)
+    points = [Vector(rng.uniform(-1000, 1000), rng.uniform(-1000, 1000)) for _ in range(count)]
+    probes = [Vector(rng.uniform(-1000, 1000), rng.uniform(-1000, 1000)) for _ in range(queries)]
+    # A radius that catches about 50 points on average
+    radius = math.sqrt(50 * 2000 * 2000 / (math.pi * count))
+    results = {"points": count, "radius": radius, "k": k}
+    
+    start = time.perf_counter()
+    grid = SpatialGrid(points)
+    results["build_s"] = time.perf_counter() - start
+    
+    start = time.perf_counter()
+    for probe in probes:
+        grid.within(probe, radius)
+    results["within_grid_s"] = (time.perf_counter() - start) / queries
+    start = time.perf_counter()
+    for probe in probes:
+        grid.nearest(probe, k)
+    results["nearest_grid_s"] = (time.perf_counter() - start) / queries
+    
+    # Brute force on a few probes, checking the grid gives the same answers
+    brute_within = brute_nearest = 0.0
+    for probe in probes[:brute_queries]:
+        start = time.perf_counter()
+        expected = [p for p in points if (p - probe).magnitude() <= radius]
+        brute_within += time.perf_counter() - start
+        assert {id(p) for p in grid.within(probe, radius)} == {id(p) for p in expected}
+        start = time.perf_counter()
+        expected = heapq.nsmallest(k, points, key=lambda p: (p - probe).magnitude())
+        brute_nearest += time.perf_counter() - start
+        got = grid.nearest(probe, k)
+        assert [math.isclose((p - probe).magnitude(), (q - probe).magnitude(), rel_tol=1e-9)
+                for p, q in zip(got, expected)] == [True] * k
+    results["within_brute_s"] = brute_within / brute_queries
+    results["nearest_brute_s"] = brute_nearest / brute_queries
+    
+    # Churn: move a slice of points (remove + insert) and re-check a query
+    moved = points[: min(count, 100_000)]
+    start = time.perf_counter()
+    for point in moved:
+        grid.remove(point)
+        point.x, point.y = rng.uniform(-1000, 1000), rng.uniform(-1000, 1000)
+        grid.insert(point)
+    results["update_per_s"] = len(moved) / (time.perf_counter() - start)
+    probe = probes[0]
+    assert {id(p) for p in grid.within(probe, radius)} == {id(p) for p in points if (p - probe).magnitude() <= radius}
+    assert len(grid) == count
+    return results
+
+def main():
+    """Time the vector and spatial index types against their plain versions"""
+    print("\n=== SLOTTED VECTORS ===")
+    sort_bench = run_vector_sort_benchmark(count=200_000)
+    print(f"{sort_bench['vectors']:,} vectors: {sort_bench['plain_bytes']:.0f} -> {sort_bench['slotted_bytes']:.0f} bytes each")
+    print(f"sorted(): {sort_bench['plain_sort_s']:.2f}s comparing magnitudes, {sort_bench['slotted_sort_s']:.2f}s comparing "
+          f"cached squared magnitudes ({sort_bench['plain_sort_s'] / sort_bench['slotted_sort_s']:.1f}x), "
+          f"{sort_bench['key_sort_s']:.2f}s with key=Vector.squared_magnitude")
+    print(f"position = position + step: {sort_bench['add_s'] * 1000:.0f} ms, position += step: {sort_bench['iadd_s'] * 1000:.0f} ms")
+    
+    print("\n=== STRUCT-OF-ARRAYS VECTORS ===")
+    vector_bench = run_vector_array_benchmark(count=1_000_000)
+    print(f"{vector_bench['points']:,} points: {vector_bench['list_bytes_per_point']:.0f} bytes each as Vectors, "
+          f"{vector_bench['array_bytes_per_point']} in a VectorArray")
+    for label in ("add", "scale", "dot", "magnitude", "normalize", "compare"):
+        list_seconds, array_seconds = vector_bench[f"{label}_list_s"], vector_bench[f"{label}_array_s"]
+        print(f"{label:>9}: list of Vector {list_seconds * 1000:7.1f} ms, VectorArray {array_seconds * 1000:6.1f} ms "
+              f"({list_seconds / array_seconds:.1f}x)")
+    
+    print("\n=== SPATIAL INDEX ===")
+    spatial_bench = run_spatial_index_benchmark(count=200_000, queries=500, brute_queries=3)
+    print(f"{spatial_bench['points']:,} points indexed in {spatial_bench['build_s']:.2f}s")
+    for label, name in (("within", f"within r={spatial_bench['radius']:.1f}"), ("nearest", f"{spatial_bench['k']} nearest")):
+        brute, indexed = spatial_bench[f"{label}_brute_s"], spatial_bench[f"{label}_grid_s"]
+        print(f"{name:>14}: linear scan {brute * 1000:8.1f} ms, grid {indexed * 1000:6.3f} ms ({brute / indexed:,.0f}x)")
+    print(f"Updates (remove + insert): {spatial_bench['update_per_s']:,.0f}/s")
+
+if __name__ == "__main__":
+    main()
@@ -36,90 +36,780 @@ Requirements:
 """
 
 # Your solution here:
+from array import array
+from bisect import bisect_left
+from collections import Counter, deque
+from collections.abc import MutableMapping
+from contextlib import contextmanager
+import heapq
+import mmap
+import os
+import re
+import struct
+import tempfile
+import threading
+
+class CatalogueFile:
+    """Read-only, memory-mapped catalogue file
+    
+    Layout (little endian, sections 8-byte aligned):
+        header    magic, version, book count, string count, word count, section offsets
+        offsets   uint64 per string, plus one end offset, into the string heap
+        records   fixed-width (title id, author id, isbn id) uint32 triples
+        order     uint32 record numbers sorted by ISBN, for binary search
+        words     uint32 string id of each indexed word, in sorted order
+        postings  uint64 start of each word's postings, plus one end offset,
+                  then the uint32 record numbers of the books containing it
+        heap      UTF-8 string bytes; string 0 is the library name
+    
+    Authors are interned, so repeated names are stored once.
+    """
+    
+    MAGIC = b"PYLIBCAT"
+    VERSION = 1
+    HEADER = struct.Struct("<8sIIQQQQQQQQ")
+    
+    def __init__(self, path):
+        with open(path, "rb") as file:
+            self._map = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+        (magic, version, count, strings, words, offsets_at, records_at, order_at,
+         words_at, postings_at, heap_at) = self.HEADER.unpack_from(self._map)
+        if magic != self.MAGIC or version != self.VERSION:
+            self._map.close()
+            raise ValueError(f"Not a library catalogue file: {path}")
+        view = memoryview(self._map)
+        self._offsets = view[offsets_at:offsets_at + 8 * (strings + 1)].cast("Q")
+        self._records = view[records_at:records_at + 12 * count].cast("I")
+        self._order = view[order_at:order_at + 4 * count].cast("I")
+        self._words = view[words_at:words_at + 4 * words].cast("I")
+        self._posting_offsets = view[postings_at:postings_at + 8 * (words + 1)].cast("Q")
+        postings_at += 8 * (words + 1)
+        self._postings = view[postings_at:postings_at + 4 * self._posting_offsets[words]].cast("I")
+        self._heap_at = heap_at
+        self._count = count
+        self.name = self.string(0)
+    
+    def __len__(self):
+        return self._count
+    
+    def string(self, string_id):
+        """Decode one entry of the string table"""
+        start = self._heap_at + self._offsets[string_id]
+        return self._map[start:self._heap_at + self._offsets[string_id + 1]].decode()
+    
+    def row(self, position):
+        """(title, author, isbn) of the record at position"""
+        record = 3 * position
+        records = self._records
+        return self.string(records[record]), self.string(records[record + 1]), self.string(records[record + 2])
+    
+    def isbn(self, position):
+        """ISBN of the record at position"""
+        return self.string(self._records[3 * position + 2])
+    
+    def find(self, isbn):
+        """Record position of isbn, or -1"""
+        key = isbn.encode()
+        records, offsets, order, heap, data = self._records, self._offsets, self._order, self._heap_at, self._map
+        low, high = 0, self._count
+        while low < high:
+            middle = (low + high) // 2
+            string_id = records[3 * order[middle] + 2]
+            if data[heap + offsets[string_id]:heap + offsets[string_id + 1]] < key:
+                low = middle + 1
+            else:
+                high = middle
+        if low < self._count:
+            position = order[low]
+            if self.isbn(position) == isbn:
+                return position
+        return -1
+    
+    def postings(self):
+        """word -> record numbers of the books containing it, as views into the file"""
+        starts, postings = self._posting_offsets, self._postings
+        return {self.string(string_id): postings[starts[number]:starts[number + 1]]
+                for number, string_id in enumerate(self._words)}
+    
+    @classmethod
+    def write(cls, path, name, rows, book_words):
+        """Write (title, author, isbn) rows and their word index to path
+        
+        book_words(title, author) gives the normalized words to index.
+        Returns the number of books written.
+        """
+        heap = bytearray()
+        offsets = array("Q", [0])
+        records = array("I")
+        isbn_keys = []
+        authors = {}
+        index = {}
+        
+        heap += name.encode()
+        offsets.append(len(heap))
+        for position, (title, author, isbn) in enumerate(rows):
+            title_id = len(offsets) - 1
+            heap += title.encode()
+            offsets.append(len(heap))
+            author_id = authors.get(author)
+            if author_id is None:
+                author_id = authors[author] = len(offsets) - 1
+                heap += author.encode()
+                offsets.append(len(heap))
+            isbn_key = isbn.encode()
+            isbn_keys.append(isbn_key)
+            records.extend((title_id, author_id, len(offsets) - 1))
+            heap += isbn_key
+            offsets.append(len(heap))
+            for word in book_words(title, author):
+                postings = index.get(word)
+                if postings is None:
+                    postings = index[word] = array("I")
+                postings.append(position)
+        count = len(isbn_keys)
+        order = array("I", sorted(range(count), key=isbn_keys.__getitem__))
+        del isbn_keys
+        
+        word_ids = array("I")
+        posting_offsets = array("Q", [0])
+        postings = array("I")
+        for word in sorted(index):
+            word_ids.append(len(offsets) - 1)
+            heap += word.encode()
+            offsets.append(len(heap))
+            postings.extend(index[word])
+            posting_offsets.append(len(postings))
+        del index
+        
+        def aligned(position):
+            return (position + 7) & ~7
+        offsets_at = aligned(cls.HEADER.size)
+        records_at = aligned(offsets_at + 8 * len(offsets))
+        order_at = aligned(records_at + 12 * count)
+        words_at = aligned(order_at + 4 * count)
+        postings_at = aligned(words_at + 4 * len(word_ids))
+        heap_at = aligned(postings_at + 8 * len(posting_offsets) + 4 * len(postings))
+        with open(path, "wb") as file:
+            file.write(cls.HEADER.pack(cls.MAGIC, cls.VERSION, count, len(offsets) - 1, len(word_ids),
+                                       offsets_at, records_at, order_at, words_at, postings_at, heap_at))
+            sections = ((offsets_at, offsets), (records_at, records), (order_at, order),
+                        (words_at, word_ids), (postings_at, posting_offsets), (None, postings), (heap_at, heap))
+            for position, section in sections:
+                if position is not None:
+                    file.write(bytes(position - file.tell()))
+                file.write(section)
+        return count
+
+class BookStore(MutableMapping):
+    """isbn -> book mapping over an optional catalogue file
+    
+    Books from the file are materialized into dicts the first time they are
+    looked up; books added later live in memory. A book's catalogue position
+    is its record number in the file, or the next free number when added.
+    """
+    
+    def __init__(self, catalogue=None):
+        self._file = catalogue
+        self._loaded = {}           # isbn -> book materialized from the file
+        self._removed = set()       # ISBNs of file records deleted or replaced
+        self._added = {}            # isbn -> book added in memory
+        self._added_isbns = {}      # position -> isbn of books added in memory
+        self._positions = {}        # isbn -> catalogue position, for books seen so far
+        self._next_position = len(catalogue) if catalogue is not None else 0
+    
+    def _record(self, isbn):
+        """Position of isbn's live record in the file, or -1"""
+        if self._file is None or isbn in self._removed:
+            return -1
+        return self._file.find(isbn)
+    
+    def _materialize(self, position):
+        """Book dict for a file record"""
+        title, author, isbn = self._file.row(position)
+        # setdefault keeps the first dict if two threads materialize the same book
+        book = self._loaded.setdefault(isbn, {"title": title, "author": author, "isbn": isbn, "available": True})
+        self._positions[isbn] = position
+        return book
+    
+    def __getitem__(self, isbn):
+        book = self._added.get(isbn) or self._loaded.get(isbn)
+        if book is not None:
+            return book
+        position = self._record(isbn)
+        if position < 0:
+            raise KeyError(isbn)
+        return self._materialize(position)
+    
+    def __contains__(self, isbn):
+        return isbn in self._added or isbn in self._loaded or self._record(isbn) >= 0
+    
+    def __setitem__(self, isbn, book):
+        if self._record(isbn) >= 0:
+            # A replaced file record is hidden; the new book joins the end of the catalogue
+            self._removed.add(isbn)
+            self._loaded.pop(isbn, None)
+        elif isbn in self._added:
+            del self._added_isbns[self._positions[isbn]]
+            del self._added[isbn]
+        self._added[isbn] = book
+        self._added_isbns[self._next_position] = isbn
+        self._positions[isbn] = self._next_position
+        self._next_position += 1
+    
+    def __delitem__(self, isbn):
+        if isbn in self._added:
+            del self._added[isbn]
+            del self._added_isbns[self._positions[isbn]]
+        elif self._record(isbn) >= 0:
+            self._removed.add(isbn)
+            self._loaded.pop(isbn, None)
+        else:
+            raise KeyError(isbn)
+        self._positions.pop(isbn, None)
+    
+    def __len__(self):
+        stored = len(self._file) - len(self._removed) if self._file is not None else 0
+        return stored + len(self._added)
+    
+    def __iter__(self):
+        for _, _, isbn in self.rows():
+            yield isbn
+    
+    def at(self, position):
+        """Book at a catalogue position"""
+        isbn = self._added_isbns.get(position)
+        if isbn is not None:
+            return self._added[isbn]
+        return self._loaded.get(self._file.isbn(position)) or self._materialize(position)
+    
+    def position(self, isbn):
+        """Catalogue position of a book"""
+        position = self._positions.get(isbn)
+        if position is None:
+            position = self._record(isbn)
+            if position < 0:
+                raise KeyError(isbn)
+            self._positions[isbn] = position
+        return position
+    
+    def rows(self):
+        """(title, author, isbn) of every book in catalogue order, without materializing books"""
+        if self._file is not None:
+            removed = self._removed
+            for position in range(len(self._file)):
+                row = self._file.row(position)
+                if row[2] not in removed:
+                    yield row
+        # A copy, so books added meanwhile can't break the iteration
+        for book in list(self._added.values()):
+            yield book["title"], book["author"], book["isbn"]
+
 class Library:
-    """Library management system"""
+    """Library management system
+    
+    Circulation (check-out, return, holds) is safe to call from many
+    threads: each ISBN is guarded by one of a fixed set of striped locks.
+    Catalogue changes (add_book, remove_book) are serialized.
+    """
+    
+    # Words are runs of letters/digits, compared in lower case
+    _TOKEN = re.compile(r"\w+")
+    # New words wait in a small unsorted list before being merged into the suffix array
+    _PENDING_LIMIT = 1024
+    # Words at least this similar (trigram Jaccard) to a query word count as fuzzy matches
+    _FUZZY_THRESHOLD = 0.3
+    # ... and only this many of the closest words per query word are looked up
+    _FUZZY_EXPANSIONS = 16
+    # ISBNs share this many locks, so memory stays fixed however large the catalogue
+    _LOCK_STRIPES = 64
     
     def __init__(self, name):
         self.name = name
-        self._books = []
-        self._members = []
-        self._checked_out = {}
+        self._books = BookStore()   # isbn -> book
+        self._members = {}          # member id -> {"name", "id", "loans": set of ISBNs}
+        self._member_ids = {}       # member name -> member id
+        self._checked_out = {}      # isbn -> member id
+        self._holds = {}            # isbn -> deque of member ids waiting, in FIFO order
+        
+        # One lock and one available-books counter per stripe; the counters sum to the total
+        self._locks = [threading.Lock() for _ in range(self._LOCK_STRIPES)]
+        self._available_counts = [0] * self._LOCK_STRIPES
+        self._catalogue_lock = threading.Lock()
+        self._members_lock = threading.Lock()
+        
+        # Inverted index: normalized word -> catalogue positions of books whose
+        # title or author contains it (read-only views while still in a loaded file)
+        self._index = {}
+        # Sorted words (for prefix search) and every suffix of every word (for
+        # substring search), so both lookups are binary searches
+        self._sorted_words = []
+        # (suffixes, word of each suffix), swapped in as one tuple so readers never mix two versions
+        self._suffix_array = ([], [])
+        self._pending_words = []
+        # Trigram -> indexed words containing it, built by the first fuzzy search
+        self._trigram_index = None
+        self._trigram_counts = {}   # word -> number of distinct trigrams
+    
+    @classmethod
+    def load(cls, path):
+        """Open a catalogue written by dump; books are read from the file on demand"""
+        catalogue = CatalogueFile(path)
+        library = cls(catalogue.name)
+        library._books = BookStore(catalogue)
+        library._available_counts[0] = len(catalogue)
+        library._index = catalogue.postings()
+        library._pending_words = list(library._index)
+        return library
+    
+    def dump(self, path):
+        """Write the catalogue to path (members and loans are not saved)"""
+        # Write beside the target and rename, so a catalogue mapped from path stays valid
+        temporary = f"{path}.tmp"
+        count = CatalogueFile.write(temporary, self.name, self._books.rows(), self._row_words)
+        os.replace(temporary, path)
+        return f"Saved {count} books to {path}"
     
     def add_book(self, title, author, isbn):
         """Add a book to the library"""
         if not self._validate_book_info(title, author, isbn):
             return "Invalid book information"
         
-        book = {"title": title, "author": author, "isbn": isbn, "available": True}
-        self._books.append(book)
+        stripe = self._stripe(isbn)
+        with self._catalogue_lock, self._locks[stripe]:
+            if isbn in self._books:
+                return "Book with this ISBN already exists"
+            book = {"title": title, "author": author, "isbn": isbn, "available": True}
+            self._books[isbn] = book
+            self._available_counts[stripe] += 1
+            self._index_book(book)
         return f"Added book: {title} by {author}"
     
     def remove_book(self, isbn):
         """Remove a book from the library"""
-        for i, book in enumerate(self._books):
-            if book["isbn"] == isbn:
-                if not book["available"]:
-                    return "Cannot remove book - it's checked out"
-                del self._books[i]
-                return f"Removed book: {book['title']}"
-        return "Book not found"
-    
-    def search_books(self, query):
-        """Search for books by title or author"""
-        results = []
-        for book in self._books:
-            if query.lower() in book["title"].lower() or query.lower() in book["author"].lower():
-                results.append(book)
+        stripe = self._stripe(isbn)
+        with self._catalogue_lock, self._locks[stripe]:
+            book = self._books.get(isbn)
+            if book is None:
+                return "Book not found"
+            if not book["available"]:
+                return "Cannot remove book - it's checked out"
+            self._unindex_book(book)
+            del self._books[isbn]
+            self._available_counts[stripe] -= 1
+        return f"Removed book: {book['title']}"
+    
+    def search_books(self, query, prefix=False):
+        """Search for books by title or author
+        
+        By default a book matches when the query is a case-insensitive
+        substring of its title or author. With prefix=True every word of
+        the query must start a word of the title or author.
+        """
+        needle = query.lower()
+        words = self._TOKEN.findall(needle)
+        if not words:
+            # Nothing to look up in the index (empty or punctuation-only query): scan the
+            # titles and authors, and only build book dicts for the matches
+            return [self._books[isbn] for title, author, isbn in self._books.rows()
+                    if needle in title.lower() or needle in author.lower()]
+        if len(self._pending_words) > self._PENDING_LIMIT:
+            # add_book appends under the catalogue lock, so merge under it too
+            with self._catalogue_lock:
+                if len(self._pending_words) > self._PENDING_LIMIT:
+                    self._merge_pending_words()
+        
+        # A query word followed by a separator must end a word of the book,
+        # one preceded by a separator must start one, so inner words are exact
+        lookups = []
+        for position, word in enumerate(words):
+            if prefix:
+                kind = "prefix"
+            elif len(words) == 1:
+                kind = "contains"
+            elif 0 < position < len(words) - 1:
+                kind = "exact"
+            else:
+                kind = "suffix" if position == 0 else "prefix"
+            terms = self._matching_words(word, kind)
+            lookups.append((sum(len(self._index[term]) for term in terms), position, terms))
+        
+        # Smallest postings first; once the candidates are fewer than the next
+        # lookup's postings, checking them against the text is cheaper
+        candidates = None
+        complete = True
+        for size, _, terms in sorted(lookups):
+            if candidates is not None and len(candidates) <= size:
+                complete = False
+                break
+            positions = self._postings(terms)
+            candidates = positions if candidates is None else candidates & positions
+            if not candidates:
+                return []
+        
+        results = [self._books.at(position) for position in sorted(candidates)]
+        if prefix:
+            if not complete:
+                results = [book for book in results if self._starts_words(book, words)]
+        elif not complete or needle != words[0]:
+            # The words may match in separate places; keep books that contain the whole query
+            results = [book for book in results if self._contains(book, needle)]
         return results
     
+    def fuzzy_search_books(self, query, limit=10):
+        """Books best matching query despite typos, most similar first
+        
+        Each query word is matched to the closest indexed words sharing
+        enough trigrams with it; a book scores the sum, over the query
+        words, of the similarity of its closest word. Ties keep catalogue
+        order.
+        """
+        words = self._TOKEN.findall(query.lower())
+        if not words or limit <= 0:
+            return []
+        if self._trigram_index is None:
+            with self._catalogue_lock:
+                if self._trigram_index is None:
+                    trigram_index = {}
+                    for word in self._index:
+                        self._index_trigrams(word, trigram_index)
+                    self._trigram_index = trigram_index
+        
+        # Per query word: each book's similarity through its closest indexed word
+        per_word = []
+        for word in words:
+            closest = heapq.nlargest(self._FUZZY_EXPANSIONS,
+                                     ((similarity, match) for match, similarity in self._similar_words(word).items()))
+            best = {}
+            for similarity, match in reversed(closest):
+                # Weakest first, so closer words overwrite
+                best.update(dict.fromkeys(self._postings((match,)), similarity))
+            per_word.append(best)
+        
+        per_word.sort(key=len, reverse=True)
+        scores = per_word[0]
+        for best in per_word[1:]:
+            get = scores.get
+            for position, similarity in best.items():
+                scores[position] = get(position, 0.0) + similarity
+        if not scores:
+            return []
+        # Only books reaching the k-th best score need sorting
+        kth = heapq.nlargest(limit, scores.values())[-1]
+        ranked = sorted((-score, position) for position, score in scores.items() if score >= kth)
+        return [self._books.at(position) for _, position in ranked[:limit]]
+    
     def add_member(self, member_name, member_id):
         """Add a member to the library"""
-        if member_name in [member["name"] for member in self._members]:
-            return "Member already exists"
-        
-        self._members.append({"name": member_name, "id": member_id})
+        with self._members_lock:
+            if member_name in self._member_ids or member_id in self._members:
+                return "Member already exists"
+            
+            self._members[member_id] = {"name": member_name, "id": member_id, "loans": set()}
+            self._member_ids[member_name] = member_id
         return f"Added member: {member_name}"
     
-    def check_out_book(self, isbn, member_name):
-        """Check out a book to a member"""
-        if member_name not in [member["name"] for member in self._members]:
+    def check_out_book(self, isbn, member_name=None, member_id=None):
+        """Check out a book to a member (given by name, or by member_id)"""
+        member = self._find_member(member_name, member_id)
+        if member is None:
+            return "Member not found"
+        
+        book = self._books.get(isbn)
+        if book is None:
+            return "Book not found"
+        # Optimistic read: a book already on loan is refused without taking its lock
+        if not book["available"]:
+            return "Book is already checked out"
+        stripe = self._stripe(isbn)
+        with self._locks[stripe]:
+            problem = self._lend_problem(isbn)
+            if problem:
+                return problem
+            book = self._lend(isbn, member, stripe)
+        return f"Checked out {book['title']} to {member['name']}"
+    
+    def check_out_books(self, isbns, member_name=None, member_id=None):
+        """Check out several books to one member, all or none"""
+        member = self._find_member(member_name, member_id)
+        if member is None:
             return "Member not found"
+        isbns = list(dict.fromkeys(isbns))
         
-        for book in self._books:
-            if book["isbn"] == isbn:
-                if book["available"]:
-                    book["available"] = False
-                    self._checked_out[isbn] = member_name
-                    return f"Checked out {book['title']} to {member_name}"
-                else:
-                    return "Book is already checked out"
-        return "Book not found"
+        with self._locked(isbns):
+            for isbn in isbns:
+                problem = self._lend_problem(isbn)
+                if problem:
+                    return f"Nothing checked out - {isbn}: {problem}"
+            for isbn in isbns:
+                self._lend(isbn, member, self._stripe(isbn))
+        return f"Checked out {len(isbns)} books to {member['name']}"
     
     def return_book(self, isbn):
-        """Return a book to the library"""
-        if isbn in self._checked_out:
-            member_name = self._checked_out[isbn]
-            for book in self._books:
-                if book["isbn"] == isbn:
-                    book["available"] = True
-                    del self._checked_out[isbn]
-                    return f"Returned {book['title']} from {member_name}"
-        return "Book not checked out"
+        """Return a book to the library, lending it to the first member on hold"""
+        stripe = self._stripe(isbn)
+        with self._locks[stripe]:
+            member_id = self._checked_out.pop(isbn, None)
+            if member_id is None:
+                return "Book not checked out"
+            member = self._members[member_id]
+            member["loans"].discard(isbn)
+            book = self._books[isbn]
+            message = f"Returned {book['title']} from {member['name']}"
+            
+            queue = self._holds.get(isbn)
+            if queue:
+                holder = self._members[queue.popleft()]
+                if not queue:
+                    del self._holds[isbn]
+                # The book goes straight to the holder without becoming available
+                self._checked_out[isbn] = holder["id"]
+                holder["loans"].add(isbn)
+                return f"{message}, checked out to {holder['name']} (on hold)"
+            
+            book["available"] = True
+            self._available_counts[stripe] += 1
+        return message
+    
+    def place_hold(self, isbn, member_name=None, member_id=None):
+        """Join the FIFO hold queue of a checked-out book"""
+        member = self._find_member(member_name, member_id)
+        if member is None:
+            return "Member not found"
+        
+        with self._locks[self._stripe(isbn)]:
+            book = self._books.get(isbn)
+            if book is None:
+                return "Book not found"
+            if book["available"]:
+                return "Book is available - check it out instead"
+            if self._checked_out.get(isbn) == member["id"]:
+                return f"{member['name']} already has {book['title']}"
+            queue = self._holds.setdefault(isbn, deque())
+            if member["id"] in queue:
+                return f"{member['name']} is already waiting for {book['title']}"
+            queue.append(member["id"])
+            return f"{member['name']} is number {len(queue)} in the queue for {book['title']}"
+    
+    def cancel_hold(self, isbn, member_name=None, member_id=None):
+        """Leave the hold queue of a book"""
+        member = self._find_member(member_name, member_id)
+        if member is None:
+            return "Member not found"
+        
+        with self._locks[self._stripe(isbn)]:
+            queue = self._holds.get(isbn)
+            if not queue or member["id"] not in queue:
+                return "No hold to cancel"
+            queue.remove(member["id"])
+            if not queue:
+                del self._holds[isbn]
+        return f"Cancelled hold for {member['name']}"
+    
+    def get_member_loans(self, member_name=None, member_id=None):
+        """ISBNs currently checked out to a member (given by name, or by member_id)"""
+        member = self._find_member(member_name, member_id)
+        if member is None:
+            return []
+        return sorted(member["loans"], key=self._books.position)
     
     def get_library_stats(self):
         """Get library statistics"""
         total_books = len(self._books)
-        available_books = len([book for book in self._books if book["available"]])
+        available_books = sum(self._available_counts)
         checked_out_books = len(self._checked_out)
         total_members = len(self._members)
         
         return f"Library: {self.name}, Books: {total_books}, Available: {available_books}, Checked Out: {checked_out_books}, Members: {total_members}"
     
+    def _find_member(self, member_name=None, member_id=None):
+        """Look a member up by name or by id, never mixing the two
+        
+        Names and ids live in separate maps, so a member named like
+        another member's id can't be mistaken for them. When both are
+        given they must belong to the same member.
+        """
+        if member_id is None:
+            member_id = self._member_ids.get(member_name)
+        elif member_name is not None and self._member_ids.get(member_name) != member_id:
+            return None
+        return self._members.get(member_id)
+    
+    def _stripe(self, isbn):
+        """Index of the lock (and available counter) guarding isbn"""
+        return hash(isbn) % self._LOCK_STRIPES
+    
+    @contextmanager
+    def _locked(self, isbns):
+        """Hold the locks of many ISBNs, taken in stripe order so batches cannot deadlock"""
+        locks = [self._locks[stripe] for stripe in sorted({self._stripe(isbn) for isbn in isbns})]
+        for lock in locks:
+            lock.acquire()
+        try:
+            yield
+        finally:
+            for lock in reversed(locks):
+                lock.release()
+    
+    def _lend_problem(self, isbn):
+        """Why isbn cannot be lent right now, or None (caller holds its lock)"""
+        book = self._books.get(isbn)
+        if book is None:
+            return "Book not found"
+        if not book["available"]:
+            return "Book is already checked out"
+        return None
+    
+    def _lend(self, isbn, member, stripe):
+        """Mark an available book as lent to member (caller holds its lock)"""
+        book = self._books[isbn]
+        book["available"] = False
+        self._available_counts[stripe] -= 1
+        self._checked_out[isbn] = member["id"]
+        member["loans"].add(isbn)
+        return book
+    
     def _validate_book_info(self, title, author, isbn):
         """Validate book information"""
         return (isinstance(title, str) and len(title) > 0 and
                 isinstance(author, str) and len(author) > 0 and
                 isinstance(isbn, str) and len(isbn) > 0)
+    
+    @classmethod
+    def _row_words(cls, title, author):
+        """Normalized words of a title and author"""
+        return set(cls._TOKEN.findall(title.lower())) | set(cls._TOKEN.findall(author.lower()))
+    
+    def _book_words(self, book):
+        """Normalized words of a book's title and author"""
+        return self._row_words(book["title"], book["author"])
+    
+    def _index_book(self, book):
+        """Add a book to the inverted index"""
+        position = self._books.position(book["isbn"])
+        for word in self._book_words(book):
+            positions = self._index.get(word)
+            if positions is None:
+                self._index[word] = positions = set()
+                self._pending_words.append(word)
+                if self._trigram_index is not None:
+                    self._index_trigrams(word, self._trigram_index)
+            elif type(positions) is not set:
+                self._index[word] = positions = set(positions)
+            positions.add(position)
+    
+    def _unindex_book(self, book):
+        """Remove a book from the inverted index (empty words are skipped on lookup)"""
+        position = self._books.position(book["isbn"])
+        for word in self._book_words(book):
+            positions = self._index[word]
+            if type(positions) is not set:
+                self._index[word] = positions = set(positions)
+            positions.discard(position)
+    
+    def _merge_pending_words(self):
+        """Fold newly seen words into the sorted word list and suffix array (catalogue lock held)
+        
+        The pending list is cleared last, so a concurrent search sees each
+        word at least once.
+        """
+        self._sorted_words = sorted(self._sorted_words + self._pending_words)
+        pairs = list(zip(*self._suffix_array))
+        pairs.extend((word[start:], word) for word in self._pending_words for start in range(len(word)))
+        pairs.sort()
+        self._suffix_array = ([suffix for suffix, _ in pairs], [word for _, word in pairs])
+        self._pending_words = []
+    
+    def _postings(self, terms):
+        """Positions of the books containing any of terms, as a new set
+        
+        add_book changes posting sets in place, so searches never iterate
+        them directly: each is copied with one set.update call, a single
+        step under the GIL, so a copy never sees half of a change.
+        """
+        positions = set()
+        for term in terms:
+            positions.update(self._index[term])
+        return positions
+    
+    def _matching_words(self, fragment, kind):
+        """Indexed words that equal, start with, end with or contain fragment"""
+        if kind == "exact":
+            return [fragment] if self._index.get(fragment) else []
+        if kind == "prefix":
+            return self._words_with_prefix(fragment)
+        if kind == "suffix":
+            return [word for word in self._words_containing(fragment) if word.endswith(fragment)]
+        return self._words_containing(fragment)
+    
+    def _words_with_prefix(self, prefix):
+        """Indexed words that start with prefix"""
+        words = [word for word in self._pending_words if word.startswith(prefix)]
+        sorted_words = self._sorted_words
+        position = bisect_left(sorted_words, prefix)
+        while position < len(sorted_words) and sorted_words[position].startswith(prefix):
+            words.append(sorted_words[position])
+            position += 1
+        return [word for word in words if self._index[word]]
+    
+    @staticmethod
+    def _trigrams(word):
+        """Distinct 3-letter windows of a word padded like "  word " so its ends count more"""
+        padded = f"  {word} "
+        return {padded[start:start + 3] for start in range(len(padded) - 2)}
+    
+    def _index_trigrams(self, word, trigram_index):
+        """Add an indexed word to a trigram index"""
+        trigrams = self._trigrams(word)
+        self._trigram_counts[word] = len(trigrams)
+        for trigram in trigrams:
+            words = trigram_index.get(trigram)
+            if words is None:
+                trigram_index[trigram] = words = set()
+            words.add(word)
+    
+    def _similar_words(self, word):
+        """Indexed words whose trigram similarity to word passes the threshold, with that similarity"""
+        trigrams = self._trigrams(word)
+        postings = sorted((self._trigram_index.get(trigram, ()) for trigram in trigrams), key=len)
+        # Similarity is at most shared / len(trigrams), so a match shares at least
+        # least_shared trigrams and at least one less among all but the commonest
+        threshold = self._FUZZY_THRESHOLD
+        least_shared = threshold * len(trigrams)
+        commonest = postings.pop() if least_shared > 1 else ()
+        shared = Counter()
+        for words in postings:
+            shared.update(words)
+        
+        counts, index = self._trigram_counts, self._index
+        matches = {}
+        for candidate, common in shared.most_common():
+            if common < least_shared - 1:
+                break
+            common += candidate in commonest
+            similarity = common / (len(trigrams) + counts[candidate] - common)
+            if similarity >= threshold and index[candidate]:
+                matches[candidate] = similarity
+        return matches
+    
+    @staticmethod
+    def _contains(book, needle):
+        """Case-insensitive substring test on title and author"""
+        return needle in book["title"].lower() or needle in book["author"].lower()
+    
+    def _starts_words(self, book, prefixes):
+        """Check that every prefix starts some word of the book"""
+        words = self._book_words(book)
+        return all(any(word.startswith(prefix) for word in words) for prefix in prefixes)
+    
+    def _words_containing(self, fragment):
+        """Indexed words that contain fragment anywhere"""
+        words = {word for word in self._pending_words if fragment in word}
+        suffixes, suffix_words = self._suffix_array
+        position = bisect_left(suffixes, fragment)
+        while position < len(suffixes) and suffixes[position].startswith(fragment):
+            words.add(suffix_words[position])
+            position += 1
+        return [word for word in words if self._index[word]]
 
 # Test Exercise 1
 print("=== Testing Exercise 1 ===")
@@ -129,8 +819,48 @@ print(library.add_book("Data Structures", "John Doe", "978-0-123456-79-0"))
 print(library.add_member("Alice", "M001"))
 print(library.add_member("Bob", "M002"))
 print(library.check_out_book("978-0-123456-78-9", "Alice"))
+print(library.check_out_book("978-0-123456-79-0", member_id="M001"))
+print(f"Alice's loans: {library.get_member_loans('Alice')}")
+print(library.get_library_stats())
 print(library.return_book("978-0-123456-78-9"))
+print(library.return_book("978-0-123456-79-0"))
+print(library.get_library_stats())
+
+print("\n=== Catalogue Search ===")
+
+print(library.search_books("rossum"))
+print([book["title"] for book in library.search_books("struct", prefix=True)])
+
+print("\n=== Fuzzy Search ===")
+
+print([book["title"] for book in library.fuzzy_search_books("pyhton programing")])
+print([book["title"] for book in library.fuzzy_search_books("jon do", limit=1)])
+
+print("\n=== Catalogue Files ===")
+
+with tempfile.TemporaryDirectory() as directory:
+    path = os.path.join(directory, "python-library.lib")
+    print(library.dump(path))
+    restored = Library.load(path)
+    print(restored.get_library_stats())
+    print(restored.search_books("guido"))
+    print(restored.remove_book("978-0-123456-79-0"))
+    print(restored.add_book("Fluent Python", "Luciano Ramalho", "978-1-491946-00-8"))
+    print([book["title"] for book in restored.search_books("python")])
+
+print("\n=== Concurrent Circulation ===")
+
+python_isbn, structures_isbn = "978-0-123456-78-9", "978-0-123456-79-0"
+print(library.check_out_book(python_isbn, "Alice"))
+print(library.place_hold(python_isbn, "Bob"))
+print(library.check_out_book(python_isbn, "Bob"))
+print(library.return_book(python_isbn))
+print(library.check_out_books([structures_isbn, python_isbn], "Alice"))
+print(library.return_book(python_isbn))
+print(library.check_out_books([structures_isbn, python_isbn], "Alice"))
 print(library.get_library_stats())
+print(library.return_book(python_isbn))
+print(library.return_book(structures_isbn))
 
 print("\n=== EXERCISE 2: INHERITANCE ===")
 
@@ -6,106 +6,709 @@ A comprehensive bank system demonstrating OOP principles including
 encapsulation, inheritance, polymorphism, and abstraction! 💰
 """
 
-print("=== BANK SYSTEM PROJECT ===")
-
 # This project demonstrates:
 # - Encapsulation: Private attributes and controlled access
 # - Inheritance: Different account types
 # - Polymorphism: Same interface, different implementations
 # - Abstraction: Complex banking operations simplified
 
+from array import array
+import asyncio
+from bisect import bisect_left, bisect_right, insort
+from collections.abc import Mapping, Sequence
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import contextmanager, nullcontext
+import csv
+from decimal import (Decimal, ROUND_CEILING, ROUND_DOWN, ROUND_FLOOR, ROUND_HALF_DOWN,
+                     ROUND_HALF_EVEN, ROUND_HALF_UP, ROUND_UP)
+from fractions import Fraction
+from functools import lru_cache
+import heapq
+import json
+import math
+import multiprocessing
+import operator
+import os
+import random
+import struct
+import sys
+import tempfile
+import threading
+import time
+from types import MappingProxyType
+import zlib
+
+_new_money = object.__new__
+
+class Money:
+    """Exact amount of money stored as an integer number of cents
+    
+    Floats drift over millions of postings and Decimal is slow on the hot
+    path, so amounts are plain integers of minor units. Rounding only
+    happens at explicit points (interest, fees, converting a float) and
+    always uses one of the decimal module's rounding modes.
+    """
+    
+    __slots__ = ("_cents",)
+    
+    MINOR_UNITS = 100
+    ROUNDING_MODES = (ROUND_HALF_EVEN, ROUND_HALF_UP, ROUND_HALF_DOWN,
+                      ROUND_DOWN, ROUND_UP, ROUND_FLOOR, ROUND_CEILING)
+    
+    def __init__(self, amount=0, rounding=ROUND_HALF_EVEN):
+        if isinstance(amount, int):
+            self._cents = int(amount) * self.MINOR_UNITS
+        elif isinstance(amount, Money):
+            self._cents = amount._cents
+        elif isinstance(amount, (float, str, Decimal, Fraction)):
+            ratio = self._ratio(amount)
+            self._cents = self._scale(self.MINOR_UNITS, ratio.numerator, ratio.denominator, rounding)
+        else:
+            raise TypeError(f"Cannot convert {type(amount).__name__} to Money")
+    
+    @classmethod
+    def from_cents(cls, cents):
+        """Build Money straight from integer minor units"""
+        money = _new_money(cls)
+        money._cents = cents
+        return money
+    
+    @property
+    def cents(self):
+        """Amount in integer minor units"""
+        return self._cents
+    
+    def multiply(self, factor, rounding=ROUND_HALF_EVEN):
+        """Multiply by a rate or factor, rounding to whole cents"""
+        ratio = self._ratio(factor)
+        return Money.from_cents(self._scale(self._cents, ratio.numerator, ratio.denominator, rounding))
+    
+    def to_decimal(self):
+        """Exact Decimal value"""
+        return Decimal(self._cents).scaleb(-2)
+    
+    # Arithmetic ----------------------------------------------------------------
+    
+    def __add__(self, other):
+        if type(other) is Money:
+            # Fast path: Money + Money is the common case on every posting
+            money = _new_money(Money)
+            money._cents = self._cents + other._cents
+            return money
+        cents = self._cents_of(other)
+        if cents is None:
+            return NotImplemented
+        return Money.from_cents(self._cents + cents)
+    
+    __radd__ = __add__
+    
+    def __sub__(self, other):
+        if type(other) is Money:
+            money = _new_money(Money)
+            money._cents = self._cents - other._cents
+            return money
+        cents = self._cents_of(other)
+        if cents is None:
+            return NotImplemented
+        return Money.from_cents(self._cents - cents)
+    
+    def __rsub__(self, other):
+        cents = self._cents_of(other)
+        if cents is None:
+            return NotImplemented
+        return Money.from_cents(cents - self._cents)
+    
+    def __mul__(self, factor):
+        if isinstance(factor, int):
+            return Money.from_cents(self._cents * factor)
+        if isinstance(factor, (float, Decimal, Fraction)):
+            return self.multiply(factor)
+        return NotImplemented
+    
+    __rmul__ = __mul__
+    
+    def __neg__(self):
+        return Money.from_cents(-self._cents)
+    
+    def __abs__(self):
+        return Money.from_cents(abs(self._cents))
+    
+    # Comparison ----------------------------------------------------------------
+    
+    def __eq__(self, other):
+        if type(other) is Money:
+            return self._cents == other._cents
+        return self._compare(other, operator.eq)
+    
+    def __lt__(self, other):
+        return self._compare(other, operator.lt)
+    
+    def __le__(self, other):
+        if type(other) is Money:
+            return self._cents <= other._cents
+        return self._compare(other, operator.le)
+    
+    def __gt__(self, other):
+        return self._compare(other, operator.gt)
+    
+    def __ge__(self, other):
+        if type(other) is Money:
+            return self._cents >= other._cents
+        return self._compare(other, operator.ge)
+    
+    def __hash__(self):
+        # Equal to the hash of the same number, so Money(5) and 5 collide like 5.0 and 5
+        return hash(Fraction(self._cents, self.MINOR_UNITS))
+    
+    def __bool__(self):
+        return self._cents != 0
+    
+    # Conversion ----------------------------------------------------------------
+    
+    def __float__(self):
+        return self._cents / self.MINOR_UNITS
+    
+    def __str__(self):
+        sign = "-" if self._cents < 0 else ""
+        units, cents = divmod(abs(self._cents), self.MINOR_UNITS)
+        return f"{sign}{units}.{cents:02d}"
+    
+    def __repr__(self):
+        return f"Money('{self}')"
+    
+    def __format__(self, spec):
+        return format(self.to_decimal(), spec) if spec else str(self)
+    
+    # Helpers -------------------------------------------------------------------
+    
+    @classmethod
+    def _cents_of(cls, value):
+        """Minor units of a Money or plain number (None for anything else)"""
+        if type(value) is Money or isinstance(value, Money):
+            return value._cents
+        if isinstance(value, int):
+            return value * cls.MINOR_UNITS
+        if isinstance(value, (float, Decimal, Fraction)):
+            return Money(value)._cents
+        return None
+    
+    def _compare(self, other, op):
+        """Compare with another amount exactly (floats are not rounded to cents first)
+        
+        Comparisons must agree with __hash__, so Money(1) == 1.004 is False.
+        """
+        if isinstance(other, Money):
+            return op(self._cents, other._cents)
+        if isinstance(other, int):
+            return op(self._cents, other * self.MINOR_UNITS)
+        if isinstance(other, (float, Decimal)) and not math.isfinite(other):
+            return op(float(self), float(other))
+        if isinstance(other, (float, Decimal, Fraction)):
+            return op(Fraction(self._cents, self.MINOR_UNITS), Fraction(other))
+        return NotImplemented
+    
+    @staticmethod
+    @lru_cache(maxsize=4096)
+    def _ratio(value):
+        """Exact fraction for a number, reading floats by their shortest repr"""
+        if isinstance(value, float):
+            return Fraction(repr(value))
+        return Fraction(value)
+    
+    @staticmethod
+    def _scale(value, numerator, denominator, rounding):
+        """value * numerator / denominator rounded to an integer with the given mode"""
+        quotient, remainder = divmod(value * numerator, denominator)
+        if remainder == 0 or rounding == ROUND_FLOOR:
+            return quotient
+        if rounding == ROUND_CEILING:
+            return quotient + 1
+        if rounding == ROUND_DOWN:
+            return quotient + 1 if quotient < 0 else quotient
+        if rounding == ROUND_UP:
+            return quotient if quotient < 0 else quotient + 1
+        
+        doubled = 2 * remainder
+        if doubled < denominator:
+            return quotient
+        if doubled > denominator:
+            return quotient + 1
+        # Exactly half way between quotient and quotient + 1
+        if rounding == ROUND_HALF_EVEN:
+            return quotient + (quotient & 1)
+        if rounding == ROUND_HALF_UP:
+            return quotient if quotient < 0 else quotient + 1
+        if rounding == ROUND_HALF_DOWN:
+            return quotient + 1 if quotient < 0 else quotient
+        raise ValueError(f"Unsupported rounding mode: {rounding}")
+
+Money.ZERO = Money(0)
+
+class TransactionLedger:
+    """Columnar transaction history stored in typed arrays"""
+    
+    __slots__ = ("_timestamps", "_kinds", "_amounts", "_balances", "_details")
+    
+    # Transaction kinds (stored as one byte per entry)
+    DEPOSIT = 0
+    WITHDRAWAL = 1
+    OVERDRAFT_WITHDRAWAL = 2
+    INTEREST = 3
+    MONTHLY_FEE = 4
+    PURCHASE = 5
+    PAYMENT = 6
+    INTEREST_CHARGE = 7
+    
+    MAX_CENTS = (1 << 63) - 1   # Largest amount or balance an int64 column holds
+    
+    ENTRY_SIZE = 33     # Bytes per entry across the five columns (d, B, q, q, q)
+    
+    _TEMPLATES = {
+        DEPOSIT: "Deposited ${amount}",
+        WITHDRAWAL: "Withdrew ${amount}",
+        OVERDRAFT_WITHDRAWAL: "Withdrew ${amount} (Overdraft: ${detail})",
+        INTEREST: "Interest added: ${amount:.2f}",
+        MONTHLY_FEE: "Monthly fee charged: ${amount}",
+        PURCHASE: "Purchase: ${amount}",
+        PAYMENT: "Payment: ${amount}",
+        INTEREST_CHARGE: "Interest charged: ${amount}",
+    }
+    
+    def __init__(self):
+        # Money columns hold integer cents
+        self._timestamps = array("d")
+        self._kinds = array("B")
+        self._amounts = array("q")
+        self._balances = array("q")
+        self._details = array("q")
+    
+    def append(self, kind, amount, balance, detail=Money.ZERO, timestamp=None):
+        """Append one posting (Money values) to every column"""
+        self._timestamps.append(time.time() if timestamp is None else timestamp)
+        self._kinds.append(kind)
+        self._amounts.append(amount._cents)
+        self._balances.append(balance._cents)
+        self._details.append(detail._cents)
+    
+    def append_cents(self, kind, amount, balance, detail, timestamp):
+        """Append one posting given in integer cents (used when replaying events)"""
+        self._timestamps.append(timestamp)
+        self._kinds.append(kind)
+        self._amounts.append(amount)
+        self._balances.append(balance)
+        self._details.append(detail)
+    
+    def __len__(self):
+        return len(self._kinds)
+    
+    def __getitem__(self, index):
+        """Render a single entry as a human readable string"""
+        return self.render(index)
+    
+    def __iter__(self):
+        for index in range(len(self._kinds)):
+            yield self.render(index)
+    
+    def render(self, index):
+        """Format one entry on demand"""
+        template = self._TEMPLATES[self._kinds[index]]
+        return template.format(amount=Money.from_cents(self._amounts[index]),
+                               detail=Money.from_cents(self._details[index]))
+    
+    def entries(self):
+        """Yield raw (timestamp, kind, amount, balance, detail) tuples, money in cents"""
+        return zip(self._timestamps, self._kinds, self._amounts, self._balances, self._details)
+    
+    def to_bytes(self):
+        """Serialize all columns into one compact byte string"""
+        columns = (self._timestamps, self._kinds, self._amounts, self._balances, self._details)
+        return struct.pack("<I", len(self)) + b"".join(column.tobytes() for column in columns)
+    
+    def write_to(self, out):
+        """Write the to_bytes encoding to a binary file column by column, without joining"""
+        out.write(struct.pack("<I", len(self)))
+        for column in (self._timestamps, self._kinds, self._amounts, self._balances, self._details):
+            out.write(column)
+    
+    def byte_size(self):
+        """Length of the to_bytes encoding"""
+        return 4 + len(self) * self.ENTRY_SIZE
+    
+    @classmethod
+    def from_bytes(cls, data):
+        """Rebuild a ledger written by to_bytes"""
+        ledger = cls()
+        (count,) = struct.unpack_from("<I", data)
+        offset = 4
+        for column in (ledger._timestamps, ledger._kinds, ledger._amounts, ledger._balances, ledger._details):
+            size = count * column.itemsize
+            column.frombytes(data[offset:offset + size])
+            offset += size
+        return ledger
+    
+    def balance_before(self, index):
+        """Balance in cents just before entry `index` was posted"""
+        if index > 0:
+            return self._balances[index - 1]
+        kind = self._kinds[0]
+        amount = self._amounts[0]
+        if kind in (self.DEPOSIT, self.INTEREST):
+            delta = amount
+        elif kind in (self.WITHDRAWAL, self.MONTHLY_FEE):
+            delta = -amount
+        elif kind == self.OVERDRAFT_WITHDRAWAL:
+            delta = self._details[0] - amount
+        else:
+            delta = 0
+        return self._balances[0] - delta
+    
+    def total(self, kind):
+        """Sum the amounts of every entry of a given kind"""
+        return Money.from_cents(sum(amount for entry_kind, amount in zip(self._kinds, self._amounts)
+                                    if entry_kind == kind))
+
+class TransactionView(Sequence):
+    """Read-only view of an account's transaction history
+    
+    Entries are rendered from the ledger on access; nothing is copied.
+    The ledger is append-only, so a snapshot is just the ledger plus the
+    length it had (its version) and later postings never show up in it.
+    A live view (version None) follows the ledger as it grows.
+    """
+    
+    __slots__ = ("_ledger", "_version")
+    
+    def __init__(self, ledger, version=None):
+        self._ledger = ledger
+        self._version = version
+    
+    @property
+    def version(self):
+        """Number of ledger entries this view covers"""
+        return len(self)
+    
+    def snapshot(self):
+        """Freeze the view at the ledger's current length"""
+        return TransactionView(self._ledger, len(self))
+    
+    def __len__(self):
+        return len(self._ledger) if self._version is None else self._version
+    
+    def __getitem__(self, position):
+        length = len(self)
+        if isinstance(position, slice):
+            return [self._ledger.render(i) for i in range(*position.indices(length))]
+        if position < 0:
+            position += length
+        if not 0 <= position < length:
+            raise IndexError("TransactionView index out of range")
+        return self._ledger.render(position)
+    
+    def __iter__(self):
+        render = self._ledger.render
+        for index in range(len(self)):
+            yield render(index)
+    
+    def __eq__(self, other):
+        if not isinstance(other, (TransactionView, list, tuple)):
+            return NotImplemented
+        return len(self) == len(other) and all(mine == theirs for mine, theirs in zip(self, other))
+    
+    __hash__ = None
+    
+    def __repr__(self):
+        return repr(list(self))
+
+TransactionView.EMPTY = TransactionView(TransactionLedger(), 0)
+
+class PostingStatus:
+    """Compact result codes for account operations"""
+    
+    OK = 0
+    OVERDRAFT_USED = 1
+    INVALID_AMOUNT = 2
+    INACTIVE = 3
+    INSUFFICIENT_FUNDS = 4
+    BELOW_MINIMUM = 5
+    UNKNOWN_ACCOUNT = 6
+    UNKNOWN_OPERATION = 7
+    REJECTED_BY_RULE = 8
+    MALFORMED_REQUEST = 9       # The request could not be decoded
+    INTERNAL_ERROR = 10         # Decoded, but failed while being applied
+    
+    @staticmethod
+    def is_success(status):
+        """Check whether a status code means the operation was applied"""
+        return status <= PostingStatus.OVERDRAFT_USED
+
 class BankAccount:
     """Base class for all bank accounts"""
     
+    account_type = "basic"
+    
+    # Slots instead of a per-instance __dict__ keep million-account banks compact
+    __slots__ = ("_account_number", "_account_holder", "_balance", "_ledger",
+                 "_is_active", "_lock", "_observers", "_rules")
+    
     def __init__(self, account_number, account_holder, initial_balance=0):
         self._account_number = account_number
-        self._account_holder = account_holder
-        self._balance = initial_balance
-        self._transactions = []
+        # Many accounts share a holder name, so keep one copy of each
+        self._account_holder = sys.intern(account_holder) if type(account_holder) is str else account_holder
+        self._balance = Money(initial_balance)
+        self._ledger = None         # Allocated on the first posting
         self._is_active = True
+        self._lock = threading.RLock()
+        self._observers = ()        # Copy-on-write tuple, shared while empty
+        self._rules = ()            # Pre-commit withdrawal rules, same scheme
     
     def deposit(self, amount):
         """Deposit money into account"""
-        if not self._is_active:
-            return "Account is inactive"
-        
-        if self._validate_amount(amount):
-            self._balance += amount
-            self._record_transaction(f"Deposited ${amount}")
-            return f"Deposited ${amount}. New balance: ${self._balance}"
-        else:
-            return "Invalid deposit amount"
+        with self._lock:
+            status = self._apply_deposit(amount)
+            if status == PostingStatus.OK:
+                return f"Deposited ${Money(amount)}. New balance: ${self._balance}"
+            elif status == PostingStatus.INACTIVE:
+                return "Account is inactive"
+            else:
+                return "Invalid deposit amount"
     
     def withdraw(self, amount):
         """Withdraw money from account"""
-        if not self._is_active:
-            return "Account is inactive"
-        
-        if self._validate_amount(amount) and self._has_sufficient_funds(amount):
-            self._balance -= amount
-            self._record_transaction(f"Withdrew ${amount}")
-            return f"Withdrew ${amount}. New balance: ${self._balance}"
-        else:
-            return "Insufficient funds or invalid amount"
+        with self._lock:
+            return self._withdrawal_message(self._apply_withdrawal(amount), amount)
     
     def get_balance(self):
         """Get current balance"""
         return self._balance
     
+    def get_net_balance(self):
+        """Get balance minus anything owed to the bank"""
+        return self._balance
+    
+    def get_account_number(self):
+        """Get account number"""
+        return self._account_number
+    
     def get_account_info(self):
         """Get account information"""
         return f"Account: {self._account_number}, Holder: {self._account_holder}, Balance: ${self._balance}"
     
-    def get_transactions(self):
-        """Get transaction history"""
-        return self._transactions.copy()
+    def get_transactions(self, live=False):
+        """Get transaction history as a read-only view (a snapshot unless live=True)"""
+        if live:
+            return TransactionView(self.get_ledger())
+        if self._ledger is None:
+            return TransactionView.EMPTY
+        return TransactionView(self._ledger, len(self._ledger))
+    
+    def get_ledger(self):
+        """Get the structured transaction ledger"""
+        if self._ledger is None:
+            self._ledger = TransactionLedger()
+        return self._ledger
     
     def deactivate(self):
         """Deactivate account"""
-        self._is_active = False
+        self._set_active(False)
         return "Account deactivated"
     
     def activate(self):
         """Activate account"""
-        self._is_active = True
+        self._set_active(True)
         return "Account activated"
     
+    def is_active(self):
+        """Check whether the account is active"""
+        return self._is_active
+    
+    def attach(self, observer):
+        """Attach an observer that is told about balance and status changes"""
+        if observer not in self._observers:
+            self._observers = self._observers + (observer,)
+    
+    def detach(self, observer):
+        """Detach an observer"""
+        if observer in self._observers:
+            self._observers = tuple(attached for attached in self._observers if attached is not observer)
+    
+    def add_rule(self, rule):
+        """Add a pre-commit rule that every withdrawal must pass
+        
+        A rule provides check(account, amount) -> bool and
+        commit(account, amount), like VelocityRule.
+        """
+        if rule not in self._rules:
+            self._rules = self._rules + (rule,)
+    
+    def remove_rule(self, rule):
+        """Remove a pre-commit rule"""
+        if rule in self._rules:
+            self._rules = tuple(added for added in self._rules if added is not rule)
+    
     # Private methods
+    def _next_timestamp(self, timestamp):
+        """`timestamp`, moved up to the latest posting if needed so history stays in date order"""
+        if self._ledger is not None and len(self._ledger):
+            return max(timestamp, self._ledger._timestamps[-1])
+        return timestamp
+    
+    def _pass_rules(self, amount):
+        """Check every rule, then commit the withdrawal to all of them if none objected"""
+        for rule in self._rules:
+            if not rule.check(self, amount):
+                return False
+        for rule in self._rules:
+            rule.commit(self, amount)
+        return True
+    
     def _validate_amount(self, amount):
         """Validate amount"""
-        return isinstance(amount, (int, float)) and amount > 0
+        return self._to_money(amount) is not None
+    
+    @staticmethod
+    def _to_money(amount):
+        """Convert a positive amount to Money (None if it is not a valid amount)"""
+        if not isinstance(amount, (int, float, Money)):
+            return None
+        if isinstance(amount, float) and not math.isfinite(amount):
+            return None
+        money = Money(amount)
+        return money if 0 < money._cents <= TransactionLedger.MAX_CENTS else None
     
     def _has_sufficient_funds(self, amount):
         """Check if account has sufficient funds"""
-        return amount <= self._balance
+        return amount._cents <= self._balance._cents
+    
+    def _record_transaction(self, kind, amount, detail=Money.ZERO, timestamp=None):
+        """Record transaction in the ledger"""
+        if self._ledger is None:
+            self._ledger = TransactionLedger()
+        self._ledger.append(kind, amount, self._balance, detail, timestamp)
+    
+    def _post(self, kind, amount, delta, detail=Money.ZERO, timestamp=None):
+        """Apply a balance change (all Money), record it and notify observers
+        
+        Every balance-mutating method goes through here, so observers
+        (such as the owning Bank) see each change exactly once.
+        """
+        if timestamp is None:
+            timestamp = time.time()
+        # Check before mutating anything: the ledger columns are int64
+        cents = self._balance._cents + delta._cents
+        if not (-TransactionLedger.MAX_CENTS <= cents <= TransactionLedger.MAX_CENTS
+                and -TransactionLedger.MAX_CENTS <= amount._cents <= TransactionLedger.MAX_CENTS):
+            raise OverflowError(f"Posting on account {self._account_number} is out of the ledger's range")
+        self._balance = Money.from_cents(cents)
+        self._record_transaction(kind, amount, detail, timestamp)
+        for observer in self._observers:
+            observer.on_posting(self, kind, amount, delta, detail, timestamp)
+    
+    def _replay_posting(self, kind, amount, delta, detail, timestamp):
+        """Re-apply a logged posting without re-running any business rules"""
+        with self._lock:
+            self._post(kind, amount, delta, detail, timestamp)
+    
+    def _constructor_kwargs(self):
+        """Keyword arguments needed to recreate this account"""
+        return {}
+    
+    def _export_state(self):
+        """Extra mutable state that a snapshot must carry"""
+        return {}
     
-    def _record_transaction(self, transaction):
-        """Record transaction"""
-        self._transactions.append(transaction)
+    def _import_state(self, state):
+        """Restore state produced by _export_state"""
+        pass
+    
+    def _set_active(self, is_active):
+        """Change the active flag and notify observers"""
+        with self._lock:
+            if self._is_active == is_active:
+                return
+            self._is_active = is_active
+            for observer in self._observers:
+                observer.on_status_change(self, is_active)
+    
+    def _apply_deposit(self, amount):
+        """Apply a deposit and return a PostingStatus code"""
+        if not self._is_active:
+            return PostingStatus.INACTIVE
+        amount = self._to_money(amount)
+        if amount is None or not self._has_headroom(amount):
+            return PostingStatus.INVALID_AMOUNT
+        
+        self._post(TransactionLedger.DEPOSIT, amount, amount)
+        return PostingStatus.OK
+    
+    def _has_headroom(self, amount):
+        """Whether crediting amount keeps the balance within the ledger's int64 range"""
+        return self._balance._cents + amount._cents <= TransactionLedger.MAX_CENTS
+    
+    def _apply_withdrawal(self, amount, timestamp=None):
+        """Apply a withdrawal and return a PostingStatus code"""
+        if not self._is_active:
+            return PostingStatus.INACTIVE
+        amount = self._to_money(amount)
+        if amount is None:
+            return PostingStatus.INVALID_AMOUNT
+        if not self._has_sufficient_funds(amount):
+            return PostingStatus.INSUFFICIENT_FUNDS
+        if self._rules and not self._pass_rules(amount):
+            return PostingStatus.REJECTED_BY_RULE
+        
+        self._post(TransactionLedger.WITHDRAWAL, amount, -amount, Money.ZERO, timestamp)
+        return PostingStatus.OK
+    
+    def _withdrawal_message(self, status, amount):
+        """Turn a withdrawal status code into a message"""
+        if status == PostingStatus.OK:
+            return f"Withdrew ${Money(amount)}. New balance: ${self._balance}"
+        elif status == PostingStatus.INACTIVE:
+            return "Account is inactive"
+        elif status == PostingStatus.REJECTED_BY_RULE:
+            return "Withdrawal rejected by account rules"
+        else:
+            return "Insufficient funds or invalid amount"
 
 class SavingsAccount(BankAccount):
     """Savings account with interest"""
     
-    def __init__(self, account_number, account_holder, initial_balance=0, interest_rate=0.02):
+    account_type = "savings"
+    __slots__ = ("_interest_rate", "_interest_rounding", "_minimum_balance")
+    MINIMUM_BALANCE = Money(100)
+    
+    def __init__(self, account_number, account_holder, initial_balance=0, interest_rate=0.02,
+                 interest_rounding=ROUND_HALF_EVEN):
         super().__init__(account_number, account_holder, initial_balance)
         self._interest_rate = interest_rate
-        self._minimum_balance = 100
+        self._interest_rounding = interest_rounding
+        self._minimum_balance = self.MINIMUM_BALANCE
     
     def add_interest(self):
         """Add interest to account"""
-        if self._is_active and self._balance >= self._minimum_balance:
-            interest = self._balance * self._interest_rate
-            self._balance += interest
-            self._record_transaction(f"Interest added: ${interest:.2f}")
-            return f"Interest added: ${interest:.2f}. New balance: ${self._balance:.2f}"
-        else:
-            return "Cannot add interest - account inactive or below minimum balance"
+        with self._lock:
+            if self._is_active and self._balance >= self._minimum_balance:
+                interest = self._balance.multiply(self._interest_rate, self._interest_rounding)
+                self._post(TransactionLedger.INTEREST, interest, interest)
+                return f"Interest added: ${interest:.2f}. New balance: ${self._balance:.2f}"
+            else:
+                return "Cannot add interest - account inactive or below minimum balance"
     
-    def withdraw(self, amount):
-        """Override withdraw to check minimum balance"""
-        if self._balance - amount < self._minimum_balance:
-            return f"Cannot withdraw ${amount} - would go below minimum balance of ${self._minimum_balance}"
-        return super().withdraw(amount)
+    def _apply_withdrawal(self, amount, timestamp=None):
+        """Override withdrawal to check minimum balance"""
+        money = self._to_money(amount)
+        if money is not None and self._balance - money < self._minimum_balance:
+            return PostingStatus.BELOW_MINIMUM
+        return super()._apply_withdrawal(amount, timestamp)
+    
+    def _withdrawal_message(self, status, amount):
+        """Override to explain the minimum balance rule"""
+        if status == PostingStatus.BELOW_MINIMUM:
+            return f"Cannot withdraw ${Money(amount)} - would go below minimum balance of ${self._minimum_balance}"
+        return super()._withdrawal_message(status, amount)
+    
+    def _constructor_kwargs(self):
+        return {"interest_rate": self._interest_rate, "interest_rounding": self._interest_rounding}
     
     def get_account_info(self):
         """Override to include interest rate"""
@@ -115,33 +718,73 @@ class SavingsAccount(BankAccount):
 class CheckingAccount(BankAccount):
     """Checking account with overdraft protection"""
     
+    account_type = "checking"
+    __slots__ = ("_overdraft_limit", "_overdraft_used")
+    
     def __init__(self, account_number, account_holder, initial_balance=0, overdraft_limit=500):
         super().__init__(account_number, account_holder, initial_balance)
-        self._overdraft_limit = overdraft_limit
-        self._overdraft_used = 0
+        self._overdraft_limit = Money(overdraft_limit)
+        self._overdraft_used = Money.ZERO
     
-    def withdraw(self, amount):
-        """Override withdraw to allow overdraft"""
+    def get_net_balance(self):
+        """Override to subtract the overdraft in use"""
+        return self._balance - self._overdraft_used
+    
+    def _apply_withdrawal(self, amount, timestamp=None):
+        """Override withdrawal to allow overdraft"""
         if not self._is_active:
-            return "Account is inactive"
+            return PostingStatus.INACTIVE
         
-        if not self._validate_amount(amount):
-            return "Invalid withdrawal amount"
+        amount = self._to_money(amount)
+        if amount is None:
+            return PostingStatus.INVALID_AMOUNT
+        
+        if amount > self._balance + self._overdraft_limit - self._overdraft_used:
+            return PostingStatus.INSUFFICIENT_FUNDS
+        if self._rules and not self._pass_rules(amount):
+            return PostingStatus.REJECTED_BY_RULE
         
         if amount <= self._balance:
             # Normal withdrawal
-            self._balance -= amount
-            self._record_transaction(f"Withdrew ${amount}")
-            return f"Withdrew ${amount}. New balance: ${self._balance}"
-        elif amount <= self._balance + self._overdraft_limit - self._overdraft_used:
+            self._post(TransactionLedger.WITHDRAWAL, amount, -amount, Money.ZERO, timestamp)
+            return PostingStatus.OK
+        else:
             # Overdraft withdrawal
             overdraft_needed = amount - self._balance
             self._overdraft_used += overdraft_needed
-            self._balance = 0
-            self._record_transaction(f"Withdrew ${amount} (Overdraft: ${overdraft_needed})")
-            return f"Withdrew ${amount} using overdraft. Balance: ${self._balance}, Overdraft used: ${self._overdraft_used}"
+            self._post(TransactionLedger.OVERDRAFT_WITHDRAWAL, amount, -self._balance, overdraft_needed, timestamp)
+            return PostingStatus.OVERDRAFT_USED
+    
+    def _withdrawal_message(self, status, amount):
+        """Override to describe overdraft outcomes"""
+        if status == PostingStatus.OK:
+            return f"Withdrew ${Money(amount)}. New balance: ${self._balance}"
+        elif status == PostingStatus.OVERDRAFT_USED:
+            return f"Withdrew ${Money(amount)} using overdraft. Balance: ${self._balance}, Overdraft used: ${self._overdraft_used}"
+        elif status == PostingStatus.INACTIVE:
+            return "Account is inactive"
+        elif status == PostingStatus.INVALID_AMOUNT:
+            return "Invalid withdrawal amount"
+        elif status == PostingStatus.REJECTED_BY_RULE:
+            return "Withdrawal rejected by account rules"
         else:
-            return f"Insufficient funds and overdraft limit exceeded"
+            return "Insufficient funds and overdraft limit exceeded"
+    
+    def _replay_posting(self, kind, amount, delta, detail, timestamp):
+        """Override to restore the overdraft drawn by a logged withdrawal"""
+        with self._lock:
+            if kind == TransactionLedger.OVERDRAFT_WITHDRAWAL:
+                self._overdraft_used += detail
+            super()._replay_posting(kind, amount, delta, detail, timestamp)
+    
+    def _constructor_kwargs(self):
+        return {"overdraft_limit": str(self._overdraft_limit)}
+    
+    def _export_state(self):
+        return {"overdraft_used": self._overdraft_used.cents}
+    
+    def _import_state(self, state):
+        self._overdraft_used = Money.from_cents(state["overdraft_used"])
     
     def get_account_info(self):
         """Override to include overdraft information"""
@@ -151,130 +794,2418 @@ class CheckingAccount(BankAccount):
 class BusinessAccount(BankAccount):
     """Business account with special features"""
     
-    def __init__(self, account_number, account_holder, initial_balance=0, business_type="LLC"):
+    account_type = "business"
+    __slots__ = ("_business_type", "_employees", "_fee_rounding", "_monthly_fee")
+    
+    def __init__(self, account_number, account_holder, initial_balance=0, business_type="LLC",
+                 monthly_fee=25, fee_rounding=ROUND_HALF_UP):
         super().__init__(account_number, account_holder, initial_balance)
-        self._business_type = business_type
-        self._employees = []
-        self._monthly_fee = 25
+        self._business_type = sys.intern(business_type)
+        self._employees = None      # Allocated when the first employee is added
+        self._fee_rounding = fee_rounding
+        self._monthly_fee = Money(monthly_fee, fee_rounding)
     
     def add_employee(self, employee_name, employee_id):
         """Add employee to business account"""
-        self._employees.append({"name": employee_name, "id": employee_id})
+        with self._lock:
+            if self._employees is None:
+                self._employees = []
+            self._employees.append({"name": employee_name, "id": employee_id})
+            for observer in self._observers:
+                observer.on_employee_change(self, True, employee_name, employee_id)
         return f"Added employee: {employee_name} (ID: {employee_id})"
     
     def remove_employee(self, employee_id):
         """Remove employee from business account"""
-        for i, emp in enumerate(self._employees):
-            if emp["id"] == employee_id:
-                removed = self._employees.pop(i)
-                return f"Removed employee: {removed['name']}"
+        with self._lock:
+            for i, emp in enumerate(self._employees or ()):
+                if emp["id"] == employee_id:
+                    removed = self._employees.pop(i)
+                    for observer in self._observers:
+                        observer.on_employee_change(self, False, removed["name"], employee_id)
+                    return f"Removed employee: {removed['name']}"
         return "Employee not found"
     
     def get_employees(self):
         """Get list of employees"""
-        return self._employees.copy()
+        return self._employees.copy() if self._employees is not None else []
     
     def charge_monthly_fee(self):
         """Charge monthly fee"""
-        if self._is_active:
-            self._balance -= self._monthly_fee
-            self._record_transaction(f"Monthly fee charged: ${self._monthly_fee}")
-            return f"Monthly fee charged: ${self._monthly_fee}. New balance: ${self._balance}"
-        else:
-            return "Cannot charge fee - account inactive"
+        with self._lock:
+            if self._is_active:
+                self._post(TransactionLedger.MONTHLY_FEE, self._monthly_fee, -self._monthly_fee)
+                return f"Monthly fee charged: ${self._monthly_fee}. New balance: ${self._balance}"
+            else:
+                return "Cannot charge fee - account inactive"
+    
+    def _constructor_kwargs(self):
+        return {"business_type": self._business_type, "monthly_fee": str(self._monthly_fee),
+                "fee_rounding": self._fee_rounding}
+    
+    def _export_state(self):
+        return {"employees": self._employees or []}
+    
+    def _import_state(self, state):
+        self._employees = list(state["employees"]) or None
     
     def get_account_info(self):
         """Override to include business information"""
         base_info = super().get_account_info()
-        return f"{base_info}, Business Type: {self._business_type}, Employees: {len(self._employees)}"
+        return f"{base_info}, Business Type: {self._business_type}, Employees: {len(self._employees or ())}"
+
+class VelocityRule:
+    """Pre-commit withdrawal rule backed by a sliding window per account
+    
+    Rejects a withdrawal when the account already made `max_count`
+    withdrawals within the last `window_seconds`, or (if `max_total` is
+    set) when it would push the amount withdrawn in that window above
+    `max_total`. Each account's window is a fixed-size ring buffer, so a
+    check is O(1) (amortized when max_total is set).
+    
+    check() only looks at the window; commit() records the withdrawal.
+    Accounts call commit() on their rules once every rule has passed, so
+    a withdrawal another rule rejects doesn't use up this one's window.
+    """
+    
+    __slots__ = ("_max_count", "_window_seconds", "_max_total", "_clock", "_windows")
+    
+    def __init__(self, max_count, window_seconds, max_total=None, clock=time.monotonic):
+        self._max_count = max_count
+        self._window_seconds = window_seconds
+        self._max_total = None if max_total is None else Money(max_total).cents
+        self._clock = clock
+        self._windows = {}          # account_number -> [times, amounts, head, size, total]
+    
+    def check(self, account, amount):
+        """Whether the withdrawal fits in the account's window; records nothing"""
+        window = self._window(account)
+        now = self._clock()
+        if self._max_total is None:
+            # The slot about to be overwritten holds the max_count-th most recent
+            # withdrawal; while that is still inside the window the limit is reached
+            return window[0][window[2]] <= now - self._window_seconds
+        self._evict(window, now)
+        return window[3] < self._max_count and window[4] + amount._cents <= self._max_total
+    
+    def commit(self, account, amount):
+        """Record a withdrawal that passed check() on every rule (account lock held)"""
+        window = self._window(account)
+        head = window[2]
+        window[0][head] = self._clock()
+        if self._max_total is not None:
+            window[1][head] = amount._cents
+            window[3] += 1
+            window[4] += amount._cents
+        window[2] = head + 1 if head + 1 < self._max_count else 0
+    
+    def _window(self, account):
+        window = self._windows.get(account._account_number)
+        if window is None:
+            window = self._windows[account._account_number] = [
+                array("d", [float("-inf")]) * self._max_count, array("q", bytes(8 * self._max_count)), 0, 0, 0]
+        return window
+    
+    def _evict(self, window, now):
+        """Drop entries that slid out of the window from the running count and total"""
+        times, amounts, head, size, total = window
+        cutoff = now - self._window_seconds
+        tail = head - size          # Negative indexes wrap around the ring
+        while size and times[tail] <= cutoff:
+            total -= amounts[tail]
+            tail += 1
+            size -= 1
+        window[3] = size
+        window[4] = total
 
 class Bank:
     """Bank class to manage all accounts"""
     
-    def __init__(self, name):
+    _BATCH_OPERATIONS = {
+        "deposit": TransactionLedger.DEPOSIT,
+        "withdraw": TransactionLedger.WITHDRAWAL,
+        TransactionLedger.DEPOSIT: TransactionLedger.DEPOSIT,
+        TransactionLedger.WITHDRAWAL: TransactionLedger.WITHDRAWAL,
+    }
+    
+    _STATS_STRIPES = 64         # Power of two; postings lock only their account's stripe
+    _REINDEX_FRACTION = 16      # Re-sort the balance index once over 1/16 of it moved
+    
+    def __init__(self, name, verify_aggregates=False, event_store=None):
         self.name = name
         self._accounts = {}
+        self._account_numbers = []      # Append-only registration order, for AccountsView
+        self._account_positions = {}    # account_number -> index in _account_numbers
         self._account_counter = 1000
+        self._lock = threading.Lock()
+        
+        # Running aggregates. The balance total is split into striped
+        # partial sums so postings on unrelated accounts don't contend;
+        # account counts only change on create/activate/deactivate.
+        self._stats_lock = threading.Lock()
+        self._stripe_locks = [threading.Lock() for _ in range(self._STATS_STRIPES)]
+        self._stripe_totals = [0] * self._STATS_STRIPES                      # balance cents per stripe
+        self._moved_balances = [set() for _ in range(self._STATS_STRIPES)]  # numbers not yet re-indexed
+        self._type_counts = {}
+        self._active_count = 0
+        self._verify_aggregates = verify_aggregates
+        
+        # Secondary indexes. Holder/type buckets are updated on creation; the
+        # balance index is brought up to date on the first range query after
+        # a write, so a posting only records which account moved.
+        self._by_holder = {}
+        self._by_type = {}
+        self._index_lock = threading.Lock()
+        self._balance_index = []        # sorted (balance_cents, account_number)
+        self._indexed_balance = {}      # account_number -> balance_cents in the index
+        
+        # Optional durable storage (see Bank.open)
+        self._persistence = None
+        self._checkpoint_thread = None
+        self._checkpoint_guard = threading.Lock()
+        
+        # Optional audit log of every change, written after it is applied (see Bank.from_events)
+        self._events = event_store
+        
+        # Pre-commit withdrawal rules applied to every account
+        self._rules = ()
+    
+    @classmethod
+    def open(cls, name, directory, **persistence_options):
+        """Open a durable bank: restore the latest snapshot, replay the log tail"""
+        persistence = BankPersistence(directory, **persistence_options)
+        bank = cls(name)
+        persistence.recover(bank)
+        bank._persistence = persistence
+        return bank
+    
+    @classmethod
+    def from_events(cls, name, event_store, workers=1):
+        """Rebuild a bank by replaying its audit log, one shard per worker process"""
+        bank = cls(name)
+        for number, (account_type, holder, kwargs, state, ledger) in sorted(event_store.project(workers).items()):
+            balance, overdraft_used, is_active, employees, transactions, _ = state
+            account = cls._ACCOUNT_TYPES[account_type](str(number), holder, Money.from_cents(balance),
+                                                       **json.loads(kwargs))
+            account._is_active = is_active
+            account._import_state({"overdraft_used": overdraft_used,
+                                   "employees": [{"name": employee_name, "id": employee_id}
+                                                 for employee_name, employee_id in employees]})
+            if transactions:
+                account._ledger = TransactionLedger.from_bytes(ledger)
+            bank._register_account(account)
+            bank._account_counter = max(bank._account_counter, number + 1)
+        # Attach the store last so that rebuilding does not log anything
+        bank._events = event_store
+        return bank
     
     def create_account(self, account_type, account_holder, initial_balance=0, **kwargs):
         """Create a new account"""
-        account_number = str(self._account_counter)
-        self._account_counter += 1
-        
-        if account_type.lower() == "savings":
-            account = SavingsAccount(account_number, account_holder, initial_balance, **kwargs)
-        elif account_type.lower() == "checking":
-            account = CheckingAccount(account_number, account_holder, initial_balance, **kwargs)
-        elif account_type.lower() == "business":
-            account = BusinessAccount(account_number, account_holder, initial_balance, **kwargs)
-        else:
+        account = self._create_account(account_type, account_holder, initial_balance, **kwargs)
+        if account is None:
             return "Invalid account type"
+        return f"Created {account_type} account {account._account_number} for {account_holder}"
+    
+    def _create_account(self, account_type, account_holder, initial_balance=0, **kwargs):
+        """Create and register a new account, or return None for an unknown type"""
+        with self._lock:
+            account_number = str(self._account_counter)
+            self._account_counter += 1
+            
+            account_class = self._ACCOUNT_TYPES.get(account_type.lower())
+            if account_class is None:
+                return None
+            account = account_class(account_number, account_holder, initial_balance, **kwargs)
+            self._register_account(account)
+            if self._persistence is not None:
+                self._persistence.log_create(account, account._balance)
+            if self._events is not None:
+                self._events.log_open(account)
         
-        self._accounts[account_number] = account
-        return f"Created {account_type} account {account_number} for {account_holder}"
+        self.checkpoint_if_due()
+        return account
+    
+    def _register_account(self, account):
+        """Store a new account and fold it into the running aggregates"""
+        number = account._account_number
+        stripe = hash(number) & (self._STATS_STRIPES - 1)
+        with self._stats_lock:
+            self._accounts[number] = account
+            self._account_positions[number] = len(self._account_numbers)
+            self._account_numbers.append(number)
+            self._type_counts[account.account_type] = self._type_counts.get(account.account_type, 0) + 1
+            if account._is_active:
+                self._active_count += 1
+            
+            self._by_holder.setdefault(account._account_holder, {})[number] = account
+            self._by_type.setdefault(account.account_type, {})[number] = account
+            with self._stripe_locks[stripe]:
+                self._stripe_totals[stripe] += account._balance._cents
+                self._moved_balances[stripe].add(number)
+        account.attach(self)
+        for rule in self._rules:
+            account.add_rule(rule)
+    
+    def add_rule(self, rule):
+        """Add a pre-commit withdrawal rule to every account, present and future"""
+        with self._lock:
+            self._rules = self._rules + (rule,)
+            for account in list(self._accounts.values()):
+                account.add_rule(rule)
+    
+    def on_posting(self, account, kind, amount, delta, detail, timestamp):
+        """Observer hook: an account posted a ledger entry"""
+        if delta:
+            number = account._account_number
+            stripe = hash(number) & (self._STATS_STRIPES - 1)
+            with self._stripe_locks[stripe]:
+                self._stripe_totals[stripe] += delta._cents
+                self._moved_balances[stripe].add(number)
+        if self._persistence is not None:
+            self._persistence.log_posting(account, kind, amount, delta, detail, timestamp)
+            if self._persistence.snapshot_due():
+                self._checkpoint_in_background()
+        if self._events is not None:
+            self._events.log_posting(account, kind, amount, delta, detail, timestamp)
+    
+    def on_status_change(self, account, is_active):
+        """Observer hook: an account was activated or deactivated"""
+        with self._stats_lock:
+            self._active_count += 1 if is_active else -1
+        if self._persistence is not None:
+            self._persistence.log_status(account, is_active)
+        if self._events is not None:
+            self._events.log_status(account, is_active)
+    
+    def on_employee_change(self, account, added, employee_name, employee_id):
+        """Observer hook: a business account's employee list changed"""
+        if self._persistence is not None:
+            self._persistence.log_employee(account, added, employee_name, employee_id)
+        if self._events is not None:
+            self._events.log_employee(account, added, employee_name, employee_id)
+    
+    def _sorted_balances(self):
+        """The sorted (balance_cents, account_number) index, synced with the balances first"""
+        if any(self._moved_balances):
+            with self._index_lock:
+                self._sync_balance_index()
+        return self._balance_index
+    
+    def _sync_balance_index(self):
+        """Move every account whose balance changed since the last sync (index lock held)"""
+        moved = []
+        for stripe, lock in enumerate(self._stripe_locks):
+            if self._moved_balances[stripe]:
+                with lock:
+                    moved.extend(self._moved_balances[stripe])
+                    self._moved_balances[stripe] = set()
+        if not moved:
+            return
+        accounts = self._accounts
+        indexed = self._indexed_balance
+        if len(moved) * self._REINDEX_FRACTION > len(indexed):
+            for number in moved:
+                indexed[number] = accounts[number]._balance._cents
+            self._balance_index = sorted(zip(indexed.values(), indexed.keys()))
+            return
+        index = self._balance_index
+        for number in moved:
+            cents = accounts[number]._balance._cents
+            old = indexed.get(number)
+            if old == cents:
+                continue
+            if old is not None:
+                del index[bisect_left(index, (old, number))]
+            indexed[number] = cents
+            insort(index, (cents, number))
+    
+    def _total_cents(self):
+        """Sum of every account balance, from the striped running totals"""
+        return sum(self._stripe_totals)
+    
+    def find_by_holder(self, account_holder):
+        """Read-only live view of a holder's accounts, keyed by account number"""
+        # setdefault, so a view taken before the holder's first account still fills in
+        return MappingProxyType(self._by_holder.setdefault(account_holder, {}))
+    
+    def find_by_type(self, account_type):
+        """Read-only live view of every account of one type"""
+        return MappingProxyType(self._by_type.setdefault(account_type.lower(), {}))
+    
+    def find_by_balance(self, low=None, high=None):
+        """Live view of accounts with low <= balance <= high, lowest balance first"""
+        return BalanceRangeView(self, low, high)
+    
+    def top_accounts(self, k):
+        """Live view of the k accounts with the highest balances, highest first"""
+        return BalanceRangeView(self, descending=True, limit=k)
+    
+    def checkpoint(self):
+        """Write a snapshot of every account and start a fresh log segment"""
+        if self._persistence is None:
+            return "Persistence is not enabled"
+        # Freeze creations and every account so the snapshot matches the log exactly
+        with self._lock, self._locked(self._accounts.values()):
+            path = self._persistence.write_snapshot(self)
+        return f"Snapshot written: {os.path.basename(path)}"
+    
+    def checkpoint_if_due(self):
+        """Take a snapshot once enough log records have accumulated"""
+        persistence = self._persistence
+        if persistence is None or not persistence.snapshot_due():
+            return
+        with self._lock, self._locked(self._accounts.values()):
+            # Another thread may have taken the snapshot while we waited for the locks
+            if self._persistence is persistence and persistence.snapshot_due():
+                persistence.write_snapshot(self)
+    
+    def _checkpoint_in_background(self):
+        """Start checkpoint_if_due on its own thread
+        
+        Postings arrive with an account lock held, and a checkpoint has to
+        take every account lock in order, so it cannot run on that thread.
+        """
+        thread = self._checkpoint_thread
+        if thread is not None and thread.is_alive():
+            return
+        with self._checkpoint_guard:
+            thread = self._checkpoint_thread
+            if thread is None or not thread.is_alive():
+                self._checkpoint_thread = threading.Thread(target=self.checkpoint_if_due,
+                                                           name=f"{self.name} checkpoint")
+                self._checkpoint_thread.start()
+    
+    def _atomic(self):
+        """Log the postings made inside the block as one all-or-nothing WAL record"""
+        return self._persistence.atomic() if self._persistence is not None else nullcontext()
+    
+    def close(self):
+        """Flush the log and release the persistence files"""
+        if self._checkpoint_thread is not None:
+            self._checkpoint_thread.join()
+        if self._persistence is not None:
+            self._persistence.close()
+            self._persistence = None
     
     def get_account(self, account_number):
         """Get account by number"""
         return self._accounts.get(account_number)
     
-    def get_all_accounts(self):
-        """Get all accounts"""
-        return self._accounts.copy()
+    def get_all_accounts(self, live=False):
+        """Get all accounts as a read-only mapping view (a snapshot unless live=True)"""
+        return AccountsView(self, None if live else len(self._account_numbers))
+    
+    def apply_batch(self, postings):
+        """Apply many (account_number, op, amount) postings in one call
+        
+        op is "deposit"/"withdraw" (or the matching TransactionLedger kind).
+        Returns an array of PostingStatus codes in the same order as the input.
+        """
+        rows = list(postings)
+        results = array("b", bytes(len(rows)))
+        amounts = [None] * len(rows)
+        
+        # Validate the whole batch up front and group valid rows per account
+        groups = {}
+        accounts = self._accounts
+        operations = self._BATCH_OPERATIONS
+        to_money = BankAccount._to_money
+        for index, (account_number, op, amount) in enumerate(rows):
+            kind = operations.get(op)
+            if kind is None:
+                results[index] = PostingStatus.UNKNOWN_OPERATION
+            elif account_number not in accounts:
+                results[index] = PostingStatus.UNKNOWN_ACCOUNT
+            else:
+                amounts[index] = to_money(amount)
+                if amounts[index] is None:
+                    results[index] = PostingStatus.INVALID_AMOUNT
+                else:
+                    groups.setdefault(account_number, []).append(index)
+        
+        # Apply each account's rows in their original order
+        for account_number, indices in groups.items():
+            account = accounts[account_number]
+            deposit = account._apply_deposit
+            withdraw = account._apply_withdrawal
+            with account._lock:
+                for index in indices:
+                    if operations[rows[index][1]] == TransactionLedger.DEPOSIT:
+                        results[index] = deposit(amounts[index])
+                    else:
+                        results[index] = withdraw(amounts[index])
+        
+        # One group commit for the whole batch
+        if self._persistence is not None:
+            self._persistence.commit()
+            self.checkpoint_if_due()
+        return results
+    
+    def accrue_interest(self):
+        """Add interest to every savings account in one batched pass
+        
+        Gives the same result as calling SavingsAccount.add_interest on each
+        account: inactive accounts and balances under the minimum are skipped.
+        The inputs are gathered into columns and one map() of Money._scale
+        computes every interest amount, which saves the per-account method
+        dispatch and locking; the arithmetic itself is still one Python call
+        per account.
+        """
+        savings = [account for account in self._accounts.values() if isinstance(account, SavingsAccount)]
+        with self._locked(savings):
+            # Gather the inputs into contiguous columns (money in cents, rates as exact ratios)
+            balances = array("q", [account._balance.cents for account in savings])
+            minimums = array("q", [account._minimum_balance.cents for account in savings])
+            active = array("b", [account._is_active for account in savings])
+            ratios = [Money._ratio(account._interest_rate) for account in savings]
+            numerators = [ratio.numerator for ratio in ratios]
+            denominators = [ratio.denominator for ratio in ratios]
+            roundings = [account._interest_rounding for account in savings]
+            
+            # One map() over the columns computes every interest amount with
+            # the same integer rounding as Money.multiply
+            interest = array("q", map(Money._scale, balances, numerators, denominators, roundings))
+            eligible = [index for index, (balance, minimum, is_active)
+                        in enumerate(zip(balances, minimums, active))
+                        if is_active and balance >= minimum]
+            
+            # Post the ledger entries in bulk with a shared timestamp
+            timestamp = time.time()
+            for index in eligible:
+                amount = Money.from_cents(interest[index])
+                savings[index]._post(TransactionLedger.INTEREST, amount, amount, Money.ZERO, timestamp)
+        
+        if self._persistence is not None:
+            self._persistence.commit()
+        total_interest = Money.from_cents(sum(interest[index] for index in eligible))
+        return f"Interest added to {len(eligible)} savings accounts: ${total_interest}"
+    
+    def transfer(self, source_number, destination_number, amount):
+        """Move money between two accounts atomically"""
+        status = self._transfer(source_number, destination_number, amount)
+        return self._transfer_message(status, source_number, destination_number, amount)
+    
+    @staticmethod
+    def _transfer_message(status, source_number, destination_number, amount):
+        """Turn a transfer status code into a message"""
+        if PostingStatus.is_success(status):
+            return f"Transferred ${Money(amount)} from {source_number} to {destination_number}"
+        elif status == PostingStatus.UNKNOWN_ACCOUNT:
+            return "Account not found"
+        elif status == PostingStatus.INACTIVE:
+            return "Account is inactive"
+        elif status == PostingStatus.INVALID_AMOUNT:
+            return "Invalid transfer amount"
+        elif status == PostingStatus.BELOW_MINIMUM:
+            return f"Cannot transfer ${Money(amount)} - would go below minimum balance"
+        elif status == PostingStatus.REJECTED_BY_RULE:
+            return "Transfer rejected by account rules"
+        else:
+            return "Insufficient funds"
+    
+    def _transfer(self, source_number, destination_number, amount):
+        """Transfer under both account locks and return a PostingStatus code"""
+        source = self._accounts.get(source_number)
+        destination = self._accounts.get(destination_number)
+        if source is None or destination is None:
+            return PostingStatus.UNKNOWN_ACCOUNT
+        amount = BankAccount._to_money(amount)
+        if source is destination or amount is None:
+            return PostingStatus.INVALID_AMOUNT
+        
+        # Always lock in account-number order so two opposite transfers can't deadlock
+        first, second = sorted((source, destination), key=self._lock_order)
+        with first._lock, second._lock:
+            if not destination._is_active:
+                return PostingStatus.INACTIVE
+            # Check the credit before the debit, so a refused credit can't lose the money
+            if not destination._has_headroom(amount):
+                return PostingStatus.INVALID_AMOUNT
+            # One log record, so a torn tail can't keep the debit without the credit
+            with self._atomic():
+                status = source._apply_withdrawal(amount)
+                if PostingStatus.is_success(status):
+                    destination._apply_deposit(amount)
+            return status
+    
+    @contextmanager
+    def _locked(self, accounts):
+        """Hold the locks of many accounts, taken in account-number order"""
+        locks = [account._lock for account in sorted(accounts, key=self._lock_order)]
+        for lock in locks:
+            lock.acquire()
+        try:
+            yield
+        finally:
+            for lock in reversed(locks):
+                lock.release()
+    
+    @staticmethod
+    def _lock_order(account):
+        """Sort key that orders numeric account numbers numerically"""
+        number = account._account_number
+        return (len(number), number)
     
     def get_bank_info(self):
         """Get bank information"""
+        if self._verify_aggregates and not self.verify_aggregates():
+            raise RuntimeError("Bank aggregates drifted from the account balances")
         total_accounts = len(self._accounts)
-        total_balance = sum(account.get_balance() for account in self._accounts.values())
+        total_balance = Money.from_cents(self._total_cents())
         return f"Bank: {self.name}, Accounts: {total_accounts}, Total Balance: ${total_balance:.2f}"
+    
+    def get_bank_stats(self):
+        """Get the running aggregates without touching any account"""
+        with self._stats_lock:
+            total_accounts = len(self._accounts)
+            return {
+                "total_accounts": total_accounts,
+                "total_balance": Money.from_cents(self._total_cents()),
+                "accounts_by_type": dict(self._type_counts),
+                "active": self._active_count,
+                "inactive": total_accounts - self._active_count,
+            }
+    
+    def verify_aggregates(self):
+        """Recompute every aggregate from scratch and compare with the running values
+        
+        Every account lock is held while comparing, so no posting can sit
+        between its balance change and its aggregate update. Postings and
+        status changes take the account lock before the bank's locks, so
+        the account locks are taken first here too.
+        """
+        while True:
+            accounts = list(self._accounts.values())
+            with self._locked(accounts), self._stats_lock:
+                # Accounts are only added under the stats lock; retry if one arrived meanwhile
+                if len(self._accounts) == len(accounts):
+                    return self._compare_aggregates(accounts)
+    
+    def _compare_aggregates(self, accounts):
+        """Compare the running aggregates with accounts (every lock but the index's held)"""
+        with self._index_lock:
+            self._sync_balance_index()
+            for lock in self._stripe_locks:
+                lock.acquire()
+            try:
+                total_balance = sum(account._balance._cents for account in accounts)
+                active = sum(1 for account in accounts if account.is_active())
+                balance_index = sorted((account._balance._cents, account._account_number) for account in accounts)
+                return (total_balance == self._total_cents()
+                        and active == self._active_count
+                        and sum(self._type_counts.values()) == len(accounts)
+                        and balance_index == self._balance_index)
+            finally:
+                for lock in reversed(self._stripe_locks):
+                    lock.release()
+
+class BalanceRangeView(Sequence):
+    """Read-only view over a slice of the Bank's sorted balance index
+    
+    Nothing is copied: bounds are located with binary search each time
+    the view is used (after the bank folds in any balances that moved),
+    so it always reflects the current balances.
+    """
+    
+    def __init__(self, bank, low=None, high=None, descending=False, limit=None):
+        self._bank = bank
+        self._low = None if low is None else Money(low).cents
+        self._high = None if high is None else Money(high).cents
+        self._descending = descending
+        self._limit = limit
+    
+    def _bounds(self, index):
+        start = 0 if self._low is None else bisect_left(index, (self._low,))
+        stop = len(index) if self._high is None else bisect_left(index, (self._high + 1,))
+        stop = max(start, stop)
+        if self._limit is not None and stop - start > self._limit:
+            if self._descending:
+                start = stop - self._limit
+            else:
+                stop = start + self._limit
+        return start, stop
+    
+    def __len__(self):
+        start, stop = self._bounds(self._bank._sorted_balances())
+        return stop - start
+    
+    def __getitem__(self, position):
+        index = self._bank._sorted_balances()
+        start, stop = self._bounds(index)
+        if isinstance(position, slice):
+            return [self[i] for i in range(*position.indices(stop - start))]
+        if position < 0:
+            position += stop - start
+        if not 0 <= position < stop - start:
+            raise IndexError("BalanceRangeView index out of range")
+        offset = stop - 1 - position if self._descending else start + position
+        return self._bank._accounts[index[offset][1]]
+    
+    def __repr__(self):
+        return f"BalanceRangeView({[account.get_account_number() for account in self]})"
 
-# Test the bank system
-print("=== Bank System Test ===")
-
-# Create bank
-bank = Bank("Python Bank")
-print(bank.get_bank_info())
-
-# Create different account types
-print("\n=== Creating Accounts ===")
-print(bank.create_account("savings", "Alice", 1000, interest_rate=0.03))
-print(bank.create_account("checking", "Bob", 500, overdraft_limit=1000))
-print(bank.create_account("business", "Charlie", 5000, business_type="Corporation"))
-
-# Get accounts
-alice_account = bank.get_account("1000")
-bob_account = bank.get_account("1001")
-charlie_account = bank.get_account("1002")
-
-print("\n=== Account Operations ===")
-# Test savings account
-print("=== Savings Account (Alice) ===")
-print(alice_account.get_account_info())
-print(alice_account.deposit(500))
-print(alice_account.withdraw(200))
-print(alice_account.add_interest())
-print(f"Transactions: {alice_account.get_transactions()}")
-
-print("\n=== Checking Account (Bob) ===")
-print(bob_account.get_account_info())
-print(bob_account.deposit(300))
-print(bob_account.withdraw(800))  # This will use overdraft
-print(bob_account.withdraw(200))  # This will use more overdraft
-print(f"Transactions: {bob_account.get_transactions()}")
-
-print("\n=== Business Account (Charlie) ===")
-print(charlie_account.get_account_info())
-print(charlie_account.add_employee("David", "E001"))
-print(charlie_account.add_employee("Eve", "E002"))
-print(charlie_account.charge_monthly_fee())
-print(f"Employees: {charlie_account.get_employees()}")
-print(f"Transactions: {charlie_account.get_transactions()}")
-
-print("\n=== Bank Summary ===")
-print(bank.get_bank_info())
-
-print("\n=== OOP PRINCIPLES DEMONSTRATED ===")
-
-print("""
+class AccountsView(Mapping):
+    """Read-only mapping view of a Bank's accounts, in registration order
+    
+    Accounts are never removed, so the bank keeps an append-only list of
+    account numbers and a snapshot is that list plus the length it had
+    (its version). Iterating a snapshot stays consistent while new
+    accounts keep arriving; a live view (version None) includes them.
+    """
+    
+    __slots__ = ("_bank", "_version")
+    
+    def __init__(self, bank, version=None):
+        self._bank = bank
+        self._version = version
+    
+    @property
+    def version(self):
+        """Number of accounts this view covers"""
+        return len(self)
+    
+    def snapshot(self):
+        """Freeze the view at the bank's current number of accounts"""
+        return AccountsView(self._bank, len(self))
+    
+    def __len__(self):
+        return len(self._bank._account_numbers) if self._version is None else self._version
+    
+    def __getitem__(self, account_number):
+        position = self._bank._account_positions.get(account_number)
+        if position is None or (self._version is not None and position >= self._version):
+            raise KeyError(account_number)
+        return self._bank._accounts[account_number]
+    
+    def __iter__(self):
+        numbers = self._bank._account_numbers
+        for position in range(len(self)):
+            yield numbers[position]
+    
+    def __repr__(self):
+        return f"AccountsView({list(self)})"
+
+Bank._ACCOUNT_TYPES = {
+    "savings": SavingsAccount,
+    "checking": CheckingAccount,
+    "business": BusinessAccount,
+}
+
+class BankPersistence:
+    """Write-ahead log plus periodic snapshots for a Bank
+    
+    Every mutation is appended to the current log segment as a small
+    binary record (length + CRC32 + payload). A snapshot captures all
+    accounts and starts a new segment, so recovery loads the newest
+    snapshot and only replays the log written after it.
+    
+    durability:
+        "op"       - fsync after every record
+        "batch"    - fsync every batch_size records and on commit()
+        "interval" - fsync at most every `interval` seconds and on commit();
+                     a background thread syncs records left over when writes pause
+    
+    Records written inside atomic() are framed together as one GROUP
+    record, so recovery replays all of them or none.
+    """
+    
+    DURABILITY_LEVELS = ("op", "batch", "interval")
+    
+    # Record types
+    CREATE = 1
+    POSTING = 2
+    STATUS = 3
+    EMPLOYEE = 4
+    GROUP = 5
+    
+    _FRAME = struct.Struct("<II")            # payload length, crc32
+    _LENGTH = struct.Struct("<I")            # length of each record inside a GROUP
+    _POSTING = struct.Struct("<BIBqqqd")     # type, account, kind, amount, delta, detail (cents), timestamp
+    _STATUS = struct.Struct("<BIB")          # type, account, active / added flag
+    _CREATE = struct.Struct("<BIq")          # type, account, balance in cents
+    
+    def __init__(self, directory, durability="batch", batch_size=1024, interval=0.05,
+                 snapshot_every=1_000_000):
+        if durability not in self.DURABILITY_LEVELS:
+            raise ValueError(f"durability must be one of {self.DURABILITY_LEVELS}")
+        self._directory = directory
+        self._durability = durability
+        self._batch_size = batch_size
+        self._interval = interval
+        self._snapshot_every = snapshot_every
+        self._lock = threading.Lock()
+        self._pending = 0
+        self._records_since_snapshot = 0
+        self._last_sync = time.monotonic()
+        self._segment = 0
+        self._file = None
+        self._local = threading.local()     # Per-thread record group (see atomic)
+        self._closed = False
+        self._wakeup = threading.Condition(self._lock)
+        self._flusher = None
+        os.makedirs(directory, exist_ok=True)
+        if durability == "interval":
+            self._flusher = threading.Thread(target=self._flush_loop, name="wal flusher", daemon=True)
+            self._flusher.start()
+    
+    # Logging ---------------------------------------------------------------
+    
+    def log_create(self, account, initial_balance):
+        """Log a new account"""
+        payload = (self._CREATE.pack(self.CREATE, int(account._account_number), initial_balance.cents)
+                   + self._pack_text(account.account_type)
+                   + self._pack_text(account._account_holder)
+                   + self._pack_text(json.dumps(account._constructor_kwargs())))
+        self._append(payload)
+    
+    def log_posting(self, account, kind, amount, delta, detail, timestamp):
+        """Log one ledger posting"""
+        self._append(self._POSTING.pack(self.POSTING, int(account._account_number),
+                                        kind, amount.cents, delta.cents, detail.cents, timestamp))
+    
+    def log_status(self, account, is_active):
+        """Log an activate/deactivate"""
+        self._append(self._STATUS.pack(self.STATUS, int(account._account_number), is_active))
+    
+    def log_employee(self, account, added, employee_name, employee_id):
+        """Log an employee being added to or removed from a business account"""
+        self._append(self._STATUS.pack(self.EMPLOYEE, int(account._account_number), added)
+                     + self._pack_text(employee_name) + self._pack_text(employee_id))
+    
+    def commit(self):
+        """Group commit: make every record written so far durable"""
+        with self._lock:
+            self._sync()
+    
+    @contextmanager
+    def atomic(self):
+        """Write every record this thread logs inside the block as one GROUP record"""
+        if getattr(self._local, "group", None) is not None:
+            yield       # Already inside a group
+            return
+        group = self._local.group = []
+        try:
+            yield
+        finally:
+            self._local.group = None
+            if group:
+                self._append(bytes((self.GROUP,)) + b"".join(self._LENGTH.pack(len(payload)) + payload
+                                                             for payload in group))
+    
+    def snapshot_due(self):
+        """Check whether enough records have been logged to take a snapshot"""
+        return self._records_since_snapshot >= self._snapshot_every
+    
+    def close(self):
+        """Sync and close the current segment"""
+        with self._lock:
+            self._closed = True
+            self._wakeup.notify()
+            if self._file is not None:
+                self._sync()
+                self._file.close()
+                self._file = None
+        if self._flusher is not None:
+            self._flusher.join()
+    
+    def _append(self, payload):
+        group = getattr(self._local, "group", None)
+        if group is not None:
+            group.append(payload)
+            return
+        with self._lock:
+            self._file.write(self._FRAME.pack(len(payload), zlib.crc32(payload)))
+            self._file.write(payload)
+            self._pending += 1
+            self._records_since_snapshot += 1
+            if self._durability == "op":
+                self._sync()
+            elif self._durability == "batch":
+                if self._pending >= self._batch_size:
+                    self._sync()
+            elif time.monotonic() - self._last_sync >= self._interval:
+                self._sync()
+            elif self._pending == 1:
+                self._wakeup.notify()   # Start the flusher's countdown for this record
+    
+    def _flush_loop(self):
+        """Sync records that are still pending `interval` seconds after the last sync"""
+        with self._wakeup:
+            while not self._closed:
+                if not self._pending:
+                    self._wakeup.wait()
+                    continue
+                delay = self._last_sync + self._interval - time.monotonic()
+                if delay > 0:
+                    self._wakeup.wait(delay)
+                else:
+                    self._sync()
+    
+    def _sync(self):
+        """Flush buffered records and fsync (caller holds the lock)"""
+        if self._file is not None and self._pending:
+            self._file.flush()
+            os.fsync(self._file.fileno())
+            self._pending = 0
+        self._last_sync = time.monotonic()
+    
+    # Snapshots ---------------------------------------------------------------
+    
+    def write_snapshot(self, bank):
+        """Write a compact snapshot of the bank, then roll the log
+        
+        The caller must stop all mutations while this runs (Bank.checkpoint
+        holds every account lock).
+        """
+        with self._lock:
+            next_segment = self._segment + 1
+            path = self._path("snapshot", next_segment)
+            temporary = path + ".tmp"
+            with open(temporary, "wb") as out:
+                out.write(struct.pack("<I", bank._account_counter))
+                out.write(self._pack_text(bank.name))
+                out.write(struct.pack("<I", len(bank._accounts)))
+                for account in bank._accounts.values():
+                    out.write(self._CREATE.pack(self.CREATE, int(account._account_number), account._balance.cents))
+                    out.write(struct.pack("<B", account._is_active))
+                    out.write(self._pack_text(account.account_type))
+                    out.write(self._pack_text(account._account_holder))
+                    out.write(self._pack_text(json.dumps(account._constructor_kwargs())))
+                    out.write(self._pack_text(json.dumps(account._export_state())))
+                    # Straight from the columns; accounts that never posted keep no ledger
+                    ledger = account._ledger
+                    if ledger is None:
+                        out.write(struct.pack("<II", 4, 0))
+                    else:
+                        out.write(struct.pack("<I", ledger.byte_size()))
+                        ledger.write_to(out)
+                out.flush()
+                os.fsync(out.fileno())
+            os.replace(temporary, path)
+            
+            # Everything before the new segment is now covered by the snapshot
+            self._sync()
+            if self._file is not None:
+                self._file.close()
+            self._open_segment(next_segment)
+            self._records_since_snapshot = 0
+            self._remove_older_than(next_segment)
+            return path
+    
+    # Recovery ----------------------------------------------------------------
+    
+    def recover(self, bank):
+        """Load the newest snapshot into an empty bank and replay the log tail"""
+        snapshots = self._list("snapshot")
+        start = 0
+        if snapshots:
+            start = snapshots[-1]
+            self._load_snapshot(bank, self._path("snapshot", start))
+        
+        replayed = 0
+        for segment in self._list("wal"):
+            if segment >= start:
+                replayed += self._replay_segment(bank, self._path("wal", segment))
+        
+        self._open_segment(max([start] + self._list("wal")))
+        self._records_since_snapshot = replayed
+        return replayed
+    
+    def _load_snapshot(self, bank, path):
+        with open(path, "rb") as snapshot:
+            data = snapshot.read()
+        (bank._account_counter,) = struct.unpack_from("<I", data)
+        name, offset = self._unpack_text(data, 4)
+        (count,) = struct.unpack_from("<I", data, offset)
+        offset += 4
+        for _ in range(count):
+            _, number, balance = self._CREATE.unpack_from(data, offset)
+            offset += self._CREATE.size
+            (is_active,) = struct.unpack_from("<B", data, offset)
+            offset += 1
+            account_type, offset = self._unpack_text(data, offset)
+            holder, offset = self._unpack_text(data, offset)
+            kwargs, offset = self._unpack_text(data, offset)
+            state, offset = self._unpack_text(data, offset)
+            (ledger_size, entries) = struct.unpack_from("<II", data, offset)
+            offset += 4
+            ledger = TransactionLedger.from_bytes(data[offset:offset + ledger_size]) if entries else None
+            offset += ledger_size
+            
+            account = Bank._ACCOUNT_TYPES[account_type](str(number), holder, Money.from_cents(balance),
+                                                        **json.loads(kwargs))
+            account._is_active = bool(is_active)
+            account._import_state(json.loads(state))
+            account._ledger = ledger
+            bank._register_account(account)
+    
+    def _replay_segment(self, bank, path):
+        """Apply every intact record of one segment; stop at a torn tail"""
+        with open(path, "rb") as segment:
+            data = segment.read()
+        offset = 0
+        replayed = 0
+        while offset + self._FRAME.size <= len(data):
+            length, checksum = self._FRAME.unpack_from(data, offset)
+            payload = data[offset + self._FRAME.size:offset + self._FRAME.size + length]
+            if len(payload) < length or zlib.crc32(payload) != checksum:
+                break
+            offset += self._FRAME.size + length
+            self._apply_record(bank, payload)
+            replayed += 1
+        if offset < len(data):
+            # Drop the torn tail so new records are not appended after garbage
+            with open(path, "r+b") as segment:
+                segment.truncate(offset)
+        return replayed
+    
+    def _apply_record(self, bank, payload):
+        record_type = payload[0]
+        if record_type == self.POSTING:
+            _, number, kind, amount, delta, detail, timestamp = self._POSTING.unpack(payload)
+            bank._accounts[str(number)]._replay_posting(kind, Money.from_cents(amount), Money.from_cents(delta),
+                                                        Money.from_cents(detail), timestamp)
+        elif record_type == self.STATUS:
+            _, number, is_active = self._STATUS.unpack(payload)
+            bank._accounts[str(number)]._set_active(bool(is_active))
+        elif record_type == self.EMPLOYEE:
+            _, number, added = self._STATUS.unpack_from(payload)
+            employee_name, offset = self._unpack_text(payload, self._STATUS.size)
+            employee_id, offset = self._unpack_text(payload, offset)
+            account = bank._accounts[str(number)]
+            if added:
+                account.add_employee(employee_name, employee_id)
+            else:
+                account.remove_employee(employee_id)
+        elif record_type == self.GROUP:
+            offset = 1
+            while offset < len(payload):
+                (length,) = self._LENGTH.unpack_from(payload, offset)
+                offset += self._LENGTH.size
+                self._apply_record(bank, payload[offset:offset + length])
+                offset += length
+        elif record_type == self.CREATE:
+            _, number, initial_balance = self._CREATE.unpack_from(payload)
+            account_type, offset = self._unpack_text(payload, self._CREATE.size)
+            holder, offset = self._unpack_text(payload, offset)
+            kwargs, offset = self._unpack_text(payload, offset)
+            account = Bank._ACCOUNT_TYPES[account_type](str(number), holder, Money.from_cents(initial_balance),
+                                                        **json.loads(kwargs))
+            bank._register_account(account)
+            bank._account_counter = max(bank._account_counter, number + 1)
+    
+    # Files -------------------------------------------------------------------
+    
+    def _open_segment(self, segment):
+        self._segment = segment
+        self._file = open(self._path("wal", segment), "ab", buffering=1 << 20)
+        self._pending = 0
+    
+    def _path(self, prefix, segment):
+        extension = "log" if prefix == "wal" else "bin"
+        return os.path.join(self._directory, f"{prefix}-{segment:08d}.{extension}")
+    
+    def _list(self, prefix):
+        """Sorted segment numbers of every file with the given prefix"""
+        numbers = []
+        for filename in os.listdir(self._directory):
+            if filename.startswith(prefix + "-") and not filename.endswith(".tmp"):
+                numbers.append(int(filename.split("-")[1].split(".")[0]))
+        return sorted(numbers)
+    
+    def _remove_older_than(self, segment):
+        for prefix in ("wal", "snapshot"):
+            for number in self._list(prefix):
+                if number < segment:
+                    os.remove(self._path(prefix, number))
+    
+    @staticmethod
+    def _pack_text(text):
+        encoded = text.encode("utf-8")
+        return struct.pack("<H", len(encoded)) + encoded
+    
+    @staticmethod
+    def _unpack_text(data, offset):
+        (length,) = struct.unpack_from("<H", data, offset)
+        start = offset + 2
+        return bytes(data[start:start + length]).decode("utf-8"), start + length
+
+class EventStore:
+    """Append-only audit log of a Bank's changes, with replay
+    
+    The bank keeps serving from its in-memory accounts; each change is
+    appended here after it has been applied. The log can rebuild a whole
+    bank (Bank.from_events) or answer what an account looked like after
+    any event, but nothing reads the current state from it.
+    
+    Events are split into `shards` columnar segments by account number,
+    so a replay can fold one shard at a time in parallel. Every
+    `checkpoint_every` events the folded state of every account is saved,
+    and point-in-time queries only replay from the nearest checkpoint.
+    Sequence numbers start at 1; "as of event N" includes event N.
+    """
+    
+    # Event kinds (postings reuse the TransactionLedger kinds, which are all smaller)
+    OPENED = 16
+    DEACTIVATED = 17
+    ACTIVATED = 18
+    EMPLOYEE_ADDED = 19
+    EMPLOYEE_REMOVED = 20
+    
+    def __init__(self, shards=8, checkpoint_every=100_000):
+        self._shards = shards
+        self._checkpoint_every = checkpoint_every
+        self._lock = threading.Lock()
+        self._count = 0
+        # Per shard: seq, account, kind, amount, delta, detail (cents), timestamp
+        self._segments = [tuple(array(code) for code in "QIBqqqd") for _ in range(shards)]
+        self._texts = {}                        # seq -> strings carried by open / employee events
+        self._checkpoint_seqs = [0]
+        self._checkpoints = [([0] * shards, {})]   # (segment offsets, account -> state)
+    
+    def __len__(self):
+        return self._count
+    
+    # Logging (called from the Bank observer hooks) ----------------------------
+    
+    def log_open(self, account):
+        """Record a new account"""
+        text = (account.account_type, account._account_holder, json.dumps(account._constructor_kwargs()))
+        return self.append(account._account_number, self.OPENED, account._balance.cents,
+                           timestamp=time.time(), text=text)
+    
+    def log_posting(self, account, kind, amount, delta, detail, timestamp):
+        """Record one ledger posting"""
+        return self.append(account._account_number, kind, amount.cents, delta.cents, detail.cents, timestamp)
+    
+    def log_status(self, account, is_active):
+        """Record an activate/deactivate"""
+        return self.append(account._account_number, self.ACTIVATED if is_active else self.DEACTIVATED,
+                           timestamp=time.time())
+    
+    def log_employee(self, account, added, employee_name, employee_id):
+        """Record an employee being added to or removed from a business account"""
+        return self.append(account._account_number, self.EMPLOYEE_ADDED if added else self.EMPLOYEE_REMOVED,
+                           timestamp=time.time(), text=(employee_name, employee_id))
+    
+    def append(self, account_number, kind, amount=0, delta=0, detail=0, timestamp=0.0, text=None):
+        """Append one event (money in integer cents) and return its sequence number"""
+        number = int(account_number)
+        with self._lock:
+            self._count += 1
+            seq = self._count
+            seqs, accounts, kinds, amounts, deltas, details, timestamps = self._segments[number % self._shards]
+            seqs.append(seq)
+            accounts.append(number)
+            kinds.append(kind)
+            amounts.append(amount)
+            deltas.append(delta)
+            details.append(detail)
+            timestamps.append(timestamp)
+            if text is not None:
+                self._texts[seq] = text
+            if seq % self._checkpoint_every == 0:
+                self._checkpoint()
+            return seq
+    
+    # Point-in-time queries ---------------------------------------------------------
+    
+    def state_as_of(self, account_number, seq):
+        """Projected state of one account after event `seq` (None if it did not exist yet)"""
+        number = int(account_number)
+        shard = number % self._shards
+        with self._lock:
+            offsets, states = self._checkpoints[bisect_right(self._checkpoint_seqs, seq) - 1]
+            segment = self._segments[shard]
+            scratch = {number: list(states[number])} if number in states else {}
+            self._fold(segment, offsets[shard], bisect_right(segment[0], seq), self._texts, scratch, only=number)
+        state = scratch.get(number)
+        if state is None:
+            return None
+        return {"balance": Money.from_cents(state[0]), "overdraft_used": Money.from_cents(state[1]),
+                "active": state[2], "employees": [{"name": employee_name, "id": employee_id}
+                              for employee_name, employee_id in state[3]],
+                "transactions": state[4]}
+    
+    def balance_as_of(self, account_number, seq):
+        """Balance of one account after event `seq`"""
+        state = self.state_as_of(account_number, seq)
+        return state["balance"] if state is not None else None
+    
+    # Replay ------------------------------------------------------------------------
+    
+    def project(self, workers=1):
+        """Replay the events into every account's state, one shard per task
+        
+        Returns {account_number: (account_type, holder, kwargs_json, state, ledger_bytes)}.
+        With workers > 1 the shards are folded in forked processes that
+        share the event columns copy-on-write; where fork is unavailable
+        the shards are folded in this process.
+        """
+        with self._lock:
+            if workers > 1 and "fork" in multiprocessing.get_all_start_methods():
+                with ProcessPoolExecutor(workers, mp_context=multiprocessing.get_context("fork"),
+                                         initializer=_set_projection_store, initargs=(self,)) as pool:
+                    shards = list(pool.map(_project_shard, range(self._shards)))
+            else:
+                shards = [self._project_shard(shard) for shard in range(self._shards)]
+        projections = {}
+        for shard in shards:
+            projections.update(shard)
+        return projections
+    
+    def _project_shard(self, shard):
+        """Fold one whole segment into account states and rendered ledgers"""
+        states = {}
+        ledgers = {}
+        segment = self._segments[shard]
+        self._fold(segment, 0, len(segment[0]), self._texts, states, ledgers)
+        projections = {}
+        for number, state in states.items():
+            account_type, holder, kwargs = self._texts[state[5]]
+            projections[number] = (account_type, holder, kwargs, state, ledgers[number].to_bytes())
+        return projections
+    
+    def _checkpoint(self):
+        """Save the state of every account at the current sequence number (lock held)"""
+        offsets, states = self._checkpoints[-1]
+        states = {number: list(state) for number, state in states.items()}
+        new_offsets = []
+        for shard, segment in enumerate(self._segments):
+            stop = len(segment[0])
+            self._fold(segment, offsets[shard], stop, self._texts, states)
+            new_offsets.append(stop)
+        self._checkpoint_seqs.append(self._count)
+        self._checkpoints.append((new_offsets, states))
+    
+    @staticmethod
+    def _fold(segment, start, stop, texts, states, ledgers=None, only=None):
+        """Apply events [start, stop) of one segment to per-account states
+        
+        A state is [balance, overdraft_used, active, employees, transactions,
+        opened_seq] with money in cents. When `ledgers` is given, postings
+        are also appended to a TransactionLedger per account.
+        """
+        seqs, accounts, kinds, amounts, deltas, details, timestamps = segment
+        for index in range(start, stop):
+            number = accounts[index]
+            if only is not None and number != only:
+                continue
+            kind = kinds[index]
+            if kind < EventStore.OPENED:
+                state = states[number]
+                state[0] += deltas[index]
+                if kind == TransactionLedger.OVERDRAFT_WITHDRAWAL:
+                    state[1] += details[index]
+                state[4] += 1
+                if ledgers is not None:
+                    ledgers[number].append_cents(kind, amounts[index], state[0], details[index], timestamps[index])
+            elif kind == EventStore.OPENED:
+                states[number] = [amounts[index], 0, True, (), 0, seqs[index]]
+                if ledgers is not None:
+                    ledgers[number] = TransactionLedger()
+            elif kind == EventStore.EMPLOYEE_ADDED:
+                states[number][3] += (texts[seqs[index]],)
+            elif kind == EventStore.EMPLOYEE_REMOVED:
+                employee_id = texts[seqs[index]][1]
+                states[number][3] = tuple(employee for employee in states[number][3] if employee[1] != employee_id)
+            else:
+                states[number][2] = kind == EventStore.ACTIVATED
+
+_projection_store = None    # The EventStore a forked projection worker reads from
+
+def _set_projection_store(store):
+    global _projection_store
+    _projection_store = store
+
+def _project_shard(shard):
+    return _projection_store._project_shard(shard)
+
+# Example of extending the system
+class BillingHistory:
+    """Dated history of what a credit card owes, with prefix sums
+    
+    One row per purchase, payment or interest charge, in date order.
+    Alongside the amount owed after each row it keeps running totals of
+    purchases, payments and the time integral of the amount owed, so
+    averages and totals over any period take two binary searches instead
+    of a replay. The integral is an exact integer in cent-microseconds
+    (times are taken to the microsecond), so interest never depends on
+    float rounding.
+    """
+    
+    __slots__ = ("_times", "_owed", "_integral", "_purchased", "_paid")
+    
+    TICKS_PER_SECOND = 1_000_000
+    
+    def __init__(self):
+        self._times = array("d")
+        self._owed = array("q")         # cents owed after each row
+        self._integral = []             # cent-microseconds owed up to each row (ints can outgrow int64)
+        self._purchased = array("q")    # running total of purchases, cents
+        self._paid = array("q")         # running total of payments, cents
+    
+    def __len__(self):
+        return len(self._times)
+    
+    def append(self, timestamp, owed, purchased=0, paid=0):
+        """Record one dated change (cents); rows must arrive in date order"""
+        times = self._times
+        if times:
+            if timestamp < times[-1]:
+                raise ValueError("Billing postings must be recorded in date order")
+            self._integral.append(self._integral[-1] + self._owed[-1] * (self.ticks(timestamp) - self.ticks(times[-1])))
+            self._purchased.append(self._purchased[-1] + purchased)
+            self._paid.append(self._paid[-1] + paid)
+        else:
+            self._integral.append(0)
+            self._purchased.append(purchased)
+            self._paid.append(paid)
+        times.append(timestamp)
+        self._owed.append(owed)
+    
+    def owed_at(self, timestamp):
+        """Cents owed at a moment (rows at exactly that time included)"""
+        row = bisect_right(self._times, timestamp) - 1
+        return self._owed[row] if row >= 0 else 0
+    
+    def balance_ticks(self, start, end):
+        """Integral of the amount owed over [start, end), in cent-microseconds"""
+        return self._integral_at(end) - self._integral_at(start)
+    
+    @classmethod
+    def ticks(cls, timestamp):
+        """A timestamp as whole microseconds"""
+        return round(timestamp * cls.TICKS_PER_SECOND)
+    
+    def purchases_between(self, start, end):
+        """Cents purchased in [start, end)"""
+        return self._total_before(self._purchased, end) - self._total_before(self._purchased, start)
+    
+    def payments_between(self, start, end):
+        """Cents paid in [start, end)"""
+        return self._total_before(self._paid, end) - self._total_before(self._paid, start)
+    
+    def _integral_at(self, timestamp):
+        row = bisect_right(self._times, timestamp) - 1
+        if row < 0:
+            return 0
+        return self._integral[row] + self._owed[row] * (self.ticks(timestamp) - self.ticks(self._times[row]))
+    
+    def _total_before(self, totals, timestamp):
+        row = bisect_left(self._times, timestamp) - 1
+        return totals[row] if row >= 0 else 0
+
+class CreditCardAccount(BankAccount):
+    """Credit card account with credit limit and monthly statements"""
+    
+    account_type = "credit"
+    __slots__ = ("_credit_limit", "_credit_used", "_apr", "_grace_days", "_billing",
+                 "_cycle_start", "_statement_balance", "_payment_due")
+    
+    SECONDS_PER_DAY = 86400
+    MINIMUM_DUE = Money(5)              # The minimum due is the larger of $5
+    MINIMUM_DUE_RATE = 0.02             # and 2% of the new balance, capped at the balance
+    
+    def __init__(self, account_number, account_holder, credit_limit=5000, apr=0.1999, grace_days=25):
+        super().__init__(account_number, account_holder, 0)
+        self._credit_limit = Money(credit_limit)
+        self._credit_used = Money.ZERO
+        self._apr = apr
+        self._grace_days = grace_days
+        self._billing = None            # Allocated on the first purchase
+        self._cycle_start = None        # Start of the open statement cycle
+        self._statement_balance = Money.ZERO
+        self._payment_due = None
+    
+    def make_purchase(self, amount, timestamp=None):
+        """Make a purchase with credit card"""
+        amount = self._to_money(amount)
+        if amount is None:
+            return "Invalid purchase amount"
+        with self._lock:
+            timestamp = self._posting_time(timestamp)
+            if timestamp is None:
+                return "Purchase declined - dated before the card's latest posting"
+            if self._credit_used + amount <= self._credit_limit:
+                self._charge(TransactionLedger.PURCHASE, amount, amount, timestamp)
+                return f"Purchase of ${amount} approved. Credit used: ${self._credit_used}"
+            else:
+                return "Purchase declined - credit limit exceeded"
+    
+    def make_payment(self, amount, timestamp=None):
+        """Make payment to credit card"""
+        amount = self._to_money(amount)
+        if amount is None:
+            return "Invalid payment amount"
+        with self._lock:
+            timestamp = self._posting_time(timestamp)
+            if timestamp is None:
+                return "Payment declined - dated before the card's latest posting"
+            if amount <= self._credit_used:
+                self._charge(TransactionLedger.PAYMENT, amount, -amount, timestamp)
+                return f"Payment of ${amount} processed. Credit used: ${self._credit_used}"
+            else:
+                return "Payment amount exceeds credit used"
+    
+    def get_available_credit(self):
+        """Get available credit"""
+        return self._credit_limit - self._credit_used
+    
+    def get_average_daily_balance(self, start, end):
+        """Average amount owed over [start, end)"""
+        span = BillingHistory.ticks(end) - BillingHistory.ticks(start)
+        if self._billing is None or span <= 0:
+            return Money.ZERO
+        return Money.from_cents(Money._scale(self._billing.balance_ticks(start, end), 1, span, ROUND_HALF_EVEN))
+    
+    def interest_for(self, start, end):
+        """Interest on the average daily balance over [start, end), in O(log n)"""
+        if self._billing is None or end <= start:
+            return Money.ZERO
+        # Exact: cent-microseconds * apr / (365 days of microseconds), rounded once
+        apr = Money._ratio(self._apr)
+        ticks_per_year = 365 * self.SECONDS_PER_DAY * BillingHistory.TICKS_PER_SECOND
+        return Money.from_cents(Money._scale(self._billing.balance_ticks(start, end), apr.numerator,
+                                             apr.denominator * ticks_per_year, ROUND_HALF_EVEN))
+    
+    @classmethod
+    def minimum_due(cls, balance):
+        """Minimum payment on a statement balance: max(MINIMUM_DUE, balance * MINIMUM_DUE_RATE), at most the balance"""
+        balance = Money(balance)
+        return min(balance, max(cls.MINIMUM_DUE, balance.multiply(cls.MINIMUM_DUE_RATE)))
+    
+    def close_statement(self, closing_time=None):
+        """Close the current cycle: charge interest unless in grace, and work out the minimum due
+        
+        Interest is waived while the previous statement balance was paid in
+        full by its due date. Statements must be closed in date order.
+        """
+        with self._lock:
+            closing_time = time.time() if closing_time is None else closing_time
+            if self._billing is None:
+                self._billing = BillingHistory()
+            billing = self._billing
+            start = self._cycle_start
+            if start is None:
+                start = billing._times[0] if len(billing) else closing_time
+            
+            previous = self._statement_balance
+            paid_by_due = Money.from_cents(billing.payments_between(start, self._payment_due or start))
+            in_grace = previous == Money.ZERO or paid_by_due >= previous
+            interest = Money.ZERO if in_grace else self.interest_for(start, closing_time)
+            if interest:
+                self._charge(TransactionLedger.INTEREST_CHARGE, interest, interest, closing_time)
+            
+            new_balance = Money.from_cents(billing.owed_at(closing_time))
+            minimum_due = self.minimum_due(new_balance)
+            statement = {
+                "period_start": start,
+                "period_end": closing_time,
+                "previous_balance": previous,
+                "purchases": Money.from_cents(billing.purchases_between(start, closing_time)),
+                "payments": Money.from_cents(billing.payments_between(start, closing_time)),
+                "average_daily_balance": self.get_average_daily_balance(start, closing_time),
+                "interest": interest,
+                "new_balance": new_balance,
+                "minimum_due": minimum_due,
+                "payment_due": closing_time + self._grace_days * self.SECONDS_PER_DAY,
+            }
+            self._cycle_start = closing_time
+            self._statement_balance = new_balance
+            self._payment_due = statement["payment_due"]
+            return statement
+    
+    def _posting_time(self, timestamp):
+        """Date for a purchase or payment, or None if `timestamp` is before the latest posting
+        
+        Without a timestamp it is now, moved up if needed to keep date order.
+        """
+        if timestamp is None:
+            return self._next_timestamp(time.time())
+        return timestamp if self._next_timestamp(timestamp) == timestamp else None
+    
+    def _next_timestamp(self, timestamp):
+        """Override: the billing history must stay in date order too"""
+        timestamp = super()._next_timestamp(timestamp)
+        if self._billing is not None and self._billing._times:
+            return max(timestamp, self._billing._times[-1])
+        return timestamp
+    
+    def _charge(self, kind, amount, owed_delta, timestamp=None):
+        """Change the amount owed, post it to the ledger and the billing history"""
+        timestamp = time.time() if timestamp is None else timestamp
+        if self._billing is None:
+            self._billing = BillingHistory()
+        self._billing.append(timestamp, self._credit_used.cents + owed_delta.cents,
+                             amount.cents if kind == TransactionLedger.PURCHASE else 0,
+                             amount.cents if kind == TransactionLedger.PAYMENT else 0)
+        self._credit_used += owed_delta
+        self._post(kind, amount, Money.ZERO, Money.ZERO, timestamp)
+    
+    def get_account_info(self):
+        """Override to include credit information"""
+        base_info = super().get_account_info()
+        return f"{base_info}, Credit Limit: ${self._credit_limit}, Credit Used: ${self._credit_used}"
+
+def build_interest_bank(num_accounts, seed=3):
+    """Build a bank with a mix of savings accounts, some inactive or under the minimum"""
+    rng = random.Random(seed)
+    interest_bank = Bank("Interest Bank")
+    for i in range(num_accounts):
+        interest_bank.create_account("savings", f"Saver {i}", rng.randint(0, 5000),
+                                     interest_rate=rng.choice([0.01, 0.02, 0.035]))
+        if rng.random() < 0.1:
+            interest_bank.get_account(str(1000 + i)).deactivate()
+    return interest_bank
+
+class BankProtocol:
+    """Length-prefixed binary wire format shared by BankServer and BankClient
+    
+    Every frame is a little-endian uint32 length followed by the payload.
+    Requests start with (request_id, opcode); responses start with
+    (request_id, PostingStatus code). Money travels as int64 cents.
+    """
+    
+    CREATE = 1
+    DEPOSIT = 2
+    WITHDRAW = 3
+    TRANSFER = 4
+    BALANCE = 5
+    INFO = 6
+    
+    LENGTH = struct.Struct("<I")
+    HEADER = struct.Struct("<IB")            # request id, opcode / status
+    ACCOUNT_AMOUNT = struct.Struct("<Iq")    # account, cents
+    TRANSFER_BODY = struct.Struct("<IIq")    # source, destination, cents
+    ACCOUNT = struct.Struct("<I")
+    CENTS = struct.Struct("<q")
+    
+    @classmethod
+    def frame(cls, payload):
+        return cls.LENGTH.pack(len(payload)) + payload
+    
+    @staticmethod
+    def pack_text(text):
+        encoded = text.encode("utf-8")
+        return struct.pack("<H", len(encoded)) + encoded
+    
+    @staticmethod
+    def unpack_text(data, offset):
+        (length,) = struct.unpack_from("<H", data, offset)
+        start = offset + 2
+        return bytes(data[start:start + length]).decode("utf-8"), start + length
+    
+    @classmethod
+    async def read_frame(cls, reader):
+        """Read one frame, or return None when the peer closed the connection"""
+        try:
+            header = await reader.readexactly(cls.LENGTH.size)
+            return await reader.readexactly(cls.LENGTH.unpack(header)[0])
+        except asyncio.IncompleteReadError:
+            return None
+
+class BankServer:
+    """asyncio front-end that exposes a Bank over a local socket
+    
+    Requests on one connection are pipelined: the server keeps reading
+    while earlier requests are still being answered, and responses carry
+    the request id. Deposits and withdrawals that arrive for the same
+    account during one event-loop tick are coalesced into a micro-batch
+    that is applied under a single lock acquisition and one group commit.
+    """
+    
+    def __init__(self, bank, host="127.0.0.1", port=0):
+        self._bank = bank
+        self._host = host
+        self._port = port
+        self._server = None
+        self._pending = {}          # account_number -> [(opcode, Money, future), ...]
+        self._batches_flushed = 0
+        self._operations_batched = 0
+    
+    @property
+    def port(self):
+        return self._server.sockets[0].getsockname()[1]
+    
+    def get_batch_stats(self):
+        """Average micro-batch size so far"""
+        batches = max(self._batches_flushed, 1)
+        return {"batches": self._batches_flushed, "operations": self._operations_batched,
+                "average_batch": self._operations_batched / batches}
+    
+    async def start(self):
+        self._server = await asyncio.start_server(self._handle_connection, self._host, self._port)
+        return self
+    
+    async def close(self):
+        self._server.close()
+        await self._server.wait_closed()
+    
+    async def _handle_connection(self, reader, writer):
+        in_flight = set()
+        try:
+            while True:
+                payload = await BankProtocol.read_frame(reader)
+                if payload is None:
+                    break
+                # Don't wait for the answer before reading the next request
+                task = asyncio.ensure_future(self._serve(payload, writer))
+                in_flight.add(task)
+                task.add_done_callback(in_flight.discard)
+            if in_flight:
+                await asyncio.gather(*in_flight)
+        finally:
+            writer.close()
+    
+    async def _serve(self, payload, writer):
+        # Every request gets an answer, so a bad frame can't leave its client waiting
+        try:
+            request_id, opcode = BankProtocol.HEADER.unpack_from(payload)
+        except struct.error:
+            # Too short to carry an id; clients never use id 0
+            request_id, status, response_body = 0, PostingStatus.MALFORMED_REQUEST, b""
+        else:
+            try:
+                status, response_body = await self._dispatch(opcode, payload[BankProtocol.HEADER.size:])
+            except (struct.error, UnicodeDecodeError, ValueError, OverflowError):
+                status, response_body = PostingStatus.MALFORMED_REQUEST, b""
+            except Exception:
+                status, response_body = PostingStatus.INTERNAL_ERROR, b""
+        try:
+            writer.write(BankProtocol.frame(BankProtocol.HEADER.pack(request_id, status) + response_body))
+            await writer.drain()
+        except ConnectionError:
+            pass        # The client went away; nobody is left to answer
+    
+    async def _dispatch(self, opcode, body):
+        bank = self._bank
+        if opcode in (BankProtocol.DEPOSIT, BankProtocol.WITHDRAW):
+            number, cents = BankProtocol.ACCOUNT_AMOUNT.unpack(body)
+            account_number = str(number)
+            if bank.get_account(account_number) is None:
+                return PostingStatus.UNKNOWN_ACCOUNT, BankProtocol.CENTS.pack(0)
+            return await self._enqueue(account_number, opcode, Money.from_cents(cents))
+        
+        if opcode == BankProtocol.TRANSFER:
+            source, destination, cents = BankProtocol.TRANSFER_BODY.unpack(body)
+            # Keep per-connection ordering: queued work for both accounts runs first
+            self._flush(str(source))
+            self._flush(str(destination))
+            status = bank._transfer(str(source), str(destination), Money.from_cents(cents))
+            self._commit()
+            return status, b""
+        
+        if opcode == BankProtocol.BALANCE:
+            (number,) = BankProtocol.ACCOUNT.unpack(body)
+            self._flush(str(number))
+            account = bank.get_account(str(number))
+            if account is None:
+                return PostingStatus.UNKNOWN_ACCOUNT, BankProtocol.CENTS.pack(0)
+            return PostingStatus.OK, BankProtocol.CENTS.pack(account.get_balance().cents)
+        
+        if opcode == BankProtocol.CREATE:
+            account_type, offset = BankProtocol.unpack_text(body, 0)
+            holder, offset = BankProtocol.unpack_text(body, offset)
+            (cents,) = BankProtocol.CENTS.unpack_from(body, offset)
+            account = bank._create_account(account_type, holder, Money.from_cents(cents))
+            if account is None:
+                return PostingStatus.UNKNOWN_OPERATION, BankProtocol.ACCOUNT.pack(0)
+            self._commit()
+            return PostingStatus.OK, BankProtocol.ACCOUNT.pack(int(account._account_number))
+        
+        if opcode == BankProtocol.INFO:
+            return PostingStatus.OK, BankProtocol.pack_text(bank.get_bank_info())
+        
+        return PostingStatus.UNKNOWN_OPERATION, b""
+    
+    def _enqueue(self, account_number, opcode, amount):
+        """Add a mutation to its account's micro-batch and return a future for the result"""
+        future = asyncio.get_running_loop().create_future()
+        batch = self._pending.get(account_number)
+        if batch is None:
+            batch = self._pending[account_number] = []
+            asyncio.get_running_loop().call_soon(self._flush, account_number)
+        batch.append((opcode, amount, future))
+        return future
+    
+    def _flush(self, account_number):
+        """Apply one account's queued mutations together"""
+        batch = self._pending.pop(account_number, None)
+        if not batch:
+            return
+        account = self._bank.get_account(account_number)
+        with account._lock:
+            for opcode, amount, future in batch:
+                try:
+                    if opcode == BankProtocol.DEPOSIT:
+                        status = account._apply_deposit(amount)
+                    else:
+                        status = account._apply_withdrawal(amount)
+                except Exception as error:
+                    future.set_exception(error)     # Answered by _serve; the rest of the batch still runs
+                else:
+                    future.set_result((status, BankProtocol.CENTS.pack(account._balance.cents)))
+        self._commit()
+        self._batches_flushed += 1
+        self._operations_batched += len(batch)
+    
+    def _commit(self):
+        """Make what was just applied durable before it is acknowledged"""
+        if self._bank._persistence is not None:
+            self._bank._persistence.commit()
+
+class BankClient:
+    """Pipelining asyncio client for BankServer"""
+    
+    def __init__(self, reader, writer):
+        self._reader = reader
+        self._writer = writer
+        self._next_id = 0
+        self._waiting = {}
+        self._receiver = asyncio.ensure_future(self._receive())
+    
+    @classmethod
+    async def connect(cls, host, port):
+        reader, writer = await asyncio.open_connection(host, port)
+        return cls(reader, writer)
+    
+    async def close(self):
+        self._writer.close()
+        self._receiver.cancel()
+        try:
+            await self._receiver
+        except asyncio.CancelledError:
+            pass
+    
+    async def create_account(self, account_type, holder, initial_balance=0):
+        status, body = await self._request(BankProtocol.CREATE, BankProtocol.pack_text(account_type)
+                                           + BankProtocol.pack_text(holder)
+                                           + BankProtocol.CENTS.pack(Money(initial_balance).cents))
+        return status, str(BankProtocol.ACCOUNT.unpack(body)[0]) if body else None
+    
+    async def deposit(self, account_number, amount):
+        return await self._money_request(BankProtocol.DEPOSIT, account_number, amount)
+    
+    async def withdraw(self, account_number, amount):
+        return await self._money_request(BankProtocol.WITHDRAW, account_number, amount)
+    
+    async def transfer(self, source_number, destination_number, amount):
+        status, _ = await self._request(BankProtocol.TRANSFER, BankProtocol.TRANSFER_BODY.pack(
+            int(source_number), int(destination_number), Money(amount).cents))
+        return status
+    
+    async def balance(self, account_number):
+        status, body = await self._request(BankProtocol.BALANCE, BankProtocol.ACCOUNT.pack(int(account_number)))
+        return status, self._money(body)
+    
+    async def info(self):
+        _, body = await self._request(BankProtocol.INFO, b"")
+        return BankProtocol.unpack_text(body, 0)[0] if body else ""
+    
+    async def _money_request(self, opcode, account_number, amount):
+        status, body = await self._request(opcode, BankProtocol.ACCOUNT_AMOUNT.pack(
+            int(account_number), Money(amount).cents))
+        return status, self._money(body)
+    
+    @staticmethod
+    def _money(body):
+        """Decode a balance reply; error replies (MALFORMED_REQUEST, INTERNAL_ERROR) carry no body"""
+        return Money.from_cents(BankProtocol.CENTS.unpack(body)[0]) if body else None
+    
+    def _request(self, opcode, body):
+        """Send without waiting for earlier replies; the future resolves on our id"""
+        self._next_id += 1
+        future = asyncio.get_running_loop().create_future()
+        self._waiting[self._next_id] = future
+        self._writer.write(BankProtocol.frame(BankProtocol.HEADER.pack(self._next_id, opcode) + body))
+        return future
+    
+    async def _receive(self):
+        while True:
+            payload = await BankProtocol.read_frame(self._reader)
+            if payload is None:
+                return
+            request_id, status = BankProtocol.HEADER.unpack_from(payload)
+            future = self._waiting.pop(request_id, None)
+            if future is not None:      # id 0 answers a frame the server could not read
+                future.set_result((status, payload[BankProtocol.HEADER.size:]))
+
+async def demo_bank_service():
+    service_bank = Bank("Service Bank")
+    server = await BankServer(service_bank).start()
+    client = await BankClient.connect("127.0.0.1", server.port)
+    _, first = await client.create_account("checking", "Judy", 500)
+    _, second = await client.create_account("savings", "Karl", 1000)
+    # Three pipelined deposits to the same account land in one micro-batch
+    results = await asyncio.gather(client.deposit(first, 10), client.deposit(first, 20), client.deposit(first, 30))
+    print(f"Pipelined deposits: {[(status, str(balance)) for status, balance in results]}")
+    print(f"Transfer status: {await client.transfer(first, second, 60)}")
+    print(f"Balance of {second}: {(await client.balance(second))[1]}")
+    print(f"Info: {await client.info()}")
+    print(f"Micro-batches: {server.get_batch_stats()}")
+    await client.close()
+    await server.close()
+
+class ShardedBank:
+    """Bank whose accounts are partitioned across worker processes
+    
+    Each worker process owns an ordinary Bank holding the accounts whose
+    number hashes to it, so shards run on separate cores without sharing
+    a GIL. This coordinator routes every call to the owning shard over a
+    pipe, batching work where it can. Transfers between two shards use
+    two-phase commit: the destination shard prepares the credit first,
+    then the source shard applies the debit as the deciding participant,
+    and the credit is committed or aborted to match. A request that
+    fails inside a worker is answered with an error status, so one bad
+    call cannot take its shard down.
+    
+    Each shard connection has its own lock, held only for that shard's
+    round trip, so calls to different shards run concurrently. Workers
+    are forked where the platform allows it and spawned otherwise;
+    spawned workers re-import this file, which is why its demo only runs
+    under the __main__ guard.
+    """
+    
+    # Shard operations
+    CREATE = 1
+    DEPOSIT = 2
+    WITHDRAW = 3
+    BALANCE = 4
+    TRANSFER = 5
+    BATCH = 6
+    STATS = 7
+    PREPARE_CREDIT = 8
+    DEBIT = 9
+    COMMIT_CREDIT = 10
+    ABORT_CREDIT = 11
+    REFUND = 12
+    
+    def __init__(self, name, num_workers=4):
+        self.name = name
+        self._account_counter = 1000
+        self._next_transaction = 0
+        self._lock = threading.Lock()        # Guards the two counters only
+        start_method = "fork" if "fork" in multiprocessing.get_all_start_methods() else "spawn"
+        context = multiprocessing.get_context(start_method)
+        self._connections = []
+        self._shard_locks = []               # One per connection, held for a whole round trip
+        self._workers = []
+        for shard in range(num_workers):
+            connection, worker_connection = context.Pipe()
+            worker = context.Process(target=_run_shard, args=(f"{name} shard {shard}", worker_connection),
+                                     daemon=True)
+            worker.start()
+            self._connections.append(connection)
+            self._shard_locks.append(threading.Lock())
+            self._workers.append(worker)
+    
+    def shard_of(self, account_number):
+        """Index of the worker that owns an account (stable across processes)"""
+        return zlib.crc32(account_number.encode()) % len(self._connections)
+    
+    def create_account(self, account_type, account_holder, initial_balance=0, **kwargs):
+        """Create a new account on the shard its number hashes to"""
+        with self._lock:
+            account_number = str(self._account_counter)
+            self._account_counter += 1
+        if account_type.lower() not in Bank._ACCOUNT_TYPES:
+            return "Invalid account type"
+        status = self._call(self.shard_of(account_number), [(self.CREATE, account_number, account_type.lower(),
+                                                             account_holder, initial_balance, kwargs)])[0]
+        if status != PostingStatus.OK:
+            return "Invalid account details"
+        return f"Created {account_type} account {account_number} for {account_holder}"
+    
+    def deposit(self, account_number, amount):
+        """Deposit into an account on its shard"""
+        return self._call_one(account_number, (self.DEPOSIT, account_number, amount))
+    
+    def withdraw(self, account_number, amount):
+        """Withdraw from an account on its shard"""
+        return self._call_one(account_number, (self.WITHDRAW, account_number, amount))
+    
+    def get_balance(self, account_number):
+        """Get an account's balance (None if the account does not exist)"""
+        return self._call_one(account_number, (self.BALANCE, account_number))
+    
+    def transfer(self, source_number, destination_number, amount):
+        """Move money between two accounts, across shards if needed"""
+        status = self._transfer(source_number, destination_number, amount)
+        return Bank._transfer_message(status, source_number, destination_number, amount)
+    
+    def _transfer(self, source_number, destination_number, amount):
+        """Transfer and return a PostingStatus code"""
+        source_shard = self.shard_of(source_number)
+        destination_shard = self.shard_of(destination_number)
+        if source_shard == destination_shard:
+            return self._call_one(source_number, (self.TRANSFER, source_number, destination_number, amount))
+        
+        with self._lock:
+            self._next_transaction += 1
+            transaction = self._next_transaction
+        # Each phase locks only the shard it talks to, so other shards keep serving
+        # Phase 1: the destination votes on (and pins) the credit
+        status = self._call(destination_shard, [(self.PREPARE_CREDIT, transaction, destination_number, amount)])[0]
+        if status != PostingStatus.OK:
+            return status
+        # The source votes last, so its debit decides the outcome
+        status = self._call(source_shard, [(self.DEBIT, source_number, amount)])[0]
+        # Phase 2: tell the destination what was decided
+        decision = self.COMMIT_CREDIT if PostingStatus.is_success(status) else self.ABORT_CREDIT
+        outcome = self._call(destination_shard, [(decision, transaction, amount)])[0]
+        if decision == self.COMMIT_CREDIT and outcome != PostingStatus.OK:
+            # The credit failed after the debit was applied: give the money back
+            self._call(source_shard, [(self.REFUND, source_number, amount)])
+            return outcome
+        return status
+    
+    def apply_batch(self, postings):
+        """Apply many (account_number, op, amount) postings, all shards in parallel
+        
+        Returns an array of PostingStatus codes in input order.
+        """
+        rows = list(postings)
+        routed = [[] for _ in self._connections]
+        positions = [[] for _ in self._connections]
+        for index, row in enumerate(rows):
+            shard = self.shard_of(row[0])
+            routed[shard].append(row)
+            positions[shard].append(index)
+        
+        busy = [shard for shard, shard_rows in enumerate(routed) if shard_rows]
+        with self._shards_locked(busy):
+            for shard in busy:
+                self._connections[shard].send([(self.BATCH, routed[shard])])
+            results = array("b", bytes(len(rows)))
+            for shard in busy:
+                for index, status in zip(positions[shard], self._connections[shard].recv()[0]):
+                    results[index] = status
+        return results
+    
+    def get_bank_stats(self):
+        """Running aggregates summed over every shard"""
+        with self._shards_locked(range(len(self._connections))):
+            for connection in self._connections:
+                connection.send([(self.STATS,)])
+            shards = [connection.recv()[0] for connection in self._connections]
+        accounts_by_type = {}
+        for stats in shards:
+            for account_type, count in stats["accounts_by_type"].items():
+                accounts_by_type[account_type] = accounts_by_type.get(account_type, 0) + count
+        return {
+            "total_accounts": sum(stats["total_accounts"] for stats in shards),
+            "total_balance": sum((stats["total_balance"] for stats in shards), Money.ZERO),
+            "accounts_by_type": accounts_by_type,
+            "active": sum(stats["active"] for stats in shards),
+            "inactive": sum(stats["inactive"] for stats in shards),
+            "accounts_per_shard": [stats["total_accounts"] for stats in shards],
+        }
+    
+    def get_bank_info(self):
+        """Get bank information"""
+        stats = self.get_bank_stats()
+        return f"Bank: {self.name}, Accounts: {stats['total_accounts']}, Total Balance: ${stats['total_balance']}"
+    
+    def close(self):
+        """Stop every worker process"""
+        with self._shards_locked(range(len(self._connections))):
+            for connection in self._connections:
+                connection.send(None)
+            for worker in self._workers:
+                worker.join()
+            self._connections = []
+            self._workers = []
+    
+    def _call_one(self, account_number, request):
+        return self._call(self.shard_of(account_number), [request])[0]
+    
+    def _call(self, shard, requests):
+        """Send a list of requests to one shard and wait for its list of results"""
+        with self._shard_locks[shard]:
+            connection = self._connections[shard]
+            connection.send(requests)
+            return connection.recv()
+    
+    @contextmanager
+    def _shards_locked(self, shards):
+        """Hold several shard connections, locked in shard order so callers can't deadlock"""
+        locks = [self._shard_locks[shard] for shard in sorted(shards)]
+        for lock in locks:
+            lock.acquire()
+        try:
+            yield
+        finally:
+            for lock in reversed(locks):
+                lock.release()
+    
+    @classmethod
+    def _execute(cls, bank, prepared, request):
+        """Run one request inside a shard worker, answering a failure with an error
+        
+        As in BankServer, bad arguments give MALFORMED_REQUEST and any
+        other exception INTERNAL_ERROR, in the shape the caller expects.
+        """
+        try:
+            return cls._dispatch(bank, prepared, request)
+        except (TypeError, ValueError, OverflowError):
+            status = PostingStatus.MALFORMED_REQUEST
+        except Exception:
+            status = PostingStatus.INTERNAL_ERROR
+        operation = request[0]
+        if operation == cls.BATCH:
+            return [status] * len(request[1])
+        if operation in (cls.DEPOSIT, cls.WITHDRAW):
+            return "Request failed"
+        return None if operation == cls.BALANCE else status
+    
+    @classmethod
+    def _dispatch(cls, bank, prepared, request):
+        """Run one request inside a shard worker"""
+        operation = request[0]
+        if operation == cls.BATCH:
+            return bank.apply_batch(request[1]).tolist()
+        if operation == cls.TRANSFER:
+            return bank._transfer(request[1], request[2], request[3])
+        if operation == cls.STATS:
+            return bank.get_bank_stats()
+        if operation == cls.CREATE:
+            _, account_number, account_type, holder, initial_balance, kwargs = request
+            bank._register_account(Bank._ACCOUNT_TYPES[account_type](account_number, holder, initial_balance,
+                                                                     **kwargs))
+            return PostingStatus.OK
+        if operation in (cls.COMMIT_CREDIT, cls.ABORT_CREDIT):
+            account, amount = prepared.pop(request[1])
+            if operation == cls.COMMIT_CREDIT:
+                # A prepared credit is applied even if the account was deactivated since
+                with account._lock:
+                    if not account._has_headroom(amount):
+                        return PostingStatus.INVALID_AMOUNT
+                    account._post(TransactionLedger.DEPOSIT, amount, amount)
+            return PostingStatus.OK
+        
+        account = bank.get_account(request[2] if operation == cls.PREPARE_CREDIT else request[1])
+        if account is None:
+            if operation in (cls.DEPOSIT, cls.WITHDRAW):
+                return "Account not found"
+            return None if operation == cls.BALANCE else PostingStatus.UNKNOWN_ACCOUNT
+        if operation == cls.DEPOSIT:
+            return account.deposit(request[2])
+        if operation == cls.WITHDRAW:
+            return account.withdraw(request[2])
+        if operation == cls.BALANCE:
+            return account.get_balance()
+        if operation == cls.PREPARE_CREDIT:
+            amount = BankAccount._to_money(request[3])
+            if amount is None:
+                return PostingStatus.INVALID_AMOUNT
+            if not account.is_active():
+                return PostingStatus.INACTIVE
+            # Credits still pinned by other transfers count against the headroom too
+            pinned = sum(other._cents for pinned_account, other in prepared.values() if pinned_account is account)
+            if not account._has_headroom(Money.from_cents(pinned + amount._cents)):
+                return PostingStatus.INVALID_AMOUNT
+            prepared[request[1]] = (account, amount)
+            return PostingStatus.OK
+        if operation == cls.DEBIT:
+            with account._lock:
+                return account._apply_withdrawal(request[2])
+        if operation == cls.REFUND:
+            amount = BankAccount._to_money(request[2])
+            with account._lock:
+                account._post(TransactionLedger.DEPOSIT, amount, amount)
+            return PostingStatus.OK
+        return PostingStatus.UNKNOWN_OPERATION
+
+def _run_shard(name, connection):
+    """Worker process loop: own one Bank and answer batches of requests"""
+    bank = Bank(name)
+    prepared = {}               # transaction id -> (account, amount) pinned by PREPARE_CREDIT
+    while True:
+        requests = connection.recv()
+        if requests is None:
+            break
+        connection.send([ShardedBank._execute(bank, prepared, request) for request in requests])
+    connection.close()
+
+class StatementGenerator:
+    """Stream per-account statements to disk without materializing history
+    
+    Accounts are walked in account-number order and each ledger is read
+    column by column between two indexes (found by bisecting the
+    timestamps), so memory stays bounded however long the history is.
+    Rows go through large buffered writers as CSV or fixed-width text.
+    Only entries that exist when an account's statement starts are
+    included; the ledger is append-only, so later postings are ignored.
+    """
+    
+    FORMATS = ("csv", "fixed")
+    CSV_HEADER = ("account_number", "holder", "account_type", "date", "description", "amount", "balance")
+    
+    def __init__(self, bank, directory, file_format="csv", since=None, until=None, buffer_size=1 << 20):
+        if file_format not in self.FORMATS:
+            raise ValueError(f"file_format must be one of {self.FORMATS}")
+        self._bank = bank
+        self._directory = directory
+        self._file_format = file_format
+        self._since = since
+        self._until = until
+        self._buffer_size = buffer_size
+        os.makedirs(directory, exist_ok=True)
+    
+    def generate(self, workers=1, accounts_per_file=None):
+        """Write every statement and return the file paths in account order
+        
+        Accounts are split into contiguous number ranges, one file per
+        range. With workers > 1 the ranges are written by forked processes.
+        """
+        numbers = sorted(self._bank._accounts, key=lambda number: (len(number), number))
+        if not numbers:
+            return []
+        if accounts_per_file is None:
+            accounts_per_file = -(-len(numbers) // workers)
+        ranges = [numbers[start:start + accounts_per_file] for start in range(0, len(numbers), accounts_per_file)]
+        
+        if workers > 1 and "fork" in multiprocessing.get_all_start_methods():
+            with ProcessPoolExecutor(workers, mp_context=multiprocessing.get_context("fork"),
+                                     initializer=_set_statement_generator, initargs=(self,)) as pool:
+                return list(pool.map(_write_statement_range, ranges))
+        return [self.write_range(account_numbers) for account_numbers in ranges]
+    
+    def write_range(self, account_numbers):
+        """Write the statements of a list of accounts to one file and return its path"""
+        extension = "csv" if self._file_format == "csv" else "txt"
+        path = os.path.join(self._directory, f"statements-{account_numbers[0]}-{account_numbers[-1]}.{extension}")
+        with open(path, "w", buffering=self._buffer_size, newline="") as out:
+            if self._file_format == "csv":
+                writer = csv.writer(out)
+                writer.writerow(self.CSV_HEADER)
+                for number in account_numbers:
+                    self._write_csv(writer, self._bank._accounts[number])
+            else:
+                for number in account_numbers:
+                    self._write_fixed(out, self._bank._accounts[number])
+        return path
+    
+    def _entry_range(self, ledger):
+        """Indexes [start, stop) of the ledger entries inside the statement period"""
+        stop = len(ledger)
+        timestamps = ledger._timestamps
+        start = 0 if self._since is None else bisect_left(timestamps, self._since, 0, stop)
+        if self._until is not None:
+            stop = bisect_left(timestamps, self._until, start, stop)
+        return start, stop
+    
+    def _period(self, account):
+        """Opening balance in cents plus the ledger and the [start, stop) slice to print"""
+        ledger = account._ledger
+        if ledger is None or len(ledger) == 0:
+            return account._balance.cents, ledger, 0, 0
+        start, stop = self._entry_range(ledger)
+        return ledger.balance_before(start), ledger, start, stop
+    
+    @staticmethod
+    def _entries(ledger, start, stop):
+        """Yield (date, description, amount, balance) for each entry, read straight from the columns"""
+        if start == stop:
+            return
+        timestamps, amounts, balances = ledger._timestamps, ledger._amounts, ledger._balances
+        for index in range(start, stop):
+            yield (time.strftime("%Y-%m-%d %H:%M:%S", time.gmtime(timestamps[index])), ledger.render(index),
+                   Money.from_cents(amounts[index]), Money.from_cents(balances[index]))
+    
+    def _write_csv(self, writer, account):
+        number, holder, account_type = account._account_number, account._account_holder, account.account_type
+        opening, ledger, start, stop = self._period(account)
+        closing = ledger._balances[stop - 1] if stop > start else opening
+        writer.writerow((number, holder, account_type, "", "Opening balance", "", Money.from_cents(opening)))
+        for date, description, amount, balance in self._entries(ledger, start, stop):
+            writer.writerow((number, holder, account_type, date, description, amount, balance))
+        writer.writerow((number, holder, account_type, "", "Closing balance", "", Money.from_cents(closing)))
+    
+    def _write_fixed(self, out, account):
+        write = out.write
+        opening, ledger, start, stop = self._period(account)
+        closing = ledger._balances[stop - 1] if stop > start else opening
+        write(f"Statement for account {account._account_number} ({account.account_type}) - "
+              f"{account._account_holder}\n")
+        write(f"{'':<19}  {'Opening balance':<44}  {'':>12}  {Money.from_cents(opening):>12}\n")
+        for date, description, amount, balance in self._entries(ledger, start, stop):
+            write(f"{date:<19}  {description[:44]:<44}  {amount:>12}  {balance:>12}\n")
+        write(f"{'':<19}  {'Closing balance':<44}  {'':>12}  {Money.from_cents(closing):>12}\n\n")
+
+_statement_generator = None     # The StatementGenerator a forked statement worker uses
+
+def _set_statement_generator(generator):
+    global _statement_generator
+    _statement_generator = generator
+
+def _write_statement_range(account_numbers):
+    return _statement_generator.write_range(account_numbers)
+
+class OperationScheduler:
+    """Fire recurring monthly fees, interest and credit card minimum payments
+    
+    Schedules live in compact columns. A hashed timing wheel maps each
+    time slot (`resolution` seconds wide) to an array of schedule ids,
+    and a small heap holds the occupied slot numbers, so a tick with
+    nothing due is a single heap peek. Due schedules are fired in one
+    batch per tick. A schedule that missed several periods (downtime)
+    is caught up with a single posting whose amount still rounds each
+    period in turn, so it matches firing the periods one by one. That
+    makes catch-up O(periods missed) per schedule rather than closed
+    form: no single power of (1 + rate) reproduces the per-period
+    rounding. Fees are the exception, at one multiplication.
+    
+    Minimum payments are moved from a funding account to the card, and
+    postings are never dated before an account's latest one.
+    """
+    
+    # Operations
+    MONTHLY_FEE = 0
+    INTEREST = 1
+    MINIMUM_PAYMENT = 2
+    CANCELLED = 255
+    
+    MONTH = 30 * 24 * 3600.0
+    
+    def __init__(self, bank=None, resolution=3600.0, minimum_payment=25, minimum_rate=0.02):
+        self._bank = bank
+        self._resolution = resolution
+        self._minimum_payment = Money(minimum_payment)
+        self._minimum_rate = Money._ratio(minimum_rate)
+        # Schedule columns, indexed by schedule id
+        self._accounts = []
+        self._funding = []              # Paying account for MINIMUM_PAYMENT, else None
+        self._operations = array("B")
+        self._periods = array("d")
+        self._next_due = array("d")
+        self._active_schedules = 0
+        # Timing wheel: slot number -> schedule ids, plus a heap of occupied slots
+        self._slots = {}
+        self._slot_heap = []
+    
+    def __len__(self):
+        return self._active_schedules
+    
+    def schedule(self, account, operation, first_due, period=MONTH, funding=None):
+        """Add a recurring operation and return its schedule id
+        
+        MINIMUM_PAYMENT needs a `funding` account that the payments are
+        withdrawn from.
+        """
+        if operation == self.MINIMUM_PAYMENT and (funding is None or funding is account):
+            raise ValueError("Minimum payments need a separate funding account")
+        schedule_id = len(self._accounts)
+        self._accounts.append(account)
+        self._funding.append(funding)
+        self._operations.append(operation)
+        self._periods.append(period)
+        self._next_due.append(first_due)
+        self._active_schedules += 1
+        self._enqueue(schedule_id, first_due)
+        return schedule_id
+    
+    def schedule_bank(self, bank, first_due, period=MONTH):
+        """Schedule interest for every savings account and fees for every business account"""
+        ids = [self.schedule(account, self.INTEREST, first_due, period)
+               for account in bank.find_by_type("savings").values()]
+        ids += [self.schedule(account, self.MONTHLY_FEE, first_due, period)
+                for account in bank.find_by_type("business").values()]
+        return ids
+    
+    def cancel(self, schedule_id):
+        """Stop a schedule (its wheel entry is dropped when its slot comes up)"""
+        if self._operations[schedule_id] != self.CANCELLED:
+            self._operations[schedule_id] = self.CANCELLED
+            self._active_schedules -= 1
+    
+    def tick(self, now):
+        """Fire everything due at `now` in one batch; return the number of periods applied"""
+        heap = self._slot_heap
+        current_slot = int(now // self._resolution)
+        if not heap or heap[0] > current_slot:
+            return 0
+        
+        due = []
+        while heap and heap[0] <= current_slot:
+            slot = heapq.heappop(heap)
+            ids = self._slots.pop(slot)
+            if slot < current_slot:
+                due.extend(ids)
+                continue
+            # Entries in the current slot may not be due yet
+            waiting = array("I")
+            for schedule_id in ids:
+                (due if self._next_due[schedule_id] <= now else waiting).append(schedule_id)
+            if waiting:
+                self._slots[slot] = waiting
+                heapq.heappush(heap, slot)
+                break
+        
+        periods_applied = 0
+        for schedule_id in due:
+            operation = self._operations[schedule_id]
+            if operation == self.CANCELLED:
+                continue
+            next_due = self._next_due[schedule_id]
+            period = self._periods[schedule_id]
+            missed = int((now - next_due) // period) + 1
+            self._fire(self._accounts[schedule_id], operation, missed, now, self._funding[schedule_id])
+            next_due += missed * period
+            self._next_due[schedule_id] = next_due
+            self._enqueue(schedule_id, next_due)
+            periods_applied += missed
+        
+        if self._bank is not None and self._bank._persistence is not None:
+            self._bank._persistence.commit()
+        return periods_applied
+    
+    def _enqueue(self, schedule_id, due):
+        slot = int(due // self._resolution)
+        ids = self._slots.get(slot)
+        if ids is None:
+            ids = self._slots[slot] = array("I")
+            heapq.heappush(self._slot_heap, slot)
+        ids.append(schedule_id)
+    
+    def _fire(self, account, operation, periods, timestamp, funding=None):
+        """Apply `periods` consecutive occurrences of an operation as one posting"""
+        if operation == self.MINIMUM_PAYMENT:
+            self._pay_minimum(account, funding, periods, timestamp)
+            return
+        with account._lock:
+            if not account._is_active:
+                return
+            if operation == self.MONTHLY_FEE:
+                fee = account._monthly_fee * periods
+                account._post(TransactionLedger.MONTHLY_FEE, fee, -fee, Money.ZERO,
+                              account._next_timestamp(timestamp))
+            elif operation == self.INTEREST:
+                interest = self.compound_interest(account, periods)
+                if interest:
+                    account._post(TransactionLedger.INTEREST, interest, interest, Money.ZERO,
+                                  account._next_timestamp(timestamp))
+    
+    def _pay_minimum(self, card, funding, periods, timestamp):
+        """Withdraw `periods` minimum payments from the funding account and pay them to the card"""
+        first, second = sorted((card, funding), key=Bank._lock_order)
+        with first._lock, second._lock:
+            if not card._is_active:
+                return
+            payment = self.minimum_payments(card._credit_used, periods)
+            if not payment:
+                return
+            # One log record, like a transfer: the debit never survives without the credit
+            with self._bank._atomic() if self._bank is not None else nullcontext():
+                status = funding._apply_withdrawal(payment, funding._next_timestamp(timestamp))
+                if PostingStatus.is_success(status):
+                    card._charge(TransactionLedger.PAYMENT, payment, -payment, card._next_timestamp(timestamp))
+    
+    @staticmethod
+    def compound_interest(account, periods):
+        """Interest for `periods` compounding periods, rounded period by period
+        
+        Gives exactly what `periods` separate add_interest calls would
+        post in total, at one integer step per period (stopping early once
+        the interest rounds to nothing). Once the balance qualifies it only
+        grows, so the minimum balance is checked once; integer cents
+        throughout.
+        """
+        cents = account._balance.cents
+        if cents < account._minimum_balance.cents:
+            return Money.ZERO
+        ratio = Money._ratio(account._interest_rate)
+        numerator, denominator = ratio.numerator, ratio.denominator
+        rounding = account._interest_rounding
+        total = 0
+        for _ in range(periods):
+            interest = Money._scale(cents, numerator, denominator, rounding)
+            if not interest:
+                break               # The balance no longer changes, so neither will this
+            cents += interest
+            total += interest
+        return Money.from_cents(total)
+    
+    def minimum_payments(self, credit_used, periods):
+        """Total of `periods` minimum payments on a card
+        
+        Each period pays max(minimum_payment, owed * minimum_rate), never
+        more than is owed, rounded the same way as a single period. While
+        the percentage is larger each period is computed in turn; after
+        that the debt only falls by the fixed minimum, which is linear.
+        """
+        remaining = credit_used.cents
+        floor = self._minimum_payment.cents
+        rate = self._minimum_rate
+        keep = 1 - rate
+        for done in range(periods):
+            if remaining <= 0:
+                break
+            if rate == 0 or remaining * rate < floor:
+                # The percentage only shrinks from here on, so every later payment is the floor
+                remaining = max(0, remaining - floor * (periods - done))
+                break
+            following = Money._scale(remaining, keep.numerator, keep.denominator, ROUND_HALF_EVEN)
+            if following == remaining:
+                break               # Rounds to no payment, now and in every later period
+            remaining = following
+        return Money.from_cents(max(credit_used.cents, 0) - max(remaining, 0))
+
+def main():
+    """Walk through every feature of the bank system"""
+    print("=== BANK SYSTEM PROJECT ===")
+    
+    # Test the bank system
+    print("=== Bank System Test ===")
+    
+    # Create bank
+    bank = Bank("Python Bank")
+    print(bank.get_bank_info())
+    
+    # Create different account types
+    print("\n=== Creating Accounts ===")
+    print(bank.create_account("savings", "Alice", 1000, interest_rate=0.03))
+    print(bank.create_account("checking", "Bob", 500, overdraft_limit=1000))
+    print(bank.create_account("business", "Charlie", 5000, business_type="Corporation"))
+    
+    # Get accounts
+    alice_account = bank.get_account("1000")
+    bob_account = bank.get_account("1001")
+    charlie_account = bank.get_account("1002")
+    
+    print("\n=== Account Operations ===")
+    # Test savings account
+    print("=== Savings Account (Alice) ===")
+    print(alice_account.get_account_info())
+    print(alice_account.deposit(500))
+    print(alice_account.withdraw(200))
+    print(alice_account.add_interest())
+    print(f"Transactions: {alice_account.get_transactions()}")
+    
+    print("\n=== Checking Account (Bob) ===")
+    print(bob_account.get_account_info())
+    print(bob_account.deposit(300))
+    print(bob_account.withdraw(800))  # This will use overdraft
+    print(bob_account.withdraw(200))  # This will use more overdraft
+    print(f"Transactions: {bob_account.get_transactions()}")
+    
+    print("\n=== Business Account (Charlie) ===")
+    print(charlie_account.get_account_info())
+    print(charlie_account.add_employee("David", "E001"))
+    print(charlie_account.add_employee("Eve", "E002"))
+    print(charlie_account.charge_monthly_fee())
+    print(f"Employees: {charlie_account.get_employees()}")
+    print(f"Transactions: {charlie_account.get_transactions()}")
+    
+    print("\n=== Bank Summary ===")
+    print(bank.get_bank_info())
+    print(f"Running aggregates: {bank.get_bank_stats()}")
+    print(f"Aggregates verified: {bank.verify_aggregates()}")
+    
+    print("\n=== OOP PRINCIPLES DEMONSTRATED ===")
+    
+    print("""
 This bank system demonstrates:
 
 1. ENCAPSULATION:
@@ -302,58 +3233,229 @@ This bank system demonstrates:
    - BusinessAccount contains employees
    - Modular design for easy extension
 """)
-
-print("\n=== EXTENDING THE SYSTEM ===")
-
-# Example of extending the system
-class CreditCardAccount(BankAccount):
-    """Credit card account with credit limit"""
     
-    def __init__(self, account_number, account_holder, credit_limit=5000):
-        super().__init__(account_number, account_holder, 0)
-        self._credit_limit = credit_limit
-        self._credit_used = 0
+    print("\n=== EXTENDING THE SYSTEM ===")
     
-    def make_purchase(self, amount):
-        """Make a purchase with credit card"""
-        if self._credit_used + amount <= self._credit_limit:
-            self._credit_used += amount
-            self._record_transaction(f"Purchase: ${amount}")
-            return f"Purchase of ${amount} approved. Credit used: ${self._credit_used}"
-        else:
-            return "Purchase declined - credit limit exceeded"
+    # Test credit card account
+    print("=== Credit Card Account ===")
+    credit_card = CreditCardAccount("2000", "Frank", 3000)
+    print(credit_card.get_account_info())
+    print(credit_card.make_purchase(500))
+    print(credit_card.make_purchase(1000))
+    print(credit_card.make_payment(300))
+    print(f"Available credit: ${credit_card.get_available_credit()}")
+    print(f"Transactions: {credit_card.get_transactions()}")
     
-    def make_payment(self, amount):
-        """Make payment to credit card"""
-        if amount <= self._credit_used:
-            self._credit_used -= amount
-            self._record_transaction(f"Payment: ${amount}")
-            return f"Payment of ${amount} processed. Credit used: ${self._credit_used}"
-        else:
-            return "Payment amount exceeds credit used"
+    print("\n=== Structured Ledger ===")
+    # The ledger keeps typed columns, so totals need no string parsing
+    alice_ledger = alice_account.get_ledger()
+    print(f"Alice ledger entries: {len(alice_ledger)}")
+    print(f"Alice total deposits: ${alice_ledger.total(TransactionLedger.DEPOSIT)}")
+    print(f"Alice total interest: ${alice_ledger.total(TransactionLedger.INTEREST):.2f}")
+    print(f"Latest Bob entry: {bob_account.get_ledger()[-1]}")
     
-    def get_available_credit(self):
-        """Get available credit"""
-        return self._credit_limit - self._credit_used
+    print("\n=== Batch Postings ===")
+    # Settlement files are applied in one call and return compact status codes
+    batch = [
+        ("1000", "deposit", 250),
+        ("1001", "withdraw", 100),
+        ("1000", "withdraw", 5000),   # Savings minimum balance rule
+        ("1002", "deposit", -10),     # Invalid amount
+        ("9999", "deposit", 10),      # Unknown account
+        ("1002", "transfer", 10),     # Unknown operation
+    ]
+    statuses = bank.apply_batch(batch)
+    print(f"Batch statuses: {list(statuses)}")
+    print(f"Applied: {sum(1 for status in statuses if PostingStatus.is_success(status))} of {len(statuses)}")
+    print(bank.get_bank_info())
     
-    def get_account_info(self):
-        """Override to include credit information"""
-        base_info = super().get_account_info()
-        return f"{base_info}, Credit Limit: ${self._credit_limit}, Credit Used: ${self._credit_used}"
-
-# Test credit card account
-print("=== Credit Card Account ===")
-credit_card = CreditCardAccount("2000", "Frank", 3000)
-print(credit_card.get_account_info())
-print(credit_card.make_purchase(500))
-print(credit_card.make_purchase(1000))
-print(credit_card.make_payment(300))
-print(f"Available credit: ${credit_card.get_available_credit()}")
-print(f"Transactions: {credit_card.get_transactions()}")
-
-print("\n=== PROJECT COMPLETED ===")
-
-print("""
+    print("\n=== Concurrent Transfers ===")
+    
+    print(bank.transfer("1002", "1000", 300))
+    print(bank.transfer("1000", "1002", 100000))
+    print(bank.transfer("1000", "9999", 10))
+    bob_account.deactivate()
+    print(f"After deactivating Bob: {bank.get_bank_stats()}")
+    bob_account.activate()
+    
+    print("\n=== Persistence (Write-Ahead Log + Snapshots) ===")
+    
+    with tempfile.TemporaryDirectory() as bank_directory:
+        durable = Bank.open("Durable Bank", bank_directory, durability="op")
+        print(durable.create_account("savings", "Grace", 1000, interest_rate=0.05))
+        print(durable.create_account("business", "Heidi", 2000))
+        print(durable.get_account("1000").deposit(250))
+        print(durable.checkpoint())
+        print(durable.get_account("1001").add_employee("Ivan", "E010"))
+        print(durable.get_account("1000").add_interest())
+        print(durable.transfer("1001", "1000", 400))
+        print(durable.get_bank_info())
+        durable.close()
+        
+        restored = Bank.open("Durable Bank", bank_directory)
+        print(f"Restored: {restored.get_bank_info()}")
+        print(f"Restored transactions: {restored.get_account('1000').get_transactions()}")
+        print(f"Restored employees: {restored.get_account('1001').get_employees()}")
+        restored.close()
+    
+    print("\n=== Bank-wide Interest Accrual ===")
+    
+    one_by_one = build_interest_bank(200)
+    for account in one_by_one.get_all_accounts().values():
+        account.add_interest()
+    batched = build_interest_bank(200)
+    print(batched.accrue_interest())
+    matches = all(account.get_balance() == batched.get_account(number).get_balance()
+                  and account.get_transactions() == batched.get_account(number).get_transactions()
+                  for number, account in one_by_one.get_all_accounts().items())
+    print(f"Matches per-account add_interest: {matches}")
+    
+    print("\n=== Secondary Indexes ===")
+    print(bank.create_account("checking", "Alice", 250))
+    print(f"Alice's accounts: {list(bank.find_by_holder('Alice'))}")
+    print(f"Business accounts: {list(bank.find_by_type('business'))}")
+    print(f"Accounts with $200-$2000: {bank.find_by_balance(200, 2000)}")
+    print(f"Top 2 by balance: {[(account.get_account_number(), str(account.get_balance())) for account in bank.top_accounts(2)]}")
+    alice_view = bank.find_by_holder("Alice")
+    print(bank.create_account("savings", "Alice", 5000))
+    print(f"Alice's view updated in place: {list(alice_view)}, top account now {bank.top_accounts(1)[0].get_account_number()}")
+    
+    print("\n=== Exact Money Engine ===")
+    
+    print(f"Rounding: $10.005 -> ${Money('10.005')} (half even), ${Money('10.005', ROUND_HALF_UP)} (half up)")
+    print(f"Interest on $1234.56 at 1.25%: ${Money('1234.56').multiply(0.0125)}")
+    
+    print("\n=== Async Bank Service ===")
+    
+    asyncio.run(demo_bank_service())
+    
+    print("\n=== Audit Log and Replay ===")
+    
+    events = EventStore(shards=4, checkpoint_every=4)
+    sourced_bank = Bank("Sourced Bank", event_store=events)
+    print(sourced_bank.create_account("savings", "Lena", 1000, interest_rate=0.05))
+    print(sourced_bank.create_account("checking", "Mike", 200, overdraft_limit=300))
+    print(sourced_bank.create_account("business", "Nora", 8000))
+    lena, mike, nora = (sourced_bank.get_account(number) for number in ("1000", "1001", "1002"))
+    print(lena.deposit(500))
+    after_deposit = len(events)
+    print(mike.withdraw(350))
+    print(lena.add_interest())
+    print(nora.add_employee("Oscar", "E100"))
+    print(nora.charge_monthly_fee())
+    print(sourced_bank.transfer("1002", "1001", 1000))
+    mike.deactivate()
+    print(f"Events recorded: {len(events)}")
+    
+    rebuilt = Bank.from_events("Sourced Bank", events, workers=2)
+    print(f"Rebuilt: {rebuilt.get_bank_info()}")
+    replay_matches = all(account.get_account_info() == rebuilt.get_account(number).get_account_info()
+                            and account.get_transactions() == rebuilt.get_account(number).get_transactions()
+                            for number, account in sourced_bank.get_all_accounts().items())
+    print(f"Replay matches the live bank: {replay_matches}")
+    print(f"Rebuilt Mike: {rebuilt.get_account('1001').get_account_info()}, active: {rebuilt.get_account('1001').is_active()}")
+    print(f"Balance of 1000 as of event {after_deposit}: ${events.balance_as_of('1000', after_deposit)}")
+    print(f"Mike as of event {after_deposit + 1}: {events.state_as_of('1001', after_deposit + 1)}")
+    
+    print("\n=== Sharded Multi-Process Bank ===")
+    
+    sharded_bank = ShardedBank("Sharded Bank", num_workers=3)
+    for holder, balance in (("Paula", 1000), ("Quinn", 500), ("Rosa", 2000), ("Sam", 300)):
+        print(sharded_bank.create_account("checking", holder, balance))
+    print(sharded_bank.deposit("1000", 250))
+    print(sharded_bank.withdraw("1001", 100))
+    for source, destination, amount in (("1000", "1001", 400), ("1002", "1003", 50), ("1003", "1000", 5000),
+                                        ("1000", "9999", 10)):
+        route = "same shard" if sharded_bank.shard_of(source) == sharded_bank.shard_of(destination) else "cross-shard"
+        print(f"{route}: {sharded_bank.transfer(source, destination, amount)}")
+    print(f"Batch statuses: {list(sharded_bank.apply_batch([('1000', 'deposit', 10), ('1003', 'withdraw', 20), ('9999', 'deposit', 5)]))}")
+    print(sharded_bank.get_bank_info())
+    print(f"Accounts per shard: {sharded_bank.get_bank_stats()['accounts_per_shard']}")
+    sharded_bank.close()
+    
+    print("\n=== Withdrawal Rules ===")
+    
+    rules_bank = Bank("Rules Bank")
+    rules_bank.create_account("checking", "Tina", 1000)
+    rules_bank.create_account("savings", "Uma", 5000)
+    rules_bank.add_rule(VelocityRule(max_count=3, window_seconds=60, max_total=700))
+    tina = rules_bank.get_account("1000")
+    for amount in (100, 200, 300, 150):
+        print(tina.withdraw(amount))
+    uma = rules_bank.get_account("1001")
+    print(uma.withdraw(800))
+    print(rules_bank.transfer("1001", "1000", 50))
+    print(tina.deposit(50))
+    
+    print("\n=== Streaming Statements ===")
+    
+    with tempfile.TemporaryDirectory() as statement_directory:
+        fixed_paths = StatementGenerator(bank, statement_directory, "fixed").generate()
+        with open(fixed_paths[0]) as statement:
+            for line in statement.read().split("\n\n")[0].splitlines():
+                print(line.rstrip())
+        csv_paths = StatementGenerator(bank, statement_directory, "csv").generate()
+        with open(csv_paths[0]) as statement:
+            print(f"CSV rows: {sum(1 for _ in statement) - 1} in {os.path.basename(csv_paths[0])}")
+    
+    print("\n=== Scheduled Operations ===")
+    
+    scheduler = OperationScheduler(bank, resolution=86400.0, minimum_payment=25, minimum_rate=0.05)
+    now = time.time()
+    scheduler.schedule_bank(bank, now + OperationScheduler.MONTH)
+    # Frank's minimum payments come out of Bob's checking account
+    scheduler.schedule(credit_card, OperationScheduler.MINIMUM_PAYMENT, now + OperationScheduler.MONTH,
+                       funding=bob_account)
+    print(f"Schedules: {len(scheduler)}; fired right away: {scheduler.tick(now)}")
+    print(f"After one month: {scheduler.tick(now + OperationScheduler.MONTH)} periods applied")
+    print(f"Alice: {alice_account.get_transactions()[-1]}, Charlie: {charlie_account.get_transactions()[-1]}")
+    print(f"Frank: {credit_card.get_transactions()[-1]}, credit used: ${credit_card._credit_used}")
+    print(f"Bob: {bob_account.get_transactions()[-1]}")
+    print(f"After six months of downtime: {scheduler.tick(now + 7 * OperationScheduler.MONTH)} periods applied")
+    print(f"Alice: {alice_account.get_transactions()[-1]}, Charlie: {charlie_account.get_transactions()[-1]}")
+    print(f"Frank: {credit_card.get_transactions()[-1]}, credit used: ${credit_card._credit_used}")
+    print(f"Bob: {bob_account.get_transactions()[-1]}")
+    
+    print("\n=== Credit Card Statements ===")
+    
+    DAY = CreditCardAccount.SECONDS_PER_DAY
+    card = CreditCardAccount("2001", "Vera", credit_limit=10_000, apr=0.18, grace_days=25)
+    cycle_start = 1_700_000_000.0
+    card.make_purchase(1200, cycle_start)
+    card.make_purchase(300, cycle_start + 10 * DAY)
+    card.make_payment(200, cycle_start + 20 * DAY)
+    first = card.close_statement(cycle_start + 30 * DAY)
+    print(f"Statement 1: ADB ${first['average_daily_balance']}, interest ${first['interest']}, "
+          f"new balance ${first['new_balance']}, minimum due ${first['minimum_due']}")
+    # Only the minimum is paid, so the grace period is lost for the next cycle
+    card.make_payment(first["minimum_due"], cycle_start + 40 * DAY)
+    card.make_purchase(500, cycle_start + 45 * DAY)
+    second = card.close_statement(cycle_start + 60 * DAY)
+    print(f"Statement 2: ADB ${second['average_daily_balance']}, interest ${second['interest']}, "
+          f"new balance ${second['new_balance']}, minimum due ${second['minimum_due']}")
+    card.make_payment(second["new_balance"], cycle_start + 70 * DAY)
+    third = card.close_statement(cycle_start + 90 * DAY)
+    print(f"Statement 3: paid in full, interest ${third['interest']}, new balance ${third['new_balance']}")
+    print(f"Transactions: {card.get_transactions()[-3:]}")
+    # The minimum due is the larger of $5 and 2%, never more than is owed
+    minimums = [CreditCardAccount.minimum_due(balance) for balance in (3, 100, 1000)]
+    print(f"Minimum due on $3, $100 and $1000: {', '.join(f'${minimum}' for minimum in minimums)}")
+    
+    print("\n=== Copy-Free Views ===")
+    
+    accounts_snapshot = bank.get_all_accounts()
+    live_accounts = bank.get_all_accounts(live=True)
+    alice_history = alice_account.get_transactions()
+    live_history = alice_account.get_transactions(live=True)
+    print(bank.create_account("checking", "Walt", 100))
+    print(alice_account.deposit(1))
+    print(f"Accounts: snapshot {len(accounts_snapshot)} (version {accounts_snapshot.version}), live {len(live_accounts)}")
+    print(f"'1005' in snapshot: {'1005' in accounts_snapshot}, in live view: {'1005' in live_accounts}")
+    print(f"Alice history: snapshot {len(alice_history)} entries, live {len(live_history)}, latest {live_history[-1]}")
+    
+    print("\n=== PROJECT COMPLETED ===")
+    
+    print("""
 This bank system project demonstrates:
 - Real-world OOP application
 - Multiple inheritance patterns
@@ -370,6 +3472,9 @@ Key Learning Points:
 5. Real-world problem solving
 """)
 
+if __name__ == "__main__":
+    main()
+
 """
 Key Points to Remember:
 1. Use OOP principles to solve real problems
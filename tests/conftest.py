@@ -0,0 +1,26 @@
+"""Shared setup for the test suite
+
+The tutorial scripts' file names start with a number, so they cannot be
+imported by name. They are loaded here by path and registered under
+importable names, so a test can write `from bank_system import Bank`.
+"""
+
+import importlib.util
+import os
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+def _load_tutorial(relative_path, name):
+    """Load ROOT/relative_path once and register it as module `name`"""
+    if name in sys.modules:
+        return sys.modules[name]
+    spec = importlib.util.spec_from_file_location(name, os.path.join(ROOT, relative_path))
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[name] = module
+    spec.loader.exec_module(module)
+    return module
+
+_load_tutorial("projects/03_bank_system.py", "bank_system")
+_load_tutorial("exercises/02_oop_exercises.py", "oop_exercises")
+_load_tutorial("15_oop_advanced/02_advanced_concepts.py", "advanced_concepts")
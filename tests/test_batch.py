@@ -0,0 +1,44 @@
+"""Bank.apply_batch: per-row statuses, input order, durable replay"""
+
+from bank_system import Bank, Money, PostingStatus
+
+def test_batch_returns_a_status_per_row():
+    bank = Bank("Batch Bank")
+    bank.create_account("savings", "Alice", 1000)
+    bank.create_account("checking", "Bob", 500, overdraft_limit=100)
+    statuses = bank.apply_batch([
+        ("1000", "deposit", 250),
+        ("1001", "withdraw", 550),      # Uses the overdraft
+        ("1000", "withdraw", 5000),     # Savings minimum balance
+        ("1001", "deposit", -10),
+        ("9999", "deposit", 10),
+        ("1001", "transfer", 10),
+        ("1001", "withdraw", 100),      # Overdraft limit reached
+    ])
+    assert list(statuses) == [PostingStatus.OK, PostingStatus.OVERDRAFT_USED, PostingStatus.BELOW_MINIMUM,
+                              PostingStatus.INVALID_AMOUNT, PostingStatus.UNKNOWN_ACCOUNT,
+                              PostingStatus.UNKNOWN_OPERATION, PostingStatus.INSUFFICIENT_FUNDS]
+    assert bank.get_account("1000").get_balance() == Money(1250)
+    assert bank.get_account("1001").get_net_balance() == Money(-50)
+    assert bank.verify_aggregates()
+
+def test_rows_for_one_account_apply_in_input_order():
+    bank = Bank("Batch Bank")
+    bank.create_account("checking", "Alice", 0, overdraft_limit=0)
+    statuses = bank.apply_batch([("1000", "withdraw", 10), ("1000", "deposit", 10), ("1000", "withdraw", 10)])
+    assert list(statuses) == [PostingStatus.INSUFFICIENT_FUNDS, PostingStatus.OK, PostingStatus.OK]
+    assert bank.get_account("1000").get_balance() == Money(0)
+
+def test_batch_survives_a_restart(tmp_path):
+    bank = Bank.open("Durable Bank", tmp_path, durability="batch")
+    bank.create_account("checking", "Alice", 100)
+    bank.create_account("savings", "Bob", 1000)
+    bank.apply_batch([("1000", "deposit", 5), ("1001", "withdraw", 200), ("1000", "withdraw", 50)])
+    expected = bank.get_bank_info()
+    bank.close()
+    
+    restored = Bank.open("Durable Bank", tmp_path)
+    assert restored.get_bank_info() == expected
+    assert restored.get_account("1000").get_balance() == Money(55)
+    assert restored.verify_aggregates()
+    restored.close()
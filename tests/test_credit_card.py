@@ -0,0 +1,70 @@
+"""CreditCardAccount: purchases, payments and statements"""
+
+from fractions import Fraction
+
+import pytest
+
+from bank_system import CreditCardAccount, Money
+
+DAY = CreditCardAccount.SECONDS_PER_DAY
+
+@pytest.mark.parametrize("balance, minimum", [(0, 0), (3, 3), (100, 5), (250, 5), (1000, 20), (2501, "50.02")])
+def test_minimum_due_is_the_larger_of_five_dollars_and_two_percent(balance, minimum):
+    assert CreditCardAccount.minimum_due(Money(balance)) == Money(minimum)
+
+def test_purchases_are_limited_by_credit():
+    card = CreditCardAccount("2000", "Frank", 1000)
+    assert card.make_purchase(600).startswith("Purchase")
+    assert card.make_purchase(500) == "Purchase declined - credit limit exceeded"
+    assert card.make_payment(100).startswith("Payment")
+    assert card.get_available_credit() == Money(500)
+
+def test_statement_charges_interest_on_the_average_daily_balance():
+    card = CreditCardAccount("2001", "Vera", credit_limit=10_000, apr=0.18, grace_days=25)
+    start = 1_700_000_000.0
+    card.make_purchase(1200, start)
+    card.make_purchase(300, start + 10 * DAY)
+    card.make_payment(200, start + 20 * DAY)
+    first = card.close_statement(start + 30 * DAY)
+    # (1200 * 10 + 1500 * 10 + 1300 * 10) / 30 days
+    assert first["average_daily_balance"] == Money("1333.33")
+    assert first["new_balance"] == Money(1300) + first["interest"]
+    assert first["minimum_due"] == CreditCardAccount.minimum_due(first["new_balance"])
+    
+    card.make_payment(first["new_balance"], start + 40 * DAY)
+    second = card.close_statement(start + 60 * DAY)
+    assert second["new_balance"] == Money(0)
+
+@pytest.mark.parametrize("amount", [-100, 0, "abc", None, float("nan"), float("inf")])
+def test_invalid_amounts_are_refused(amount):
+    card = CreditCardAccount("2000", "Frank", 1000)
+    card.make_purchase(100)
+    assert card.make_purchase(amount) == "Invalid purchase amount"
+    assert card.make_payment(amount) == "Invalid payment amount"
+    assert card._credit_used == Money(100)
+    assert card.get_available_credit() == Money(900)
+
+def test_postings_dated_before_the_latest_are_refused():
+    card = CreditCardAccount("2000", "Frank", 1000)
+    start = 1_700_000_000.0
+    card.make_purchase(100, start + DAY)
+    assert card.make_purchase(50, start) == "Purchase declined - dated before the card's latest posting"
+    assert card.make_payment(50, start) == "Payment declined - dated before the card's latest posting"
+    assert card.make_purchase(50, start + DAY).startswith("Purchase of $50.00 approved")
+    assert card._credit_used == Money(150)
+
+def test_interest_is_exact_over_long_histories():
+    card = CreditCardAccount("2000", "Frank", credit_limit=10**9, apr=0.1999)
+    start = 1_700_000_000.1
+    timestamp = start
+    for step in range(2000):
+        timestamp += 37.3
+        assert card.make_purchase(Money("0.07"), timestamp).startswith("Purchase")
+    end = timestamp + 86400.0
+    # Replay the same integral in exact integers, one posting at a time
+    ticks = [round(when * 1_000_000) for when in card._billing._times] + [round(end * 1_000_000)]
+    owed = card._billing._owed
+    integral = sum(owed[row] * (ticks[row + 1] - ticks[row]) for row in range(len(owed)))
+    year = 365 * DAY * 1_000_000
+    expected = Money.from_cents(round(Fraction(integral) * Fraction("0.1999") / year))
+    assert card.interest_for(start, end) == expected
@@ -0,0 +1,31 @@
+"""EventStore: the audit log replays into the same bank it recorded"""
+
+from bank_system import Bank, EventStore, Money
+
+def test_replay_rebuilds_the_live_bank():
+    events = EventStore(shards=4, checkpoint_every=4)
+    bank = Bank("Logged Bank", event_store=events)
+    bank.create_account("savings", "Lena", 1000, interest_rate=0.05)
+    bank.create_account("checking", "Mike", 200, overdraft_limit=300)
+    bank.create_account("business", "Nora", 8000)
+    bank.get_account("1000").deposit(500)
+    after_deposit = len(events)
+    bank.get_account("1001").withdraw(350)
+    bank.get_account("1000").add_interest()
+    bank.get_account("1002").add_employee("Oscar", "E100")
+    bank.transfer("1002", "1001", 1000)
+    bank.get_account("1001").deactivate()
+    
+    rebuilt = Bank.from_events("Logged Bank", events, workers=2)
+    assert rebuilt.get_bank_info() == bank.get_bank_info()
+    for number, account in bank.get_all_accounts().items():
+        assert rebuilt.get_account(number).get_account_info() == account.get_account_info()
+        assert rebuilt.get_account(number).get_transactions() == account.get_transactions()
+    assert not rebuilt.get_account("1001").is_active()
+    assert events.balance_as_of("1000", after_deposit) == Money(1500)
+    assert events.balance_as_of("1000", after_deposit - 1) == Money(1000)
+    
+    # The rebuilt bank keeps appending to the same log
+    rebuilt.get_account("1000").deposit(1)
+    assert Bank.from_events("Again", events).get_account("1000").get_balance() == \
+        rebuilt.get_account("1000").get_balance()
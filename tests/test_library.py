@@ -0,0 +1,187 @@
+"""Library circulation under concurrency, holds, batches and search"""
+
+import random
+import sys
+import threading
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from oop_exercises import Library
+
+@pytest.fixture
+def library():
+    library = Library("Test Library")
+    library.add_book("Python Crash Course", "Eric Matthes", "978-1")
+    library.add_book("Fluent Python", "Luciano Ramalho", "978-2")
+    library.add_book("Clean Code", "Robert Martin", "978-3")
+    for number, name in enumerate(("Ada", "Ben", "Cleo")):
+        library.add_member(name, f"M{number}")
+    return library
+
+def test_holds_are_served_first_in_first_out(library):
+    assert library.check_out_book("978-1", "Ada").startswith("Checked out")
+    assert library.check_out_book("978-1", "Ben") == "Book is already checked out"
+    assert library.place_hold("978-1", "Ben") == "Ben is number 1 in the queue for Python Crash Course"
+    assert library.place_hold("978-1", "Cleo") == "Cleo is number 2 in the queue for Python Crash Course"
+    assert library.place_hold("978-1", "Ada") == "Ada already has Python Crash Course"
+    
+    assert library.return_book("978-1").endswith("checked out to Ben (on hold)")
+    assert library.get_member_loans("Ben") == ["978-1"]
+    assert library.return_book("978-1").endswith("checked out to Cleo (on hold)")
+    assert library.return_book("978-1") == "Returned Python Crash Course from Cleo"
+    assert library.return_book("978-1") == "Book not checked out"
+    assert library.place_hold("978-1", "Ada") == "Book is available - check it out instead"
+
+def test_cancelled_hold_is_skipped(library):
+    library.check_out_book("978-2", "Ada")
+    library.place_hold("978-2", "Ben")
+    library.place_hold("978-2", "Cleo")
+    assert library.cancel_hold("978-2", "Ben") == "Cancelled hold for Ben"
+    assert library.cancel_hold("978-2", "Ben") == "No hold to cancel"
+    assert library.return_book("978-2").endswith("checked out to Cleo (on hold)")
+
+def test_check_out_books_is_all_or_nothing(library):
+    library.check_out_book("978-3", "Ben")
+    message = library.check_out_books(["978-1", "978-2", "978-3"], "Ada")
+    assert message.startswith("Nothing checked out - 978-3")
+    assert library.get_member_loans("Ada") == []
+    assert library.check_out_books(["978-1", "978-2", "978-1"], "Ada") == "Checked out 2 books to Ada"
+    assert library.get_member_loans("Ada") == ["978-1", "978-2"]
+    assert "Available: 0" in library.get_library_stats()
+
+def test_concurrent_circulation_never_lends_a_copy_twice():
+    library = Library("Stress Library")
+    rng = random.Random(7)
+    isbns = [f"978-{number:05d}" for number in range(60)]
+    for isbn in isbns:
+        library.add_book(f"Title {isbn}", f"Author {rng.randint(0, 20)}", isbn)
+    members = [f"Reader {number}" for number in range(15)]
+    for number, member in enumerate(members):
+        library.add_member(member, f"S{number:03d}")
+    
+    def worker(worker_id):
+        rng = random.Random(worker_id)
+        lent, returned = Counter(), Counter()
+        for _ in range(3000):
+            roll = rng.random()
+            isbn, member = rng.choice(isbns), rng.choice(members)
+            if roll < 0.5:
+                if library.check_out_book(isbn, member).startswith("Checked out"):
+                    lent[isbn] += 1
+            elif roll < 0.6:
+                batch = rng.sample(isbns, 3)
+                if library.check_out_books(batch, member).startswith("Checked out"):
+                    lent.update(batch)
+            elif roll < 0.7:
+                library.place_hold(isbn, member)
+            else:
+                message = library.return_book(isbn)
+                if message.startswith("Returned"):
+                    returned[isbn] += 1
+                    if message.endswith("(on hold)"):
+                        lent[isbn] += 1
+        return lent, returned
+    
+    switch_interval = sys.getswitchinterval()
+    sys.setswitchinterval(1e-5)
+    try:
+        with ThreadPoolExecutor(max_workers=6) as pool:
+            tallies = list(pool.map(worker, range(6)))
+    finally:
+        sys.setswitchinterval(switch_interval)
+    
+    lent, returned = Counter(), Counter()
+    for worker_lent, worker_returned in tallies:
+        lent.update(worker_lent)
+        returned.update(worker_returned)
+    on_loan = library._checked_out
+    for isbn in isbns:
+        assert lent[isbn] - returned[isbn] == (isbn in on_loan)
+    holders = Counter(isbn for member in library._members.values() for isbn in member["loans"])
+    assert set(holders) == set(on_loan) and max(holders.values(), default=1) == 1
+    assert all(not library._books[isbn]["available"] for isbn in on_loan)
+    assert sum(library._available_counts) == len(isbns) - len(on_loan)
+
+def test_search_finds_every_book_added_concurrently():
+    library = Library("Growing Library")
+    count = 3000
+    done = threading.Event()
+    
+    def add_books():
+        for number in range(count):
+            library.add_book(f"Volume zq{number}x", "Anonymous", f"isbn-{number}")
+        done.set()
+    
+    writer = threading.Thread(target=add_books)
+    writer.start()
+    while not done.is_set():
+        library.search_books("zq1")
+    writer.join()
+    for number in range(0, count, 7):
+        assert [book["isbn"] for book in library.search_books(f"zq{number}x")] == [f"isbn-{number}"]
+    assert len(library.search_books("volume")) == count
+
+def test_names_and_ids_are_looked_up_separately(library):
+    # A member whose name is another member's id
+    library.add_member("M0", "M9")
+    assert library.check_out_book("978-1", "M0") == "Checked out Python Crash Course to M0"
+    assert library.check_out_book("978-2", member_id="M0") == "Checked out Fluent Python to Ada"
+    assert library.get_member_loans("M0") == ["978-1"]
+    assert library.get_member_loans(member_id="M0") == ["978-2"]
+    assert library.check_out_book("978-3", "Nobody") == "Member not found"
+    assert library.check_out_book("978-3", "M1") == "Member not found"
+    assert library.check_out_book("978-3", "Ada", member_id="M1") == "Member not found"
+    assert library.check_out_book("978-3", "Ben", member_id="M1").endswith("to Ben")
+
+def test_query_without_words_scans_without_loading_every_book(tmp_path):
+    library = Library("Scanned Library")
+    for number in range(200):
+        library.add_book(f"Title {number}", f"Author {number}", f"isbn-{number}")
+    library.add_book("C++ Primer", "Stanley Lippman", "isbn-c++")
+    path = str(tmp_path / "catalogue.lib")
+    library.dump(path)
+    
+    loaded = Library.load(path)
+    assert [book["isbn"] for book in loaded.search_books("++")] == ["isbn-c++"]
+    assert list(loaded._books._loaded) == ["isbn-c++"]
+    assert loaded.search_books("?!") == []
+
+def test_substring_search_stays_consistent_while_words_are_merged(monkeypatch):
+    # Merge the pending words on almost every search, to race searches against merges
+    monkeypatch.setattr(Library, "_PENDING_LIMIT", 4)
+    library = Library("Merging Library")
+    count = 1500
+    done = threading.Event()
+    errors = []
+    
+    def add_books():
+        for number in range(count):
+            library.add_book(f"Word{number:04d}q", "Writer", f"isbn-{number}")
+        done.set()
+    
+    def search(seed):
+        rng = random.Random(seed)
+        try:
+            while not done.is_set():
+                fragment = f"{rng.randrange(count):04d}q"
+                for book in library.search_books(fragment):
+                    assert fragment in book["title"].lower()
+        except Exception as error:
+            errors.append(error)
+    
+    switch_interval = sys.getswitchinterval()
+    sys.setswitchinterval(1e-5)
+    try:
+        threads = [threading.Thread(target=add_books)] + [threading.Thread(target=search, args=(seed,))
+                                                           for seed in range(3)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+    finally:
+        sys.setswitchinterval(switch_interval)
+    assert errors == []
+    for number in range(0, count, 11):
+        assert [book["isbn"] for book in library.search_books(f"{number:04d}q")] == [f"isbn-{number}"]
@@ -0,0 +1,86 @@
+"""OperationScheduler: catch-up after downtime and funded minimum payments"""
+
+import random
+from decimal import ROUND_HALF_EVEN, ROUND_HALF_UP
+
+import pytest
+
+from bank_system import (Bank, CheckingAccount, CreditCardAccount, Money, OperationScheduler,
+                         SavingsAccount)
+
+MONTH = OperationScheduler.MONTH
+
+def build_schedules(setups):
+    """Savings accounts earning interest and cards paid from a funding account"""
+    scheduler = OperationScheduler(resolution=86400.0, minimum_payment=25, minimum_rate=0.05)
+    accounts = []
+    for index, (cents, rate, rounding, owed) in enumerate(setups):
+        savings = SavingsAccount(str(3 * index), "Saver", Money.from_cents(cents), interest_rate=rate,
+                                 interest_rounding=rounding)
+        card = CreditCardAccount(str(3 * index + 1), "Cardholder", credit_limit=10_000)
+        card.make_purchase(Money.from_cents(owed), 0.0)
+        funding = CheckingAccount(str(3 * index + 2), "Cardholder", 10_000)
+        scheduler.schedule(savings, OperationScheduler.INTEREST, MONTH)
+        scheduler.schedule(card, OperationScheduler.MINIMUM_PAYMENT, MONTH, funding=funding)
+        accounts += [savings, card, funding]
+    return scheduler, accounts
+
+def state(accounts):
+    return [(account._balance, getattr(account, "_credit_used", None)) for account in accounts]
+
+@pytest.mark.parametrize("periods", [1, 2, 12, 60])
+def test_catch_up_matches_firing_each_period(periods):
+    rng = random.Random(11)
+    setups = [(rng.randint(0, 2_000_000), rng.choice([0.01, 0.0175, 0.035, 0.1234]),
+               rng.choice([ROUND_HALF_EVEN, ROUND_HALF_UP]), rng.randint(1, 500_000)) for _ in range(200)]
+    
+    ticked, ticked_accounts = build_schedules(setups)
+    for period in range(periods):
+        assert ticked.tick(MONTH * (period + 1)) == 2 * len(setups)
+    caught_up, caught_up_accounts = build_schedules(setups)
+    assert caught_up.tick(MONTH * periods) == 2 * len(setups) * periods
+    assert state(caught_up_accounts) == state(ticked_accounts)
+
+def test_minimum_payments_need_a_separate_funding_account():
+    scheduler = OperationScheduler()
+    card = CreditCardAccount("2000", "Frank", 3000)
+    with pytest.raises(ValueError):
+        scheduler.schedule(card, OperationScheduler.MINIMUM_PAYMENT, MONTH)
+    with pytest.raises(ValueError):
+        scheduler.schedule(card, OperationScheduler.MINIMUM_PAYMENT, MONTH, funding=card)
+
+def test_minimum_payment_moves_money_from_funding_to_card():
+    bank = Bank("Scheduler Bank")
+    bank.create_account("checking", "Frank", 500, overdraft_limit=0)
+    funding = bank.get_account("1000")
+    card = CreditCardAccount("2000", "Frank", 3000)
+    card.make_purchase(1000, 0.0)
+    scheduler = OperationScheduler(bank, resolution=86400.0, minimum_payment=25, minimum_rate=0.05)
+    scheduler.schedule(card, OperationScheduler.MINIMUM_PAYMENT, MONTH, funding=funding)
+    
+    assert scheduler.tick(MONTH / 2) == 0
+    assert scheduler.tick(MONTH) == 1
+    assert funding.get_balance() == Money(450)
+    assert card._credit_used == Money(950)
+
+def test_unfunded_minimum_payment_is_skipped():
+    bank = Bank("Scheduler Bank")
+    bank.create_account("checking", "Frank", 10, overdraft_limit=0)
+    funding = bank.get_account("1000")
+    card = CreditCardAccount("2000", "Frank", 3000)
+    card.make_purchase(1000, 0.0)
+    scheduler = OperationScheduler(bank, minimum_payment=25)
+    scheduler.schedule(card, OperationScheduler.MINIMUM_PAYMENT, MONTH, funding=funding)
+    
+    scheduler.tick(MONTH)
+    assert funding.get_balance() == Money(10)
+    assert card._credit_used == Money(1000)
+
+def test_cancelled_schedule_does_not_fire():
+    savings = SavingsAccount("1000", "Alice", 1000, interest_rate=0.03)
+    scheduler = OperationScheduler()
+    schedule_id = scheduler.schedule(savings, OperationScheduler.INTEREST, MONTH)
+    scheduler.cancel(schedule_id)
+    assert len(scheduler) == 0
+    assert scheduler.tick(3 * MONTH) == 0
+    assert savings.get_balance() == Money(1000)
@@ -0,0 +1,95 @@
+"""ShardedBank: routing and two-phase commit transfers across worker processes"""
+
+import pytest
+
+from bank_system import Bank, Money, PostingStatus, ShardedBank, TransactionLedger
+
+@pytest.fixture(scope="module")
+def sharded():
+    bank = ShardedBank("Sharded Test Bank", num_workers=3)
+    for holder in ("A", "B", "C", "D", "E", "F"):
+        bank.create_account("checking", holder, 1000, overdraft_limit=0)
+    yield bank
+    bank.close()
+
+def pair(bank, same_shard):
+    numbers = [str(number) for number in range(1000, 1006)]
+    for source in numbers:
+        for destination in numbers:
+            if source != destination and (bank.shard_of(source) == bank.shard_of(destination)) == same_shard:
+                return source, destination
+    pytest.skip("No such pair of accounts")
+
+def total(bank):
+    return bank.get_bank_stats()["total_balance"]
+
+@pytest.mark.parametrize("same_shard", [True, False])
+def test_transfer_conserves_money(sharded, same_shard):
+    source, destination = pair(sharded, same_shard)
+    before = total(sharded)
+    source_balance, destination_balance = sharded.get_balance(source), sharded.get_balance(destination)
+    assert sharded._transfer(source, destination, 25) == PostingStatus.OK
+    assert sharded.get_balance(source) == source_balance - Money(25)
+    assert sharded.get_balance(destination) == destination_balance + Money(25)
+    assert total(sharded) == before
+
+@pytest.mark.parametrize("same_shard", [True, False])
+def test_failed_debit_aborts_the_credit(sharded, same_shard):
+    source, destination = pair(sharded, same_shard)
+    before = total(sharded)
+    destination_balance = sharded.get_balance(destination)
+    assert sharded._transfer(source, destination, 1_000_000) == PostingStatus.INSUFFICIENT_FUNDS
+    assert sharded.get_balance(destination) == destination_balance
+    assert total(sharded) == before
+
+def test_transfer_to_unknown_account_changes_nothing(sharded):
+    before = total(sharded)
+    balance = sharded.get_balance("1000")
+    assert sharded._transfer("1000", "9999", 10) == PostingStatus.UNKNOWN_ACCOUNT
+    assert sharded.get_balance("1000") == balance
+    assert total(sharded) == before
+
+def test_batch_keeps_input_order(sharded):
+    before = total(sharded)
+    statuses = sharded.apply_batch([("1001", "deposit", 10), ("9999", "deposit", 5),
+                                    ("1002", "withdraw", 1_000_000), ("1003", "withdraw", 10)])
+    assert list(statuses) == [PostingStatus.OK, PostingStatus.UNKNOWN_ACCOUNT,
+                              PostingStatus.INSUFFICIENT_FUNDS, PostingStatus.OK]
+    assert total(sharded) == before
+
+def test_a_failing_request_does_not_kill_its_shard(sharded):
+    assert sharded.create_account("savings", "B", 100, bogus=1) == "Invalid account details"
+    assert sharded.apply_batch([("1000", "deposit")]).tolist() == [PostingStatus.MALFORMED_REQUEST]
+    # Every shard still answers
+    assert sharded.get_bank_stats()["total_accounts"] == 6
+    assert sharded.deposit("1000", 1).startswith("Deposited")
+    assert sharded.withdraw("1000", 1).startswith("Withdrew")
+
+@pytest.mark.parametrize("same_shard", [True, False])
+def test_transfer_into_a_full_account_keeps_the_money(same_shard):
+    bank = ShardedBank("Full Bank", num_workers=2)
+    try:
+        for holder in "ABCDEF":
+            bank.create_account("checking", holder, 1000, overdraft_limit=0)
+        source, destination = pair(bank, same_shard)
+        bank.deposit(destination, Money.from_cents(TransactionLedger.MAX_CENTS - 100_010))
+        before = total(bank)
+        assert bank._transfer(source, destination, 50) == PostingStatus.INVALID_AMOUNT
+        assert bank.get_balance(source) == Money(1000)
+        assert total(bank) == before
+    finally:
+        bank.close()
+
+def test_prepared_credits_pin_the_headroom():
+    bank = Bank("Shard")
+    bank.create_account("checking", "A", 0)
+    bank.get_account("1000")._apply_deposit(Money.from_cents(TransactionLedger.MAX_CENTS - 100))
+    prepared = {}
+    execute = ShardedBank._execute
+    assert execute(bank, prepared, (ShardedBank.PREPARE_CREDIT, 1, "1000", Money("0.60"))) == PostingStatus.OK
+    assert execute(bank, prepared, (ShardedBank.PREPARE_CREDIT, 2, "1000", Money("0.60"))) == PostingStatus.INVALID_AMOUNT
+    assert execute(bank, prepared, (ShardedBank.PREPARE_CREDIT, 3, "1000", Money("0.40"))) == PostingStatus.OK
+    assert execute(bank, prepared, (ShardedBank.ABORT_CREDIT, 1, Money("0.60"))) == PostingStatus.OK
+    assert execute(bank, prepared, (ShardedBank.COMMIT_CREDIT, 3, Money("0.40"))) == PostingStatus.OK
+    assert bank.get_account("1000").get_balance() == Money.from_cents(TransactionLedger.MAX_CENTS - 60)
+    assert execute(bank, prepared, (ShardedBank.COMMIT_CREDIT, 99, Money(1))) == PostingStatus.INTERNAL_ERROR
@@ -0,0 +1,106 @@
+"""Bank.transfer: atomic, conserving and deadlock-free"""
+
+import random
+import sys
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from bank_system import Bank, Money, PostingStatus, TransactionLedger
+
+@pytest.fixture
+def bank():
+    bank = Bank("Test Bank", verify_aggregates=True)
+    bank.create_account("checking", "Alice", 1000, overdraft_limit=0)
+    bank.create_account("savings", "Bob", 500)
+    bank.create_account("business", "Carol", 2000)
+    return bank
+
+def balances(bank):
+    return {number: account.get_balance() for number, account in bank.get_all_accounts().items()}
+
+def test_transfer_moves_money_between_accounts(bank):
+    assert bank.transfer("1000", "1002", 300) == "Transferred $300.00 from 1000 to 1002"
+    assert bank.get_account("1000").get_balance() == Money(700)
+    assert bank.get_account("1002").get_balance() == Money(2300)
+    assert bank.get_account("1000").get_ledger()[-1] == "Withdrew $300.00"
+    assert bank.get_account("1002").get_ledger()[-1] == "Deposited $300.00"
+    assert bank.verify_aggregates()
+
+@pytest.mark.parametrize("source, destination, amount, status", [
+    ("1000", "1001", 5000, PostingStatus.INSUFFICIENT_FUNDS),
+    ("1001", "1000", 450, PostingStatus.BELOW_MINIMUM),
+    ("1000", "9999", 10, PostingStatus.UNKNOWN_ACCOUNT),
+    ("9999", "1000", 10, PostingStatus.UNKNOWN_ACCOUNT),
+    ("1000", "1000", 10, PostingStatus.INVALID_AMOUNT),
+    ("1000", "1001", -5, PostingStatus.INVALID_AMOUNT),
+    ("1000", "1001", float("nan"), PostingStatus.INVALID_AMOUNT),
+])
+def test_failed_transfer_changes_nothing(bank, source, destination, amount, status):
+    before = balances(bank)
+    assert bank._transfer(source, destination, amount) == status
+    assert balances(bank) == before
+
+def test_transfer_to_inactive_account_is_refused(bank):
+    bank.get_account("1002").deactivate()
+    before = balances(bank)
+    assert bank.transfer("1000", "1002", 10) == "Account is inactive"
+    assert balances(bank) == before
+
+def test_concurrent_transfers_conserve_money():
+    bank = Bank("Stress Bank", verify_aggregates=True)
+    for i in range(20):
+        bank.create_account(("savings", "checking", "business")[i % 3], f"Holder {i}", 1000)
+    numbers = list(bank.get_all_accounts())
+    net_total = lambda: sum(account.get_net_balance() for account in bank.get_all_accounts().values())
+    total_before = net_total()
+    
+    def worker(seed):
+        rng = random.Random(seed)
+        for _ in range(500):
+            source, destination = rng.sample(numbers, 2)
+            bank._transfer(source, destination, rng.randint(1, 200))
+    
+    with ThreadPoolExecutor(max_workers=4) as pool:
+        list(pool.map(worker, range(4)))
+    assert net_total() == total_before
+    assert bank.verify_aggregates()
+
+def test_transfer_into_a_full_account_keeps_the_money(bank):
+    bank.create_account("business", "Dan", 0)
+    full = bank.get_account("1003")
+    assert full._apply_deposit(Money.from_cents(TransactionLedger.MAX_CENTS - 10)) == PostingStatus.OK
+    before = bank.get_account("1000").get_balance()
+    assert bank._transfer("1000", "1003", 50) == PostingStatus.INVALID_AMOUNT
+    assert bank.get_account("1000").get_balance() == before
+    assert full.get_balance() == Money.from_cents(TransactionLedger.MAX_CENTS - 10)
+
+def test_aggregates_verify_while_postings_are_in_flight():
+    bank = Bank("Busy Bank", verify_aggregates=True)
+    for i in range(8):
+        bank.create_account("checking", f"Holder {i}", 1000)
+    numbers = list(bank.get_all_accounts())
+    stop = threading.Event()
+    
+    def post(seed):
+        rng = random.Random(seed)
+        while not stop.is_set():
+            account = bank.get_account(rng.choice(numbers))
+            account.deposit(1) if rng.random() < 0.5 else account.withdraw(1)
+            bank._transfer(*rng.sample(numbers, 2), 1)
+    
+    switch_interval = sys.getswitchinterval()
+    sys.setswitchinterval(1e-6)
+    try:
+        with ThreadPoolExecutor(max_workers=4) as pool:
+            for seed in range(3):
+                pool.submit(post, seed)
+            try:
+                for _ in range(300):
+                    assert bank.verify_aggregates()
+                    bank.get_bank_info()
+            finally:
+                stop.set()
+    finally:
+        sys.setswitchinterval(switch_interval)
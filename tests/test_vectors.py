@@ -0,0 +1,63 @@
+"""Vector, VectorArray and SpatialGrid"""
+
+import math
+import random
+
+import pytest
+
+from advanced_concepts import SpatialGrid, Vector, VectorArray
+
+def test_from_vectors_accepts_a_generator():
+    points = VectorArray.from_vectors(Vector(i, i) for i in range(3))
+    assert len(points) == 3
+    assert [(point.x, point.y) for point in points] == [(0, 0), (1, 1), (2, 2)]
+
+def test_array_operations_match_vector_operations():
+    vectors = [Vector(3, 4), Vector(1, 2), Vector(-2, 0.5)]
+    points = VectorArray.from_vectors(vectors)
+    offset = Vector(1, -1)
+    assert (points + offset).to_vectors() == [vector + offset for vector in vectors]
+    assert (points * 2).to_vectors() == [vector * 2 for vector in vectors]
+    assert list(points.magnitudes()) == [vector.magnitude() for vector in vectors]
+    assert list(points.lt(Vector(2, 2))) == [0, 1, 1]
+    assert list(points.ge(points)) == [1, 1, 1]
+
+def test_views_write_through_to_the_array():
+    points = VectorArray.from_vectors([Vector(0, 0), Vector(1, 1)])
+    points[1].x = 5
+    assert points[1] == Vector(5, 1)
+    points[0] = Vector(2, 3)
+    assert points.to_vectors() == [Vector(2, 3), Vector(5, 1)]
+
+@pytest.mark.parametrize("other", [3, 2.5, None, "v"])
+def test_comparing_with_a_non_vector_raises_type_error(other):
+    points = VectorArray.from_vectors([Vector(3, 4)])
+    with pytest.raises(TypeError):
+        points.lt(other)
+
+def test_comparing_arrays_of_different_lengths_raises_value_error():
+    with pytest.raises(ValueError):
+        VectorArray([1.0], [1.0]).lt(VectorArray([1.0, 2.0], [1.0, 2.0]))
+
+def test_spatial_grid_matches_brute_force():
+    rng = random.Random(5)
+    points = [Vector(rng.uniform(-100, 100), rng.uniform(-100, 100)) for _ in range(500)]
+    grid = SpatialGrid(points[:250])
+    for point in points[250:]:
+        grid.insert(point)
+    # Stretch the extent far past the built cells, then query around it
+    far = Vector(10_000, -10_000)
+    grid.insert(far)
+    points.append(far)
+    
+    distance = lambda center, point: math.hypot(point.x - center.x, point.y - center.y)
+    for center in (Vector(0, 0), Vector(57.5, -12), Vector(5_000, -5_000)):
+        for radius in (0, 10, 150):
+            expected = {id(point) for point in points if distance(center, point) <= radius}
+            assert {id(point) for point in grid.within(center, radius)} == expected
+        nearest = grid.nearest(center, k=5)
+        assert [distance(center, point) for point in nearest] == \
+            sorted(distance(center, point) for point in points)[:5]
+    
+    grid.remove(far)
+    assert far not in grid and len(grid) == 500